@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Batch re-analysis of archived recordings.
+Videos come from directories (searched recursively), glob patterns or
+manifest files (one path per line, or a JSON list), and are fanned out over
+a process pool whose workers load the models once. Each report is written
+as JSON (next to its video, or mirrored under --output-dir) or bulk-inserted
+into MongoDB with --mongo.
+
+Progress is checkpointed to a state file as videos finish, so re-running
+the same command after a crash picks up where it stopped. The state is tied
+to the analyzer fingerprint: after a model or threshold change every video
+is analyzed again. The run ends with videos/hour and frames/sec per worker.
+
+Usage (from backend/):
+    python batch.py /archive/interviews --workers 4 --output-dir reports/
+    python batch.py "archive/**/*.webm" manifest.txt --mongo --state rescore.json
+"""
+
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+
+VIDEO_EXTENSIONS = ('.webm', '.mp4', '.mkv', '.mov', '.avi')
+
+# Set inside each worker process by _init_worker
+_worker_config: Dict[str, Any] = {}
+
+
+def _init_worker(config: Dict[str, Any], threads_per_worker: int):
+    """Load the models once per worker process"""
+    global _worker_config
+    _worker_config = config
+
+    from model_registry import get_registry, limit_threads
+    from video_processor import VideoProctoringAnalyzer
+    limit_threads(threads_per_worker)
+    analyzer = VideoProctoringAnalyzer()
+    analyzer.apply_config(config)
+    get_registry().load(analyzer.object_weights(), analyzer.DETECTOR_BACKEND)
+
+
+def _fingerprint() -> str:
+    from video_processor import VideoProctoringAnalyzer
+    analyzer = VideoProctoringAnalyzer()
+    analyzer.apply_config(_worker_config)
+    return analyzer.fingerprint()
+
+
+def _analyze(video_path: str) -> Dict[str, Any]:
+    """Runs inside a worker process"""
+    from video_processor import VideoProctoringAnalyzer
+
+    analyzer = VideoProctoringAnalyzer()
+    analyzer.apply_config(_worker_config)
+    started = time.perf_counter()
+    report = analyzer.process_video(video_path)
+    return {
+        'report': report,
+        'frames': report['video_info']['total_frames'],
+        'seconds': time.perf_counter() - started,
+        'worker': os.getpid(),
+    }
+
+
+def collect_videos(inputs: List[str]) -> List[str]:
+    """Absolute paths of the videos named by directories, globs and manifests, in order, without duplicates"""
+    videos: List[str] = []
+
+    def add(path: str):
+        if path.lower().endswith(VIDEO_EXTENSIONS):
+            videos.append(os.path.abspath(path))
+
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, dirs, files in os.walk(item):
+                dirs.sort()
+                for name in sorted(files):
+                    add(os.path.join(root, name))
+        elif os.path.isfile(item) and item.lower().endswith(VIDEO_EXTENSIONS):
+            add(item)
+        elif os.path.isfile(item):
+            # Manifest: relative entries are relative to the manifest itself
+            base = os.path.dirname(os.path.abspath(item))
+            with open(item) as f:
+                text = f.read()
+            entries = json.loads(text) if text.lstrip().startswith('[') else [
+                line.strip() for line in text.splitlines() if line.strip() and not line.lstrip().startswith('#')
+            ]
+            for entry in entries:
+                path = os.path.join(base, entry)
+                if os.path.isfile(path):
+                    add(path)
+                else:
+                    print(f"⚠️ {item}: {entry} not found, skipping")
+        else:
+            for path in sorted(glob.glob(item, recursive=True)):
+                add(path)
+
+    return list(dict.fromkeys(videos))
+
+
+class BatchState:
+    """Checkpoint of a batch run: which videos are done (or failed) under which analyzer fingerprint"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.fingerprint: Optional[str] = None
+        self.done: Dict[str, Dict[str, Any]] = {}
+        self.failed: Dict[str, str] = {}
+        if os.path.isfile(path):
+            with open(path) as f:
+                state = json.load(f)
+            self.fingerprint = state.get('fingerprint')
+            self.done = state.get('done', {})
+            self.failed = state.get('failed', {})
+
+    def reset(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.done, self.failed = {}, {}
+
+    @staticmethod
+    def _signature(video_path: str) -> Dict[str, Any]:
+        stat = os.stat(video_path)
+        return {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+    def is_done(self, video_path: str) -> bool:
+        """Done under this fingerprint, and the file hasn't changed since"""
+        entry = self.done.get(video_path)
+        return entry is not None and entry['file'] == self._signature(video_path)
+
+    def mark_done(self, video_path: str, output: str, frames: int):
+        self.failed.pop(video_path, None)
+        self.done[video_path] = {'file': self._signature(video_path), 'output': output, 'frames': frames}
+
+    def mark_failed(self, video_path: str, error: str):
+        self.failed[video_path] = error
+
+    def save(self):
+        # Write then rename, so a crash mid-write never loses the previous checkpoint
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'fingerprint': self.fingerprint, 'done': self.done, 'failed': self.failed}, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+class JsonSink:
+    """Writes each report next to its video, or under output_dir mirroring the inputs' layout"""
+
+    def __init__(self, output_dir: Optional[str], videos: List[str]):
+        self.output_dir = output_dir
+        self.root = os.path.commonpath([os.path.dirname(v) for v in videos]) if videos else ''
+
+    def output_path(self, video_path: str) -> str:
+        stem = os.path.splitext(video_path)[0]
+        if self.output_dir:
+            stem = os.path.join(self.output_dir, os.path.relpath(stem, self.root))
+        return stem + '_analysis.json'
+
+    def add(self, video_path: str, report: Dict[str, Any]) -> List[tuple]:
+        """Write one report; returns the (video, output) pairs now safely stored"""
+        path = self.output_path(video_path)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        return [(video_path, path)]
+
+    def flush(self) -> List[tuple]:
+        return []
+
+    def close(self):
+        pass
+
+
+class MongoSink:
+    """Buffers report documents and inserts them bulk_size at a time"""
+
+    def __init__(self, uri: str, bulk_size: int):
+        from database import ReportStore
+        self.store = ReportStore(uri)
+        self.bulk_size = max(1, bulk_size)
+        self._pending: List[tuple] = []
+
+    def add(self, video_path: str, report: Dict[str, Any]) -> List[tuple]:
+        # Same document shape as /upload's, with the archive path instead of a Cloudinary URL
+        self._pending.append((video_path, {
+            "video_file": os.path.basename(video_path),
+            "video_url": None,
+            "video_path": video_path,
+            "created_at": time.time(),
+            "analysis_complete": True,
+            "analysis_data": report,
+        }))
+        return self.flush() if len(self._pending) >= self.bulk_size else []
+
+    def flush(self) -> List[tuple]:
+        if not self._pending:
+            return []
+        pending, self._pending = self._pending, []
+        result = self.store.collection.insert_many([doc for _, doc in pending], ordered=False)
+        return [(video_path, str(inserted_id)) for (video_path, _), inserted_id in zip(pending, result.inserted_ids)]
+
+    def close(self):
+        self.store.close()
+
+
+def throughput(results: List[Dict[str, Any]], wall_seconds: float) -> Dict[str, Any]:
+    """Videos/hour over the run, and frames/sec of each worker over the time it spent analyzing"""
+    workers: Dict[int, Dict[str, float]] = {}
+    for result in results:
+        worker = workers.setdefault(result['worker'], {'videos': 0, 'frames': 0, 'seconds': 0.0})
+        worker['videos'] += 1
+        worker['frames'] += result['frames']
+        worker['seconds'] += result['seconds']
+
+    return {
+        'videos': len(results),
+        'wall_seconds': round(wall_seconds, 2),
+        'videos_per_hour': round(len(results) * 3600 / wall_seconds, 1) if wall_seconds > 0 else 0.0,
+        'frames_per_second': round(sum(r['frames'] for r in results) / wall_seconds, 1) if wall_seconds > 0 else 0.0,
+        'workers': [{
+            'pid': pid,
+            'videos': worker['videos'],
+            'frames': worker['frames'],
+            'frames_per_second': round(worker['frames'] / worker['seconds'], 1) if worker['seconds'] > 0 else 0.0,
+        } for pid, worker in workers.items()],
+    }
+
+
+def run_batch(videos: List[str], sink, state: BatchState, workers: int,
+              config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Analyze every video not yet done in `state`; returns the throughput stats"""
+    from video_processor import VideoProctoringAnalyzer
+    config = config if config is not None else VideoProctoringAnalyzer().config()
+
+    ctx = multiprocessing.get_context("spawn")
+    results: List[Dict[str, Any]] = []
+    started = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(config, max(1, (os.cpu_count() or 1) // workers)),
+    ) as pool:
+        # The fingerprint needs the weights loaded, so a worker computes it
+        fingerprint = pool.submit(_fingerprint).result()
+        if state.fingerprint != fingerprint:
+            if state.done:
+                print(f"⚠️ Analyzer settings or models changed since {state.path} was written; starting over")
+            state.reset(fingerprint)
+            state.save()
+
+        pending = [v for v in videos if not state.is_done(v)]
+        print(f"Processing {len(pending)} videos on {workers} workers "
+              f"({len(videos) - len(pending)} already done)")
+        futures = {pool.submit(_analyze, video_path): video_path for video_path in pending}
+        frames_by_path: Dict[str, int] = {}
+
+        def checkpoint(stored: List[tuple]):
+            for video_path, output in stored:
+                state.mark_done(video_path, output, frames_by_path[video_path])
+            if stored:
+                state.save()
+
+        try:
+            for finished, future in enumerate(as_completed(futures), 1):
+                video_path = futures[future]
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    print(f"[{finished}/{len(pending)}] ❌ {video_path}: {e}")
+                    state.mark_failed(video_path, str(e))
+                    state.save()
+                    continue
+
+                results.append(result)
+                frames_by_path[video_path] = result['frames']
+                print(f"[{finished}/{len(pending)}] ✅ {video_path}: {result['frames']} frames in {result['seconds']:.1f}s")
+                checkpoint(sink.add(video_path, result.pop('report')))
+            checkpoint(sink.flush())
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); whatever was stored is already checkpointed
+            checkpoint(sink.flush())
+            print(f"❌ A worker process died; re-run the same command to resume from {state.path}")
+            for future in futures:
+                future.cancel()
+        except KeyboardInterrupt:
+            checkpoint(sink.flush())
+            for future in futures:
+                future.cancel()
+            raise
+
+    return throughput(results, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="video directories, glob patterns or manifest files")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--state", default="batch_state.json", help="checkpoint file (default: %(default)s)")
+    parser.add_argument("--output-dir", help="write reports here instead of next to each video")
+    parser.add_argument("--mongo", action="store_true", help="insert reports into MongoDB (DATABASE_LINK) instead")
+    parser.add_argument("--bulk-size", type=int, default=50, help="reports per MongoDB insert")
+    parser.add_argument("--json", help="also write the throughput stats to this file")
+    args = parser.parse_args()
+
+    videos = collect_videos(args.inputs)
+    if not videos:
+        print("No videos found")
+        sys.exit(1)
+
+    if args.mongo:
+        from dotenv import load_dotenv
+        load_dotenv()
+        uri = os.getenv("DATABASE_LINK")
+        if not uri:
+            print("DATABASE_LINK environment variable not set!")
+            sys.exit(1)
+        sink = MongoSink(uri, args.bulk_size)
+    else:
+        sink = JsonSink(args.output_dir, videos)
+
+    state = BatchState(args.state)
+    try:
+        stats = run_batch(videos, sink, state, max(1, min(args.workers, len(videos))))
+    finally:
+        sink.close()
+
+    print(f"\nBatch complete: {len(state.done)}/{len(videos)} videos done, {len(state.failed)} failed")
+    print(f"{stats['videos']} analyzed in {stats['wall_seconds']}s: "
+          f"{stats['videos_per_hour']} videos/hour, {stats['frames_per_second']} frames/sec")
+    for i, worker in enumerate(stats['workers'], 1):
+        print(f"  worker {i} (pid {worker['pid']}): {worker['videos']} videos, "
+              f"{worker['frames_per_second']} frames/sec")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(stats, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Object detector backend benchmark.
+Runs the same frames through every available backend (see detectors.py) and
+reports frames/sec, plus how closely each backend's detections agree with
+the ultralytics ones: a box matches when it has the same class and an IoU of
+at least --iou, and matched confidences must be within --tolerance.
+Backends whose exported model is missing are skipped.
+
+Usage (from backend/):
+    python -m benchmarks.detector_backends [video_path] [--weights yolov8m.pt]
+        [--frames 64] [--batch-size 4] [--imgsz 640] [--conf 0.25]
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.yolo_batch import load_frames
+from detectors import OnnxDetector, UltralyticsDetector, onnx_path
+from model_registry import get_registry
+from video_processor import VideoProctoringAnalyzer
+
+
+def iou(a: np.ndarray, b: np.ndarray) -> float:
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def agreement(reference: List[tuple], candidate: List[tuple], min_iou: float) -> Tuple[int, int, int, float]:
+    """(matched, reference boxes, candidate boxes, largest confidence difference) over all frames"""
+    matched = total_ref = total_cand = 0
+    worst = 0.0
+    for (ref_cls, ref_conf, ref_xyxy), (cls, conf, xyxy) in zip(reference, candidate):
+        total_ref += len(ref_cls)
+        total_cand += len(cls)
+        used = set()
+        for c, score, box in zip(ref_cls, ref_conf, ref_xyxy):
+            # Greedy: best unused same-class box
+            best, best_iou = None, min_iou
+            for j in range(len(cls)):
+                if j not in used and cls[j] == c:
+                    overlap = iou(box, xyxy[j])
+                    if overlap >= best_iou:
+                        best, best_iou = j, overlap
+            if best is not None:
+                used.add(best)
+                matched += 1
+                worst = max(worst, abs(float(score) - float(conf[best])))
+    return matched, total_ref, total_cand, worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video_path", nargs="?", default=None)
+    parser.add_argument("--weights", default=None, help="defaults to YOLO_WEIGHTS")
+    parser.add_argument("--frames", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--iou", type=float, default=0.5)
+    parser.add_argument("--tolerance", type=float, default=0.05)
+    args = parser.parse_args()
+
+    registry = get_registry()
+    weights = args.weights or registry.yolo_weights
+    analyzer = VideoProctoringAnalyzer(registry)
+    frames = load_frames(args.video_path, args.frames)
+
+    backends = [("ultralytics", UltralyticsDetector(registry.yolo(weights)))]
+    for label, int8 in (("onnx", False), ("onnx-int8", True)):
+        path = onnx_path(weights, int8)
+        if os.path.isfile(path):
+            backends.append((label, OnnxDetector(path)))
+        else:
+            print(f"Skipping {label}: {path} not found (python detectors.py {weights}{' --int8' if int8 else ''})")
+
+    reference = None
+    print(f"{'backend':<12}  {'frames/sec':>10}  {'ms/frame':>8}  {'matched':>9}  {'extra':>5}  {'max Δconf':>9}")
+    for label, detector in backends:
+        classes = np.array([c for c, name in detector.names.items() if name in analyzer.target_classes])
+        # Warm-up so session creation and first-call setup aren't timed
+        detector.predict(frames[:1], args.imgsz, conf=args.conf, classes=classes)
+
+        results = []
+        start = time.perf_counter()
+        for i in range(0, len(frames), args.batch_size):
+            results.extend(detector.predict(frames[i:i + args.batch_size], args.imgsz,
+                                            conf=args.conf, classes=classes))
+        elapsed = time.perf_counter() - start
+
+        if reference is None:
+            reference = results
+            summary = f"{'-':>9}  {'-':>5}  {'-':>9}"
+        else:
+            matched, total_ref, total_cand, worst = agreement(reference, results, args.iou)
+            flag = "" if matched == total_ref == total_cand and worst <= args.tolerance else "  ⚠️"
+            summary = f"{f'{matched}/{total_ref}':>9}  {total_cand - matched:>5}  {worst:>9.3f}{flag}"
+        print(f"{label:<12}  {len(frames) / elapsed:>10.2f}  {1000 * elapsed / len(frames):>8.1f}  {summary}")
+
+
+if __name__ == "__main__":
+    main()
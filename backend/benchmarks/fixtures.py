@@ -0,0 +1,144 @@
+"""
+Deterministic synthetic proctoring videos.
+A real face crop (from the sample image bundled with ultralytics, so nothing
+is downloaded) is composited onto a plain room background following a
+scripted timeline. Frames carry seeded sensor noise, so the same fixture is
+produced on every run and static stretches still look like a live camera.
+Synthetic frames contain no phones or books: YOLO still runs on every
+sampled frame, so its cost is measured, but object events need real footage.
+The `seated` states put shoulders under the faces, so a person detector has
+bodies to find and person fusion (see person_fusion.py) gets exercised.
+"""
+
+import os
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Each scenario is a cycle of (seconds, state) repeated to fill the fixture's duration
+SCENARIOS: Dict[str, List[Tuple[float, str]]] = {
+    'present': [(10.0, 'centered')],
+    'absent_gap': [(6.0, 'centered'), (5.0, 'absent'), (4.0, 'centered')],
+    'off_centre': [(5.0, 'centered'), (5.0, 'off_centre')],
+    'multiple_faces': [(6.0, 'centered'), (3.0, 'two_faces'), (6.0, 'centered')],
+    'static_long': [(60.0, 'centered')],
+    'mixed': [(5.0, 'centered'), (5.0, 'absent'), (5.0, 'off_centre'), (2.0, 'two_faces'), (3.0, 'centered')],
+    'seated': [(6.0, 'seated'), (4.0, 'absent'), (3.0, 'two_seated'), (2.0, 'seated')],
+}
+
+# Same mp4v codec the OpenCV wheels can always write
+FOURCC = 'mp4v'
+NOISE_LEVEL = 3
+
+
+def default_fixtures_dir() -> str:
+    return os.path.join(tempfile.gettempdir(), 'proctoring-bench-fixtures')
+
+
+def fixture_name(scenario: str, duration: float, width: int, height: int, fps: float) -> str:
+    return f"{scenario}_{width}x{height}_{duration:g}s_{fps:g}fps"
+
+
+def _face_sprite() -> np.ndarray:
+    from ultralytics.utils import ASSETS
+
+    image = cv2.imread(str(ASSETS / 'zidane.jpg'))
+    if image is None:
+        raise RuntimeError("ultralytics sample image zidane.jpg not found")
+    h, w = image.shape[:2]
+    return image[int(0.33 * h):int(0.75 * h), int(0.80 * w):int(1.0 * w)]
+
+
+def state_at(scenario: str, t: float) -> str:
+    cycle = SCENARIOS[scenario]
+    t = t % sum(seconds for seconds, _ in cycle)
+    for seconds, state in cycle:
+        if t < seconds:
+            return state
+        t -= seconds
+    return cycle[-1][1]
+
+
+class FrameRenderer:
+    """Draws fixture frames at a given resolution; layouts scale with it"""
+
+    def __init__(self, width: int, height: int, seed: int = 0):
+        self.width = width
+        self.height = height
+        self.seed = seed
+
+        sprite = _face_sprite()
+        self.big_face = cv2.resize(sprite, (width // 4, int(height * 0.42)))
+        self.small_face = cv2.resize(sprite, (int(width * 0.19), int(height * 0.31)))
+
+        self.background = np.full((height, width, 3), (90, 110, 100), np.uint8)
+        desk_top = int(height * 0.83)
+        cv2.rectangle(self.background, (0, desk_top), (width, height), (40, 60, 70), -1)
+
+        # People sitting behind the desk: shoulders drawn under where the faces go
+        self.seated_background = self._with_bodies([(0.5, 0.66, 0.3)])
+        self.two_seated_background = self._with_bodies([(0.33, 0.6, 0.16), (0.64, 0.6, 0.16)])
+
+    def _with_bodies(self, bodies: List[Tuple[float, float, float]]) -> np.ndarray:
+        """The background with a torso per (centre x, top y, half width), as fractions of the frame"""
+        frame = self.background.copy()
+        desk_top = int(self.height * 0.83)
+        for cx, top, half_width in bodies:
+            centre = (int(cx * self.width), desk_top)
+            axes = (int(half_width * self.width), desk_top - int(top * self.height))
+            cv2.ellipse(frame, centre, axes, 0, 180, 360, (120, 70, 50), -1)
+        return frame
+
+    def _paste(self, frame: np.ndarray, sprite: np.ndarray, cx: float, cy: float):
+        h, w = sprite.shape[:2]
+        x = int(cx * self.width - w / 2)
+        y = int(cy * self.height - h / 2)
+        frame[y:y + h, x:x + w] = sprite
+
+    def render(self, state: str, index: int) -> np.ndarray:
+        if state == 'seated':
+            frame = self.seated_background.copy()
+        elif state == 'two_seated':
+            frame = self.two_seated_background.copy()
+        else:
+            frame = self.background.copy()
+        if state in ('centered', 'seated'):
+            self._paste(frame, self.big_face, 0.5, 0.5)
+        elif state == 'off_centre':
+            self._paste(frame, self.small_face, 0.125, 0.49)
+        elif state in ('two_faces', 'two_seated'):
+            self._paste(frame, self.small_face, 0.33, 0.49)
+            self._paste(frame, self.small_face, 0.64, 0.49)
+
+        rng = np.random.default_rng((self.seed, index))
+        noise = rng.integers(-NOISE_LEVEL, NOISE_LEVEL + 1, frame.shape, dtype=np.int16)
+        return np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def make_fixture(scenario: str, duration: float = 30.0, width: int = 640, height: int = 480,
+                 fps: float = 15.0, directory: Optional[str] = None) -> str:
+    """Write the fixture video if it isn't cached yet and return its path"""
+    if scenario not in SCENARIOS:
+        raise ValueError(f"Unknown scenario: {scenario}")
+
+    directory = directory or default_fixtures_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, fixture_name(scenario, duration, width, height, fps) + '.mp4')
+    if os.path.exists(path):
+        return path
+
+    renderer = FrameRenderer(width, height)
+    partial = path + '.partial.mp4'
+    writer = cv2.VideoWriter(partial, cv2.VideoWriter_fourcc(*FOURCC), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not open a {FOURCC} writer for {partial}")
+    try:
+        for index in range(int(round(duration * fps))):
+            writer.write(renderer.render(state_at(scenario, index / fps), index))
+    finally:
+        writer.release()
+
+    os.replace(partial, path)
+    return path
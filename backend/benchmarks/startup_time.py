@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark.
+Starts the API with uvicorn in a fresh process and measures how long until
+  - /health answers (the process is serving: signaling works from here on),
+  - a signaling call answers (/rooms/{room}/interviewer/offer),
+  - /ready reports 200 (analysis workers have loaded and warmed up their models).
+Each run starts cold; pass --runs to repeat and report the median.
+
+Usage (from backend/):
+    python -m benchmarks.startup_time [--runs 3] [--timeout 300] [--port 8765]
+"""
+
+import argparse
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _get(url: str) -> Optional[int]:
+    """HTTP status of a GET, or None if nothing is listening yet"""
+    try:
+        with urllib.request.urlopen(url, timeout=2) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        return None
+
+
+def measure(port: int, timeout: float) -> Dict[str, Optional[float]]:
+    env = dict(os.environ)
+    # The app refuses to start without a database URI; a cold start never waits on it
+    env.setdefault("DATABASE_LINK", "mongodb://localhost:27017/?serverSelectionTimeoutMS=500")
+    base = f"http://127.0.0.1:{port}"
+
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    timings: Dict[str, Optional[float]] = {"health": None, "signaling": None, "ready": None}
+    try:
+        while time.perf_counter() - start < timeout and process.poll() is None:
+            if timings["health"] is None and _get(f"{base}/health") == 200:
+                timings["health"] = time.perf_counter() - start
+            if timings["health"] is not None and timings["signaling"] is None:
+                if _get(f"{base}/rooms/startup-probe/interviewer/offer?wait=0") == 200:
+                    timings["signaling"] = time.perf_counter() - start
+            if timings["health"] is not None and _get(f"{base}/ready") == 200:
+                timings["ready"] = time.perf_counter() - start
+                break
+            time.sleep(0.02)
+    finally:
+        process.send_signal(signal.SIGINT)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    runs = []
+    for i in range(args.runs):
+        timings = measure(args.port, args.timeout)
+        runs.append(timings)
+        print(f"run {i + 1}: " + "  ".join(
+            f"{name}={value:.3f}s" if value is not None else f"{name}=timeout" for name, value in timings.items()))
+
+    summary = {}
+    for name in ("health", "signaling", "ready"):
+        values = [run[name] for run in runs if run[name] is not None]
+        summary[name] = round(statistics.median(values), 3) if values else None
+    print("median: " + "  ".join(f"{name}={value}s" for name, value in summary.items()))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"runs": runs, "median": summary}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Analysis pipeline benchmark suite.
+Generates synthetic fixtures (see fixtures.py), runs VideoProctoringAnalyzer
+over each one in several modes and records wall time, frames/sec, peak
+memory and whether the events match the golden output. Every run happens in
+a fresh process so peak RSS isn't inherited from the previous one.
+
+Goldens are the events of the `sequential` mode, stored in benchmarks/golden/.
+Pass --baseline with an earlier --json file to flag throughput regressions.
+
+Usage (from backend/):
+    python -m benchmarks.suite [--scenarios mixed,static_long] [--durations 30,120]
+        [--resolutions 640x480,1280x720] [--modes sequential,pipelined,gated,chunked]
+        [--json results.json] [--baseline previous.json] [--update-golden]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import SCENARIOS, default_fixtures_dir, fixture_name, make_fixture
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden')
+
+# Analyzer settings per mode; `workers` selects chunked analysis
+MODES: Dict[str, Dict[str, Any]] = {
+    'sequential': {'PIPELINED': False, 'GATE_THRESHOLD': 0.0},
+    'pipelined': {'PIPELINED': True, 'GATE_THRESHOLD': 0.0},
+    'gated': {'PIPELINED': True, 'GATE_THRESHOLD': 0.01},
+    'chunked': {'PIPELINED': True, 'GATE_THRESHOLD': 0.0, 'SEGMENT_SECONDS': 10.0, 'workers': 2},
+}
+GOLDEN_MODE = 'sequential'
+
+def _run_case(video_path: str, settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Runs in a fresh process: one analysis of one fixture"""
+    import numpy as np
+    from video_processor import VideoProctoringAnalyzer
+
+    settings = dict(settings)
+    workers = settings.pop('workers', 1)
+    analyzer = VideoProctoringAnalyzer()
+    analyzer.apply_config(settings)
+
+    # Model loading and first-call setup aren't part of the measurement
+    blank = np.zeros((480, 640, 3), np.uint8)
+    analyzer.detect_objects(blank, 0.0)
+    analyzer.detect_faces_and_focus(blank, 0.0)
+
+    start = time.perf_counter()
+    if workers > 1:
+        from chunked import process_video_chunked
+        report = process_video_chunked(analyzer, video_path, workers=workers)
+    else:
+        report = analyzer.process_video(video_path)
+    wall = time.perf_counter() - start
+
+    info = report['video_info']
+    return {
+        'wall_seconds': round(wall, 3),
+        'frames': info['total_frames'],
+        'frames_per_second': round(info['total_frames'] / wall, 2) if wall > 0 else None,
+        'peak_rss_mb': report['perf']['peak_rss_mb'],
+        'gated_fraction': info.get('gated_fraction', 0.0),
+        'stages': report['perf']['stages'],
+        'events': normalize_events(report['events']),
+    }
+
+
+def run_case(video_path: str, settings: Dict[str, Any]) -> Dict[str, Any]:
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+        return pool.submit(_run_case, video_path, settings).result()
+
+
+def normalize_events(events: List[Dict[str, Any]]) -> List[List[Any]]:
+    return [[event['type'], round(event['timestamp'], 3)] for event in events]
+
+
+def golden_path(name: str) -> str:
+    return os.path.join(GOLDEN_DIR, name + '.json')
+
+
+def load_golden(name: str) -> Optional[List[List[Any]]]:
+    path = golden_path(name)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)['events']
+
+
+def save_golden(name: str, events: List[List[Any]]):
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    with open(golden_path(name), 'w') as f:
+        json.dump({'fixture': name, 'mode': GOLDEN_MODE, 'events': events}, f, indent=2)
+        f.write('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--durations", default="30", help="fixture lengths in seconds")
+    parser.add_argument("--resolutions", default="640x480")
+    parser.add_argument("--fps", type=float, default=15.0)
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--fixtures-dir", default=default_fixtures_dir())
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="earlier --json results to compare frames/sec against")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed frames/sec drop vs. baseline before flagging a regression")
+    parser.add_argument("--update-golden", action="store_true",
+                        help=f"store the {GOLDEN_MODE} mode's events as the golden output")
+    args = parser.parse_args()
+
+    modes = args.modes.split(",")
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        parser.error(f"unknown modes: {', '.join(unknown)}")
+    if args.update_golden and GOLDEN_MODE not in modes:
+        modes.insert(0, GOLDEN_MODE)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {(r['fixture'], r['mode']): r for r in json.load(f)['results']}
+
+    results = []
+    failed = False
+    print(f"{'fixture':<36} {'mode':<10} {'wall s':>7} {'frames/s':>9} {'peak MB':>8} {'gated':>6}  golden")
+    for scenario in args.scenarios.split(","):
+        for duration in [float(d) for d in args.durations.split(",")]:
+            for resolution in args.resolutions.split(","):
+                width, height = (int(v) for v in resolution.lower().split("x"))
+                name = fixture_name(scenario, duration, width, height, args.fps)
+                video_path = make_fixture(scenario, duration, width, height, args.fps, args.fixtures_dir)
+
+                for mode in modes:
+                    result = run_case(video_path, MODES[mode])
+                    if args.update_golden and mode == GOLDEN_MODE:
+                        save_golden(name, result['events'])
+
+                    golden = load_golden(name)
+                    if golden is None:
+                        result['golden'] = 'missing'
+                    else:
+                        result['golden'] = 'match' if result['events'] == golden else 'MISMATCH'
+                        failed |= result['golden'] == 'MISMATCH'
+
+                    previous = baseline.get((name, mode))
+                    if previous and previous.get('frames_per_second') and result['frames_per_second']:
+                        change = result['frames_per_second'] / previous['frames_per_second'] - 1
+                        result['fps_change'] = round(change, 4)
+                        if change < -args.tolerance:
+                            result['regression'] = True
+                            failed = True
+
+                    result.update(fixture=name, mode=mode)
+                    results.append(result)
+
+                    flag = f"  REGRESSION {100 * result['fps_change']:+.0f}%" if result.get('regression') else ''
+                    print(f"{name:<36} {mode:<10} {result['wall_seconds']:>7.2f} "
+                          f"{result['frames_per_second'] or 0:>9.1f} {result['peak_rss_mb'] or 0:>8.0f} "
+                          f"{100 * result['gated_fraction']:>5.0f}%  {result['golden']}{flag}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'created_at': time.time(), 'results': results}, f, indent=2)
+        print(f"Results saved to: {args.json}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+YOLO batch-size benchmark.
+Measures object-detection frames/sec for several batch sizes so
+YOLO_BATCH_SIZE can be tuned per host.
+
+Usage (from backend/):
+    python -m benchmarks.yolo_batch [video_path] [--frames 64] [--batch-sizes 1,4,8,16]
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from video_processor import VideoProctoringAnalyzer
+
+
+def load_frames(video_path: str, count: int) -> List[np.ndarray]:
+    """Decode up to `count` frames, or generate noise frames if no video is given"""
+    if not video_path:
+        rng = np.random.default_rng(0)
+        return [rng.integers(0, 255, (480, 640, 3), dtype=np.uint8) for _ in range(count)]
+
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    if not frames:
+        raise ValueError(f"Could not read frames from: {video_path}")
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video_path", nargs="?", default=None)
+    parser.add_argument("--frames", type=int, default=64)
+    parser.add_argument("--batch-sizes", default="1,4,8,16")
+    args = parser.parse_args()
+
+    frames = load_frames(args.video_path, args.frames)
+    timestamps = [i / 30.0 for i in range(len(frames))]
+    analyzer = VideoProctoringAnalyzer()
+
+    # Warm-up so model loading and first-call setup aren't timed
+    analyzer.detect_objects_batch(frames[:1], timestamps[:1])
+
+    print(f"{'batch':>5}  {'frames/sec':>10}  {'ms/frame':>8}")
+    for batch_size in [int(b) for b in args.batch_sizes.split(",")]:
+        start = time.perf_counter()
+        for i in range(0, len(frames), batch_size):
+            analyzer.detect_objects_batch(frames[i:i + batch_size], timestamps[i:i + batch_size])
+        elapsed = time.perf_counter() - start
+        print(f"{batch_size:>5}  {len(frames) / elapsed:>10.2f}  {1000 * elapsed / len(frames):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Chunked parallel analysis for long recordings.
+The video is split into time segments that are analyzed in a process pool.
+Each segment returns its tracker updates instead of events; replaying them
+in time order through a single AnalysisSession stitches face_absent_start,
+focus_lost_start and object_detections across segment boundaries exactly
+as a single sequential pass would.
+Segments run on any process pool whose workers hold the models: the
+JobManager's warm pool for uploads (see jobs.py), or one started here for
+the CLI and benchmarks.
+"""
+
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+
+from metrics import Profiler
+
+# Segments shorter than this aren't worth splitting into: each one re-decodes
+# SEGMENT_SEEK_MARGIN seconds before its start and fills its own pipeline
+MIN_SEGMENT_SECONDS = 10.0
+
+
+def _init_worker(config: Dict[str, Any], threads_per_worker: int):
+    from model_registry import get_registry, limit_threads
+    from video_processor import VideoProctoringAnalyzer
+    limit_threads(threads_per_worker)
+    analyzer = VideoProctoringAnalyzer()
+    analyzer.apply_config(config)
+    get_registry().load(analyzer.object_weights(), analyzer.DETECTOR_BACKEND)
+
+
+def analyze_segment(video_path: str, start: float, end: float,
+                    config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Runs inside a worker process that has loaded the models; `config` overrides
+    the worker's settings (see VideoProctoringAnalyzer.apply_config)"""
+    from video_processor import VideoProctoringAnalyzer
+
+    analyzer = VideoProctoringAnalyzer()
+    if config:
+        analyzer.apply_config(config)
+    return analyzer.analyze_segment(video_path, start, end)
+
+
+def probe_duration(video_path: str) -> Optional[float]:
+    """Duration in seconds if the container is seekable by timestamp, else None"""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if not cap.isOpened():
+            return None
+        frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        if frame_count <= 0 or fps <= 0 or fps > 240:
+            return None
+
+        # Segments rely on real per-frame timestamps after a seek
+        cap.grab()
+        cap.grab()
+        if cap.get(cv2.CAP_PROP_POS_MSEC) <= 0:
+            return None
+        return frame_count / fps
+    finally:
+        cap.release()
+
+
+def plan_segments(duration: float, segment_seconds: float) -> List[Tuple[float, float]]:
+    """Split [0, duration) into whole-second segments; the last one is open-ended"""
+    segment_seconds = max(1.0, float(math.ceil(segment_seconds)))
+    count = max(1, math.ceil(duration / segment_seconds))
+    return [
+        (i * segment_seconds, (i + 1) * segment_seconds if i < count - 1 else math.inf)
+        for i in range(count)
+    ]
+
+
+def merge_segments(segments: List[Dict[str, Any]], object_hz: float, face_hz: float) -> List[tuple]:
+    """Concatenate segment recordings in time order.
+    Each segment samples from its own start, so when a 1/hz slot straddles a
+    cut the later segment picks a second frame from it; that duplicate is
+    dropped to match the sequential sampler's first-frame-per-slot choice."""
+    rates = {'objects': object_hz, 'faces': face_hz}
+    last_slots = {'objects': None, 'faces': None}
+    calls = []
+
+    for segment in sorted(segments, key=lambda s: s['start']):
+        for kind, timestamp, payload in segment['calls']:
+            hz = rates[kind]
+            if hz and hz > 0:
+                slot = math.floor(timestamp * hz + 1e-6)
+                if slot == last_slots[kind]:
+                    continue
+                last_slots[kind] = slot
+            calls.append((kind, timestamp, payload))
+    return calls
+
+
+def plan_video(analyzer, video_path: str, workers: int,
+               segment_seconds: Optional[float] = None) -> List[Tuple[float, float]]:
+    """Segments to analyze `video_path` in, or [] to analyze it in one pass: with fewer
+    than 2 workers, segments shorter than MIN_SEGMENT_SECONDS, a container that can't be
+    seeked by timestamp, or a video that fits in one segment"""
+    segment_seconds = segment_seconds or analyzer.SEGMENT_SECONDS
+    if workers < 2 or segment_seconds < MIN_SEGMENT_SECONDS:
+        return []
+    duration = probe_duration(video_path)
+    segments = plan_segments(duration, segment_seconds) if duration else []
+    return segments if len(segments) >= 2 else []
+
+
+def process_video_chunked(analyzer, video_path: str, workers: Optional[int] = None,
+                          segment_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """Analyze `video_path` in parallel time segments on a pool started for it; falls
+    back to analyzer.process_video when plan_video finds nothing to split (segments
+    under MIN_SEGMENT_SECONDS included)."""
+    workers = workers or os.cpu_count() or 1
+    segments = plan_video(analyzer, video_path, workers, segment_seconds)
+    if not segments:
+        return analyzer.process_video(video_path)
+
+    analyzer.profiler = Profiler()
+    print(f"Processing video: {video_path} in {len(segments)} segments on {workers} workers")
+    workers = min(workers, len(segments))
+    ctx = multiprocessing.get_context("spawn")
+    config = analyzer.config()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(config, max(1, (os.cpu_count() or 1) // workers)),
+    ) as pool:
+        futures = [pool.submit(analyze_segment, video_path, start, end, config) for start, end in segments]
+        results = [future.result() for future in futures]
+    return report_from_segments(analyzer, video_path, results)
+
+
+def report_from_segments(analyzer, video_path: str, results: List[Dict[str, Any]],
+                         wall_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """Stitch analyze_segment results into the report of the whole video. Stage samples
+    are merged into analyzer.profiler; wall time is that profiler's unless given."""
+    from video_processor import SignalRecorder
+
+    results = sorted(results, key=lambda r: r['start'])
+    calls = merge_segments(results, analyzer.OBJECT_SAMPLE_HZ, analyzer.FACE_SAMPLE_HZ)
+
+    fps = results[0]['stats']['fps']
+    session = analyzer.new_session(fps)
+    recorder = analyzer.new_timeline_recorder(session)
+    SignalRecorder.replay(calls, recorder)
+
+    stats = {
+        'fps': fps,
+        'frames_decoded': sum(r['stats']['frames_decoded'] for r in results),
+        'object_frames': sum(1 for kind, _, _ in calls if kind == 'objects'),
+        'face_frames': sum(1 for kind, _, _ in calls if kind == 'faces'),
+        'gated_object_frames': sum(r['stats']['gated_object_frames'] for r in results),
+        'gated_face_frames': sum(r['stats']['gated_face_frames'] for r in results),
+        'tracked_object_frames': sum(r['stats']['tracked_object_frames'] for r in results),
+        'track_redetections': sum(r['stats']['track_redetections'] for r in results),
+    }
+    last_timestamps = [r['stats']['last_timestamp'] for r in results if r['stats']['last_timestamp'] is not None]
+    duration = max(last_timestamps) + 1.0 / fps if last_timestamps else 0.0
+    session.current_frame = stats['frames_decoded']
+
+    info = analyzer._video_info(stats)
+    info['segments'] = len(results)
+    report = analyzer.build_report(session, video_path, stats['frames_decoded'], duration, info)
+    report['timeline'] = recorder.timeline(
+        {'fps': fps, 'frames': stats['frames_decoded'], 'duration': duration}).to_base64()
+
+    # Stage totals are summed over workers; wall time and frames/sec are end to end
+    for result in results:
+        analyzer.profiler.merge(result['perf_samples'])
+    peaks = [r['peak_rss'] for r in results if r['peak_rss']]
+    report['perf'] = analyzer.profiler.summary(stats['frames_decoded'], wall_seconds,
+                                               peak_rss=max(peaks) if peaks else None)
+    return report
@@ -0,0 +1,95 @@
+"""
+Async access to the reports database.
+pymongo calls block, so every query runs on a dedicated thread pool sized to
+the connection pool; the event loop only awaits them. One ReportStore is
+created in the app lifespan and shared through app.state.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import MongoClient
+from pymongo.write_concern import WriteConcern
+
+import reports
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+# MongoClient option -> environment variable. Unset variables leave the
+# driver default (or whatever DATABASE_LINK's query string says) in place.
+CLIENT_OPTIONS = {
+    "maxPoolSize": "MONGO_MAX_POOL_SIZE",
+    "minPoolSize": "MONGO_MIN_POOL_SIZE",
+    "maxIdleTimeMS": "MONGO_MAX_IDLE_TIME_MS",
+    "connectTimeoutMS": "MONGO_CONNECT_TIMEOUT_MS",
+    "serverSelectionTimeoutMS": "MONGO_SERVER_SELECTION_TIMEOUT_MS",
+    "socketTimeoutMS": "MONGO_SOCKET_TIMEOUT_MS",
+    # Client-side deadline for a whole operation, retries included
+    "timeoutMS": "MONGO_TIMEOUT_MS",
+}
+
+
+def mongo_settings() -> Dict[str, Any]:
+    """MongoClient options from the environment"""
+    settings = {option: _env_int(name) for option, name in CLIENT_OPTIONS.items()}
+    return {option: value for option, value in settings.items() if value is not None}
+
+
+def write_concern() -> Optional[WriteConcern]:
+    """Write concern for report inserts, or None to keep the client's"""
+    w = os.getenv("MONGO_WRITE_CONCERN")
+    wtimeout = _env_int("MONGO_WRITE_TIMEOUT_MS")
+    journal = os.getenv("MONGO_JOURNAL")
+    if w is None and wtimeout is None and journal is None:
+        return None
+    return WriteConcern(
+        w=None if w is None else int(w) if w.isdigit() else w,
+        wtimeout=wtimeout,
+        j=None if journal is None else journal == "1",
+    )
+
+
+class ReportStore:
+    def __init__(self, uri: str, database: str = "tutedude", collection: str = "Logs",
+                 settings: Optional[Dict[str, Any]] = None):
+        self.client = MongoClient(uri, **(mongo_settings() if settings is None else settings))
+        self.collection = self.client[database].get_collection(collection, write_concern=write_concern())
+
+        # At most one thread per pooled connection (more would only queue on the pool)
+        pool_size = self.client.options.pool_options.max_pool_size
+        self._executor = ThreadPoolExecutor(max_workers=min(pool_size or 32, 32),
+                                            thread_name_prefix="mongo")
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.client.close()
+
+    async def ensure_indexes(self):
+        await self._run(reports.ensure_indexes, self.collection)
+
+    async def insert_report(self, doc: Dict[str, Any]):
+        result = await self._run(self.collection.insert_one, doc)
+        return result.inserted_id
+
+    async def find_by_filename(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Newest report for an uploaded file"""
+        return await self._run(self.collection.find_one, {"video_file": filename}, sort=[("created_at", -1)])
+
+    async def find_by_id(self, report_id: str) -> Optional[Dict[str, Any]]:
+        return await self._run(self.collection.find_one, {"_id": ObjectId(report_id)})
+
+    async def list_reports(self, query: Dict[str, Any], limit: int,
+                           full: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        return await self._run(reports.fetch_page, self.collection, query, limit, full)
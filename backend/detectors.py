@@ -0,0 +1,219 @@
+"""
+Object detector backends.
+VideoProctoringAnalyzer talks to an object detector only through predict(),
+which returns per-frame (class ids, confidences, xyxy boxes) as numpy arrays
+in original-frame pixel coordinates. Two backends implement it:
+
+- ultralytics: the PyTorch model, as before
+- onnx: an exported YOLOv8 model run with ONNX Runtime on the CPU, optionally
+  with int8 weights. Pre- and post-processing follow Ultralytics (stride-aligned
+  letterbox, class-aware NMS), but only boxes of the target classes are decoded
+  and go through NMS.
+
+Export a model for the onnx backend (from backend/):
+    python detectors.py yolov8m.pt [--imgsz 640] [--int8]
+"""
+
+import argparse
+import ast
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+BACKENDS = ("ultralytics", "onnx")
+
+# Ultralytics predict() defaults, so both backends filter the same way
+DEFAULT_CONFIDENCE = 0.25
+NMS_IOU = 0.7
+MAX_DETECTIONS = 300
+STRIDE = 32
+
+# Per-frame detections: class ids, confidences, xyxy boxes
+Detections = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def onnx_path(weights: str, int8: bool = False) -> str:
+    """Exported model path for a weights file: yolov8m.pt -> yolov8m.onnx (or yolov8m.int8.onnx)"""
+    if weights.endswith(".onnx"):
+        return weights
+    stem = os.path.splitext(weights)[0]
+    return f"{stem}.int8.onnx" if int8 else f"{stem}.onnx"
+
+
+class UltralyticsDetector:
+    def __init__(self, model):
+        self.model = model
+        self.names: Dict[int, str] = model.names
+        self.path = getattr(model, "ckpt_path", None)
+
+        # Ultralytics predictors keep per-call state, so inference on the
+        # shared model is serialized through this lock.
+        self._lock = threading.Lock()
+
+    def predict(self, frames: List[np.ndarray], imgsz: int, conf: Optional[float] = None,
+                classes: Optional[Sequence[int]] = None) -> List[Detections]:
+        args = {"imgsz": imgsz}
+        if conf is not None:
+            args["conf"] = conf
+        if classes is not None:
+            # Filtered inside NMS, after each box has taken its best class, as OnnxDetector does
+            args["classes"] = [int(c) for c in classes]
+        with self._lock:
+            results = self.model(frames, verbose=False, **args)
+
+        detections = []
+        for result in results:
+            boxes = result.boxes
+            if boxes is None or not len(boxes):
+                detections.append((np.empty(0, int), np.empty(0, np.float32), np.empty((0, 4), np.float32)))
+                continue
+            # One device->host copy per frame
+            detections.append((boxes.cls.cpu().numpy().astype(int),
+                               boxes.conf.cpu().numpy(),
+                               boxes.xyxy.cpu().numpy()))
+        return detections
+
+
+class OnnxDetector:
+    def __init__(self, path: str, intra_op_threads: Optional[int] = None,
+                 inter_op_threads: Optional[int] = None):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise ImportError("DETECTOR_BACKEND=onnx needs onnxruntime (pip install onnxruntime)")
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"ONNX model not found: {path} (export it with: python detectors.py <weights>)")
+
+        options = ort.SessionOptions()
+        # The environment wins over the caller's default; 0 lets ONNX Runtime decide
+        options.intra_op_num_threads = int(os.getenv("ONNX_INTRA_OP_THREADS", "0")) or intra_op_threads or 0
+        options.inter_op_num_threads = int(os.getenv("ONNX_INTER_OP_THREADS", "0")) or inter_op_threads or 0
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.path = path
+
+        # Ultralytics stores the class names in the model metadata as a dict literal
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names: Dict[int, str] = ast.literal_eval(metadata["names"]) if "names" in metadata else {}
+
+        model_input = self.session.get_inputs()[0]
+        self._input_name = model_input.name
+        # Static exports fix the input size; dynamic ones take whatever imgsz is asked for
+        height, width = model_input.shape[2:4]
+        self._fixed_size = (height, width) if isinstance(height, int) and isinstance(width, int) else None
+
+        # Letterbox canvas and input tensor, reused across calls; per thread,
+        # since live sessions share one detector
+        self._buffers = threading.local()
+
+    def _input_buffers(self, batch_size: int, size: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+        """This thread's letterbox canvas and input tensor for a batch, allocated on first use"""
+        buffers = self._buffers
+        if not hasattr(buffers, "tensors"):
+            buffers.canvases, buffers.tensors = {}, {}
+        if size not in buffers.canvases:
+            buffers.canvases[size] = np.empty((size[0], size[1], 3), np.uint8)
+        if (batch_size, size) not in buffers.tensors:
+            buffers.tensors[batch_size, size] = np.empty((batch_size, 3, size[0], size[1]), np.float32)
+        return buffers.canvases[size], buffers.tensors[batch_size, size]
+
+    def _input_size(self, frames: List[np.ndarray], imgsz: int) -> Tuple[int, int]:
+        """Network input (height, width) for a batch"""
+        if self._fixed_size:
+            return self._fixed_size
+        shapes = {frame.shape[:2] for frame in frames}
+        if len(shapes) > 1:
+            return imgsz, imgsz
+        # Like Ultralytics: scale the long side to imgsz, pad the short one only up to the stride
+        height, width = shapes.pop()
+        gain = min(imgsz / height, imgsz / width)
+        return (int(np.ceil(round(height * gain) / STRIDE) * STRIDE),
+                int(np.ceil(round(width * gain) / STRIDE) * STRIDE))
+
+    def _letterbox(self, frame: np.ndarray, size: Tuple[int, int], out: np.ndarray) -> Tuple[float, float, float]:
+        """Resize `frame` into `out` (HWC, grey padded) keeping its aspect ratio; returns (gain, pad_x, pad_y)"""
+        height, width = frame.shape[:2]
+        gain = min(size[0] / height, size[1] / width)
+        new_w, new_h = int(round(width * gain)), int(round(height * gain))
+        pad_x, pad_y = (size[1] - new_w) / 2, (size[0] - new_h) / 2
+        top, left = int(round(pad_y - 0.1)), int(round(pad_x - 0.1))
+        out[:] = 114
+        resized = frame if (new_w, new_h) == (width, height) else cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+        out[top:top + new_h, left:left + new_w] = resized
+        return gain, left, top
+
+    def predict(self, frames: List[np.ndarray], imgsz: int, conf: Optional[float] = None,
+                classes: Optional[Sequence[int]] = None) -> List[Detections]:
+        conf = DEFAULT_CONFIDENCE if conf is None else conf
+        size = self._input_size(frames, imgsz)
+
+        canvas, batch = self._input_buffers(len(frames), size)
+        transforms = []
+        for i, frame in enumerate(frames):
+            transforms.append(self._letterbox(frame, size, canvas))
+            # BGR HWC uint8 -> RGB CHW float in [0, 1]
+            np.multiply(canvas[:, :, ::-1].transpose(2, 0, 1), 1 / 255.0, out=batch[i])
+
+        # YOLOv8 output: (batch, 4 + classes, anchors) with cx, cy, w, h boxes
+        output = self.session.run(None, {self._input_name: batch})[0]
+
+        detections = []
+        for frame, prediction, (gain, pad_x, pad_y) in zip(frames, output, transforms):
+            # Each box takes its best class over all classes (as Ultralytics does);
+            # boxes whose best class isn't a target are dropped before NMS
+            scores = prediction[4:]
+            best = scores.argmax(0)
+            best_conf = scores[best, np.arange(scores.shape[1])]
+            keep = best_conf >= conf
+            if classes is not None:
+                keep &= np.isin(best, classes)
+            if not keep.any():
+                detections.append((np.empty(0, int), np.empty(0, np.float32), np.empty((0, 4), np.float32)))
+                continue
+
+            cls = best[keep]
+            scores = best_conf[keep]
+            cx, cy, w, h = prediction[:4, keep]
+            xywh = np.stack([cx - w / 2, cy - h / 2, w, h], axis=1)
+            selected = cv2.dnn.NMSBoxesBatched(xywh.tolist(), scores.tolist(), cls.tolist(), conf, NMS_IOU)
+            selected = np.asarray(selected, int).reshape(-1)[:MAX_DETECTIONS]
+
+            # Undo the letterbox so boxes are in original-frame pixels
+            xyxy = xywh[selected].copy()
+            xyxy[:, 2:] += xyxy[:, :2]
+            xyxy -= [pad_x, pad_y, pad_x, pad_y]
+            xyxy /= gain
+            frame_h, frame_w = frame.shape[:2]
+            np.clip(xyxy, 0, [frame_w, frame_h, frame_w, frame_h], out=xyxy)
+            detections.append((cls[selected], scores[selected], xyxy))
+        return detections
+
+
+def export_onnx(weights: str, imgsz: int = 640, int8: bool = False) -> str:
+    """Export `weights` to ONNX next to it (and quantize to int8 if asked); returns the model path"""
+    from ultralytics import YOLO
+
+    exported = YOLO(weights).export(format="onnx", imgsz=imgsz, dynamic=True)
+    if not int8:
+        return exported
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    quantized = onnx_path(weights, int8=True)
+    quantize_dynamic(exported, quantized, weight_type=QuantType.QUInt8)
+    return quantized
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("weights")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--int8", action="store_true", help="also write int8-quantized weights")
+    args = parser.parse_args()
+    print(f"✅ Exported {export_onnx(args.weights, args.imgsz, args.int8)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Frame-difference gate.
+Proctoring video is mostly a person sitting still. Each sampled frame is
+reduced to a small grayscale thumbnail and compared with the last frame a
+detector actually ran on; while the scene hasn't changed, that detector's
+previous result is carried forward so the trackers keep advancing without
+running inference.
+"""
+
+from typing import Any, Dict, Optional
+
+import cv2
+import numpy as np
+
+# How a due detector should treat a sampled frame
+DETECT = 'detect'
+REUSE = 'reuse'
+
+
+class FrameGate:
+    def __init__(self, threshold: float, recheck_seconds: float,
+                 thumbnail_size: int = 64, pixel_delta: int = 15):
+        # Fraction of thumbnail pixels that must change for the scene to count as changed; 0 disables
+        self.threshold = threshold
+        # Always re-run a detector after this long, however static the scene
+        self.recheck_seconds = recheck_seconds
+        self.thumbnail_size = thumbnail_size
+        self.pixel_delta = pixel_delta
+
+        # Per detector: (thumbnail, timestamp) of the last frame it analyzed
+        self._references: Dict[str, Optional[tuple]] = {'objects': None, 'faces': None}
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        # A cheap linear shrink to twice the size first: INTER_AREA straight from
+        # full resolution costs milliseconds per frame
+        size = self.thumbnail_size
+        small = cv2.resize(frame, (size * 2, size * 2), interpolation=cv2.INTER_LINEAR)
+        small = cv2.resize(small, (size, size), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+
+    def changed_fraction(self, a: np.ndarray, b: np.ndarray) -> float:
+        return float(np.count_nonzero(cv2.absdiff(a, b) > self.pixel_delta)) / a.size
+
+    def decide(self, key: str, thumbnail: Optional[np.ndarray], timestamp: float) -> str:
+        """DETECT or REUSE for detector `key` on a frame it is due to analyze"""
+        reference = self._references[key]
+        if thumbnail is not None and reference is not None:
+            reference_thumbnail, reference_time = reference
+            if (timestamp - reference_time < self.recheck_seconds
+                    and self.changed_fraction(thumbnail, reference_thumbnail) < self.threshold):
+                return REUSE
+
+        self._references[key] = (thumbnail, timestamp)
+        return DETECT
+
+
+def carry_forward(result: Any, timestamp: float) -> Any:
+    """Re-stamp a previous detector result for a gated frame"""
+    if isinstance(result, list):
+        return [dict(detection, timestamp=timestamp) for detection in result]
+    return dict(result, timestamp=timestamp)
@@ -0,0 +1,100 @@
+"""
+Head pose and gaze from MediaPipe FaceMesh landmarks.
+FaceMesh only runs when face detection found a single face, on a crop around
+that face, and at most once per 1/hz slot of video time (slots are aligned
+to absolute time like FrameSampler's, so chunked analysis runs it on the
+same frames). Its result stands for the rest of the slot.
+
+Angles are in degrees, from the candidate's point of view: positive yaw is
+the candidate turning to their left, positive pitch is looking down. Gaze
+adds the iris offset within the eyes to the head yaw, so a candidate whose
+head is turned but whose eyes are back on the screen still counts as
+looking at it.
+"""
+
+import math
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+# FaceMesh landmark indices (refine_landmarks=True adds the iris centres)
+FOREHEAD, CHIN = 10, 152
+RIGHT_EYE_OUTER, RIGHT_EYE_INNER, RIGHT_IRIS = 33, 133, 468
+LEFT_EYE_INNER, LEFT_EYE_OUTER, LEFT_IRIS = 362, 263, 473
+
+# Fraction of the face box added on each side of the crop; FaceMesh wants the whole head
+CROP_MARGIN = 0.25
+# Head yaw equivalent of the iris sitting against an eye corner
+EYE_YAW_RANGE = 30.0
+
+DIRECTIONS = ('center', 'left', 'right', 'up', 'down')
+
+
+def face_crop(rgb_frame: np.ndarray, bbox) -> Optional[np.ndarray]:
+    """View of `rgb_frame` around a MediaPipe relative bounding box, with CROP_MARGIN added"""
+    height, width = rgb_frame.shape[:2]
+    margin_x, margin_y = bbox.width * CROP_MARGIN, bbox.height * CROP_MARGIN
+    x0 = max(0, int((bbox.xmin - margin_x) * width))
+    y0 = max(0, int((bbox.ymin - margin_y) * height))
+    x1 = min(width, int(math.ceil((bbox.xmin + bbox.width + margin_x) * width)))
+    y1 = min(height, int(math.ceil((bbox.ymin + bbox.height + margin_y) * height)))
+    if x1 - x0 < 16 or y1 - y0 < 16:
+        return None
+    return rgb_frame[y0:y1, x0:x1]
+
+
+def estimate_head_pose(landmarks, width: int, height: int) -> Dict[str, float]:
+    """Yaw, pitch and gaze yaw of one face from its FaceMesh landmarks (relative to a width x height image)"""
+    def point(index: int) -> np.ndarray:
+        # FaceMesh's z is on roughly the same scale as x
+        landmark = landmarks[index]
+        return np.array([landmark.x * width, landmark.y * height, landmark.z * width])
+
+    # Turning left pushes the left eye's outer corner away from the camera
+    eyes = point(LEFT_EYE_OUTER) - point(RIGHT_EYE_OUTER)
+    yaw = math.degrees(math.atan2(eyes[2], eyes[0]))
+    # Looking down pushes the chin back
+    face = point(CHIN) - point(FOREHEAD)
+    pitch = math.degrees(math.atan2(face[2], face[1]))
+
+    def iris_position(iris: int, first: int, second: int) -> float:
+        # 0 at the eye corner on the image's left, 1 at the one on its right
+        start, end = point(first)[0], point(second)[0]
+        return (point(iris)[0] - start) / (end - start) if end != start else 0.5
+
+    # -1..1, positive towards the image's right, i.e. the candidate's left
+    iris = (iris_position(RIGHT_IRIS, RIGHT_EYE_OUTER, RIGHT_EYE_INNER)
+            + iris_position(LEFT_IRIS, LEFT_EYE_INNER, LEFT_EYE_OUTER)) - 1.0
+    return {
+        'yaw': round(yaw, 1),
+        'pitch': round(pitch, 1),
+        'gaze_yaw': round(yaw + float(np.clip(iris, -1.0, 1.0)) * EYE_YAW_RANGE, 1),
+    }
+
+
+def gaze_direction(pose: Dict[str, float], yaw_limit: float, pitch_limit: float) -> str:
+    """One of DIRECTIONS for a head pose: where the candidate is looking relative to the screen"""
+    if abs(pose['gaze_yaw']) > yaw_limit:
+        return 'left' if pose['gaze_yaw'] > 0 else 'right'
+    if abs(pose['pitch']) > pitch_limit:
+        return 'down' if pose['pitch'] > 0 else 'up'
+    return 'center'
+
+
+class HeadPoseSampler:
+    """Per-video FaceMesh schedule: the first single-face frame of each 1/hz slot runs it"""
+
+    def __init__(self, hz: float):
+        self.hz = hz
+        self._slot: Optional[int] = None
+        self._pose: Optional[Dict[str, Any]] = None
+
+    def pose(self, timestamp: float, estimate: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Head pose for a single-face frame: a fresh estimate() if the slot hasn't had one yet"""
+        if not self.hz or self.hz <= 0:
+            return estimate()
+        slot = math.floor(timestamp * self.hz + 1e-6)
+        if slot != self._slot:
+            self._slot = slot
+            self._pose = estimate()
+        return self._pose
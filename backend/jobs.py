@@ -0,0 +1,249 @@
+"""
+Background analysis jobs.
+/upload enqueues a job and returns immediately; a pool of worker processes,
+each holding its own warm model registry, drains the queue. With
+CHUNKED_ANALYSIS on, long seekable uploads are split into time segments that
+are queued on the same pool (see chunked.py).
+"""
+
+import asyncio
+import multiprocessing
+import os
+import queue
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from metrics import METRICS
+
+# Finished jobs are kept around this long so clients can still poll them
+JOB_TTL_SECONDS = 3600
+
+# Only report progress to the parent every N frames to keep IPC cheap
+PROGRESS_EVERY_FRAMES = 25
+
+# Set inside each worker process by _init_worker
+_worker_progress = None
+
+
+def _init_worker(progress: multiprocessing.Queue, threads_per_worker: int):
+    """Load the models once per worker process"""
+    global _worker_progress
+    _worker_progress = progress
+
+    # Split the cores between workers instead of letting each one grab them all
+    from model_registry import get_registry, limit_threads
+    from video_processor import VideoProctoringAnalyzer
+    limit_threads(threads_per_worker)
+    analyzer = VideoProctoringAnalyzer()
+    get_registry().load(analyzer.object_weights(), analyzer.DETECTOR_BACKEND)
+    if os.getenv("MODEL_WARM_UP", "1") == "1":
+        analyzer.warm_up()
+
+
+def _warm_up() -> int:
+    return os.getpid()
+
+
+def _fingerprint() -> str:
+    from video_processor import VideoProctoringAnalyzer
+    return VideoProctoringAnalyzer().fingerprint()
+
+
+def _analyze_video(job_id: str, video_path: str):
+    """Runs inside a worker process; returns the report and its stage histograms"""
+    from video_processor import VideoProctoringAnalyzer
+
+    def report_progress(current_frame: int, total_frames: Optional[int]):
+        if current_frame % PROGRESS_EVERY_FRAMES == 0:
+            _worker_progress.put((job_id, current_frame, total_frames))
+
+    _worker_progress.put((job_id, 0, None))
+    analyzer = VideoProctoringAnalyzer()
+    report = analyzer.process_video(video_path, progress_callback=report_progress)
+    return report, analyzer.profiler.histograms()
+
+
+def _plan_segments(video_path: str, workers: int) -> List[Tuple[float, float]]:
+    from chunked import plan_video
+    from video_processor import VideoProctoringAnalyzer
+    return plan_video(VideoProctoringAnalyzer(), video_path, workers)
+
+
+def _analyze_segment(video_path: str, start: float, end: float) -> Dict[str, Any]:
+    from chunked import analyze_segment
+    return analyze_segment(video_path, start, end)
+
+
+def _merge_segments(video_path: str, results: List[Dict[str, Any]], wall_seconds: float):
+    """Runs inside a worker process; same return value as _analyze_video"""
+    from chunked import report_from_segments
+    from video_processor import VideoProctoringAnalyzer
+
+    analyzer = VideoProctoringAnalyzer()
+    report = report_from_segments(analyzer, video_path, results, wall_seconds)
+    return report, analyzer.profiler.histograms()
+
+
+class JobManager:
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or int(os.getenv("ANALYSIS_WORKERS", "2"))
+        # Split long uploads into SEGMENT_SECONDS segments analyzed across the pool
+        self.chunked = os.getenv("CHUNKED_ANALYSIS", "0") == "1"
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._tasks = set()
+        self._fingerprint = None
+        self._warm_ups = []
+
+        # spawn, not fork: the parent runs an event loop and threads
+        self._ctx = multiprocessing.get_context("spawn")
+
+        # Workers push (job_id, current_frame, total_frames); the latest per job is kept here.
+        # A plain queue rather than a Manager dict, so startup doesn't wait for a server process.
+        self._progress_queue = self._ctx.Queue()
+        self._progress: Dict[str, tuple] = {}
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=self._ctx,
+            initializer=_init_worker,
+            initargs=(self._progress_queue, max(1, (os.cpu_count() or 1) // self.max_workers)),
+        )
+
+    def start(self):
+        """Start every worker now so models are loaded before the first upload"""
+        self._warm_ups = [self._executor.submit(_warm_up) for _ in range(self.max_workers)]
+        self._fingerprint = self._executor.submit(_fingerprint)
+
+    def readiness(self) -> Dict[str, Any]:
+        """How many workers have loaded (and warmed up) their models, and the first startup error"""
+        done = [future for future in self._warm_ups if future.done()]
+        errors = [str(future.exception()) for future in done if future.exception() is not None]
+        return {
+            "workers": self.max_workers,
+            "workers_ready": len(done) - len(errors),
+            "error": errors[0] if errors else None,
+        }
+
+    async def fingerprint(self) -> str:
+        """Analyzer fingerprint of the workers (same settings in every worker, so computed once)"""
+        if self._fingerprint is None or (self._fingerprint.done() and self._fingerprint.exception()):
+            self._fingerprint = self._executor.submit(_fingerprint)
+        return await asyncio.wrap_future(self._fingerprint)
+
+    def shutdown(self):
+        for task in list(self._tasks):
+            task.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._progress_queue.close()
+        self._progress_queue.cancel_join_thread()
+
+    def create(self, **fields) -> Dict[str, Any]:
+        self._prune()
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "created_at": time.time(),
+            "updated_at": time.time(),
+            "error": None,
+            **fields,
+        }
+        self.jobs[job_id] = job
+        return job
+
+    def update(self, job_id: str, **fields):
+        job = self.jobs.get(job_id)
+        if job is not None:
+            job.update(fields, updated_at=time.time())
+
+    def spawn(self, coro):
+        """Run a job coroutine in the background, keeping a reference to it"""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def analyze(self, job_id: str, video_path: str, seekable: bool = True) -> Dict[str, Any]:
+        """Run VideoProctoringAnalyzer.process_video in the worker pool, or chunked analysis
+        across it when enabled and `video_path` is a seekable file (not an upload stream)"""
+        loop = asyncio.get_running_loop()
+        try:
+            segments = []
+            if self.chunked and seekable and self.max_workers > 1:
+                segments = await loop.run_in_executor(self._executor, _plan_segments, video_path, self.max_workers)
+            if segments:
+                report, histograms = await self._analyze_segments(job_id, video_path, segments)
+            else:
+                report, histograms = await loop.run_in_executor(self._executor, _analyze_video, job_id, video_path)
+        except Exception:
+            METRICS.inc('videos_failed_total', help_text='Analyses that raised an error')
+            raise
+        finally:
+            self._drain_progress()
+            self._progress.pop(job_id, None)
+
+        METRICS.record_report(report, histograms)
+        return report
+
+    async def _analyze_segments(self, job_id: str, video_path: str, segments: List[Tuple[float, float]]):
+        """Queue every segment on the warm workers, then stitch them in one more worker"""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        print(f"Processing video: {video_path} in {len(segments)} segments on {self.max_workers} workers")
+        # Segments don't report frames, so the job just shows as processing
+        self._progress[job_id] = (0, None)
+        results = await asyncio.gather(*(
+            loop.run_in_executor(self._executor, _analyze_segment, video_path, start, end)
+            for start, end in segments
+        ))
+        return await loop.run_in_executor(
+            self._executor, _merge_segments, video_path, list(results), time.perf_counter() - started)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        if job["status"] in ("queued", "processing"):
+            self._record_progress(job_id)
+        return dict(job)
+
+    def _drain_progress(self):
+        while True:
+            try:
+                job_id, current_frame, total_frames = self._progress_queue.get_nowait()
+            except (queue.Empty, OSError, ValueError):
+                return
+            self._progress[job_id] = (current_frame, total_frames)
+
+    def _record_progress(self, job_id: str):
+        # The worker only publishes progress once it has picked the job up
+        self._drain_progress()
+        reported = self._progress.get(job_id)
+        if reported is None:
+            return
+        current_frame, total_frames = reported
+        progress = None
+        if total_frames:
+            progress = round(min(1.0, current_frame / total_frames), 4)
+        self.update(job_id, status="processing", current_frame=current_frame,
+                    total_frames=total_frames, progress=progress)
+
+    def export_metrics(self):
+        """Publish current job counts by status as gauges"""
+        counts = {status: 0 for status in ("receiving", "queued", "processing", "saving")}
+        for job in self.jobs.values():
+            if job["status"] in counts:
+                counts[job["status"]] += 1
+        for status, count in counts.items():
+            METRICS.set('jobs', count, help_text='Upload jobs currently in each state', status=status)
+
+    def _prune(self):
+        cutoff = time.time() - JOB_TTL_SECONDS
+        for job_id, job in list(self.jobs.items()):
+            if job["status"] in ("completed", "failed") and job["updated_at"] < cutoff:
+                del self.jobs[job_id]
+        # Progress that arrived after its job finished
+        for job_id in list(self._progress):
+            if self.jobs.get(job_id, {}).get("status") not in ("queued", "processing"):
+                del self._progress[job_id]
@@ -0,0 +1,223 @@
+"""
+Live proctoring over streamed frames.
+The candidate's page sends JPEG frames over a WebSocket while the interview
+runs; each live session feeds them through an incremental analyzer on a
+small thread pool and pushes every event to subscribed interviewer sockets
+as it fires. The report is built as frames arrive, so it is ready as soon
+as the session ends.
+
+Ingest messages are binary: an 8-byte little-endian float64 capture time in
+seconds, followed by the JPEG bytes. A text message {"type": "end"} closes
+the session.
+"""
+
+import asyncio
+import json
+import os
+import struct
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+# Ended sessions stay readable this long; idle ones are closed after it
+LIVE_SESSION_TTL_SECONDS = 3600
+
+TIMESTAMP_HEADER = struct.Struct("<d")
+
+
+def _new_live_analysis():
+    from video_processor import VideoProctoringAnalyzer
+
+    # A fresh analyzer per session so its profiler only sees this session's frames
+    return VideoProctoringAnalyzer().new_live_analysis()
+
+
+def _warm_up_models():
+    from video_processor import VideoProctoringAnalyzer
+
+    analyzer = VideoProctoringAnalyzer()
+    analyzer.registry.load(analyzer.object_weights(), analyzer.DETECTOR_BACKEND)
+    analyzer.warm_up()
+
+
+class LiveSession:
+    def __init__(self, session_id: str, queue_depth: int):
+        self.id = session_id
+        # Built off the event loop by LiveHub.create; `started` is set once it exists
+        self.analysis = None
+        self.started = asyncio.Event()
+        self.frames: asyncio.Queue = asyncio.Queue(queue_depth)
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.events: List[Dict[str, Any]] = []
+        self.report: Optional[Dict[str, Any]] = None
+        self.status = "live"
+        self.dropped_frames = 0
+        self.updated_at = time.time()
+        self.worker: Optional[asyncio.Task] = None
+
+    def publish(self, message: Dict[str, Any]):
+        for subscriber in self.subscribers:
+            subscriber.put_nowait(message)
+
+    def offer(self, timestamp: float, jpeg: bytes):
+        """Queue a frame, dropping the oldest when analysis falls behind"""
+        self.updated_at = time.time()
+        if self.frames.full():
+            self.frames.get_nowait()
+            self.dropped_frames += 1
+        self.frames.put_nowait((timestamp, jpeg))
+
+
+class LiveHub:
+    def __init__(self, threads: Optional[int] = None, queue_depth: Optional[int] = None):
+        threads = threads or int(os.getenv("LIVE_ANALYSIS_THREADS", "2"))
+        self.queue_depth = queue_depth or int(os.getenv("LIVE_QUEUE_DEPTH", "4"))
+        self.sessions: Dict[str, LiveSession] = {}
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="live")
+
+        # Called with the final report when a session ends (e.g. to save it)
+        self.on_finished: Optional[Callable[[LiveSession], Awaitable[None]]] = None
+        self._warm_up: Optional[asyncio.Future] = None
+        # Notified whenever a session has started, for subscribers waiting on it
+        self._started = asyncio.Condition()
+
+    def warm_up(self):
+        """Load the models into this process in the background, ahead of the first session"""
+        self._warm_up = asyncio.get_running_loop().run_in_executor(self._executor, _warm_up_models)
+
+    @property
+    def ready(self) -> Optional[bool]:
+        """Whether the warm-up has finished; None when there is none"""
+        if self._warm_up is None:
+            return None
+        return self._warm_up.done() and self._warm_up.exception() is None
+
+    def shutdown(self):
+        for session in self.sessions.values():
+            if session.worker is not None:
+                session.worker.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def create(self, session_id: Optional[str] = None) -> LiveSession:
+        """Start a live session (or return the one already live under `session_id`)"""
+        self._prune()
+        session_id = session_id or uuid.uuid4().hex
+        session = self.sessions.get(session_id)
+        if session is not None and session.status == "live":
+            await session.started.wait()
+        else:
+            session = self.sessions[session_id] = LiveSession(session_id, self.queue_depth)
+            try:
+                # Importing OpenCV and building MediaPipe graphs would stall every other request
+                session.analysis = await asyncio.to_thread(_new_live_analysis)
+            except BaseException:
+                if self.sessions.get(session_id) is session:
+                    del self.sessions[session_id]
+                raise
+            finally:
+                session.started.set()
+            session.worker = asyncio.create_task(self._consume(session))
+            async with self._started:
+                self._started.notify_all()
+        if session.analysis is None:
+            raise RuntimeError(f"Live session {session_id} failed to start")
+        return session
+
+    def get(self, session_id: str) -> Optional[LiveSession]:
+        """The session, once started"""
+        session = self.sessions.get(session_id)
+        return session if session is not None and session.analysis is not None else None
+
+    async def wait_for(self, session_id: str) -> LiveSession:
+        """The session once its ingest has started it; subscribers may connect first"""
+        async with self._started:
+            await self._started.wait_for(lambda: self.get(session_id) is not None)
+            return self.get(session_id)
+
+    def _decode_and_feed(self, session: LiveSession, timestamp: float, jpeg: bytes) -> List[Dict[str, Any]]:
+        # Imported here so the API process starts without OpenCV
+        import cv2
+        import numpy as np
+
+        frame = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            return []
+        return session.analysis.feed(frame, timestamp)
+
+    async def _consume(self, session: LiveSession):
+        """Analyze the session's frames in arrival order, one at a time"""
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await session.frames.get()
+            if item is None:
+                break
+            timestamp, jpeg = item
+            try:
+                fired = await loop.run_in_executor(self._executor, self._decode_and_feed, session, timestamp, jpeg)
+            except Exception as e:
+                print(f"⚠️ Live analysis error in session {session.id}: {e}")
+                continue
+            for event in fired:
+                session.events.append(event)
+                session.publish({"type": "event", "event": event})
+
+        session.report = session.analysis.report(f"live:{session.id}")
+        session.report["video_info"]["dropped_frames"] = session.dropped_frames
+        session.status = "ended"
+        session.updated_at = time.time()
+        session.publish({"type": "report", "report": session.report})
+        if self.on_finished is not None:
+            try:
+                await self.on_finished(session)
+            except Exception as e:
+                print(f"❌ Failed to store live report {session.id}: {e}")
+
+    async def end(self, session: LiveSession) -> Dict[str, Any]:
+        """Stop ingesting and wait for the final report"""
+        if session.status == "live":
+            session.status = "ending"
+            # The end marker must not be dropped, so wait for room behind queued frames
+            await session.frames.put(None)
+        if session.worker is not None:
+            await asyncio.shield(session.worker)
+        return session.report
+
+    async def ingest(self, session: LiveSession, receive: Callable[[], Awaitable[Dict[str, Any]]]):
+        """Read ingest messages until the client ends the session or disconnects"""
+        while session.status == "live":
+            message = await receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            data = message.get("bytes")
+            if data is not None and len(data) > TIMESTAMP_HEADER.size:
+                (timestamp,) = TIMESTAMP_HEADER.unpack_from(data)
+                session.offer(timestamp, data[TIMESTAMP_HEADER.size:])
+            elif message.get("text"):
+                try:
+                    control = json.loads(message["text"])
+                except ValueError:
+                    continue
+                if control.get("type") == "end":
+                    break
+
+    def subscribe(self, session: LiveSession) -> asyncio.Queue:
+        """Queue of {"type": "event"|"report", ...} messages; starts with the backlog"""
+        queue: asyncio.Queue = asyncio.Queue()
+        for event in session.events:
+            queue.put_nowait({"type": "event", "event": event})
+        if session.report is not None:
+            queue.put_nowait({"type": "report", "report": session.report})
+        session.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, session: LiveSession, queue: asyncio.Queue):
+        session.subscribers.discard(queue)
+
+    def _prune(self):
+        cutoff = time.time() - LIVE_SESSION_TTL_SECONDS
+        for session_id, session in list(self.sessions.items()):
+            if session.updated_at < cutoff and not session.subscribers:
+                if session.worker is not None:
+                    session.worker.cancel()
+                del self.sessions[session_id]
@@ -1,15 +1,72 @@
 import asyncio
-from fastapi import FastAPI, Request, UploadFile, File
-from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Path, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 import os
-from typing import Dict, Any
+from typing import Annotated, Dict, Any, Optional
 from dotenv import load_dotenv
-from pymongo import MongoClient
+from bson import ObjectId
 import cloudinary
 import cloudinary.uploader
+from jobs import JobManager
+from metrics import METRICS
+from database import ReportStore
+from signaling import DEFAULT_ROOM, ROOM_ID_PATTERN, RoomStore
+from live import LiveHub, LiveSession
+from result_cache import ResultCache, cache_key
+import reports
 load_dotenv()
-app = FastAPI()
+
+
+async def create_indexes(db: ReportStore):
+    try:
+        await db.ensure_indexes()
+    except Exception as e:
+        print(f"⚠️ Could not create MongoDB indexes: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Nothing here waits on models or MongoDB, so signaling is served right away;
+    # /ready reports when analysis workers have loaded (and warmed up) their models.
+
+    # Analysis runs in worker processes; each loads YOLO + MediaPipe once at start
+    app.state.jobs = JobManager()
+    app.state.jobs.start()
+
+    # Reports of previously analyzed uploads, keyed on content + analyzer settings
+    app.state.result_cache = ResultCache()
+
+    # Two-role signaling (Candidate and Interviewer), one room per interview
+    app.state.rooms = RoomStore(
+        ttl_seconds=float(os.getenv("SIGNALING_ROOM_TTL_SECONDS", "600")),
+        long_poll_seconds=float(os.getenv("SIGNALING_LONG_POLL_SECONDS", "25")),
+    )
+    app.state.rooms.start()
+
+    # Establish connection to MongoDB; queries run off the event loop (see database.py)
+    try:
+        app.state.db = ReportStore(DATABASE_LINK)
+    except Exception as e:
+        print(f"❌ Could not connect to MongoDB: {e}")
+        app.state.db = None
+    if app.state.db is not None:
+        app.state.jobs.spawn(create_indexes(app.state.db))
+
+    # Live proctoring sessions; finished reports are stored like uploaded ones
+    app.state.live = LiveHub()
+    app.state.live.on_finished = store_live_report
+    if os.getenv("LIVE_WARM_UP", "0") == "1":
+        app.state.live.warm_up()
+    yield
+    app.state.live.shutdown()
+    app.state.rooms.stop()
+    app.state.jobs.shutdown()
+    if app.state.db is not None:
+        app.state.db.close()
+
+app = FastAPI(lifespan=lifespan)
 origins = ["https://tutedude-assignment-zeta.vercel.app",
            "http://localhost:8080",]
 
@@ -21,8 +78,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Two-role signaling: Candidate and Interviewer
-interview_room: Dict[str, Any] = {}
 DATABASE_LINK = os.getenv("DATABASE_LINK")
 cloudinary.config(
     cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
@@ -32,63 +87,73 @@ cloudinary.config(
 if not DATABASE_LINK:
     raise ValueError("DATABASE_LINK environment variable not set!")
 
-# Establish connection to MongoDB
-try:
-    client = MongoClient(DATABASE_LINK)
-    db = client['tutedude']  # Database name
-    sessions_collection = db.Logs  # Collection name
-    # print("✅ Successfully connected to MongoDB.")
-except Exception as e:
-    # print(f"❌ Could not connect to MongoDB: {e}")
-    client = None
-    db = None
-    sessions_collection = None
-
 # peer_connections = set()
 def serialize_mongo_document(doc):
     if "_id" in doc:
         doc["_id"] = str(doc["_id"])
     return doc
-@app.post("/candidate/offer")
-async def candidate_offer(request: Request):
+# Room ids are client-chosen; keep them short and URL-safe
+RoomId = Annotated[str, Path(pattern=ROOM_ID_PATTERN.pattern)]
+
+
+@app.post("/rooms/{room_id}/candidate/offer")
+async def room_candidate_offer(request: Request, room_id: RoomId):
     """Candidate sends their offer (camera + mic)"""
     params = await request.json()
-    interview_room["candidate_offer"] = {
-        "sdp": params["sdp"], 
+    app.state.rooms.set_offer(room_id, {
+        "sdp": params["sdp"],
         "type": params["type"]
-    }
-    print("Received offer from Candidate")
+    })
+    print(f"Received offer from Candidate in room {room_id}")
     return JSONResponse({"status": "candidate_offer_received"})
 
-@app.get("/interviewer/offer")
-async def interviewer_get_offer():
-    """Interviewer gets the candidate's offer"""
-    if "candidate_offer" in interview_room:
-        return JSONResponse(interview_room["candidate_offer"])
+@app.get("/rooms/{room_id}/interviewer/offer")
+async def room_interviewer_get_offer(room_id: RoomId, wait: Optional[float] = None):
+    """Interviewer gets the candidate's offer, waiting up to `wait` seconds for it"""
+    offer = await app.state.rooms.wait_offer(room_id, wait)
+    if offer is not None:
+        return JSONResponse(offer)
     return JSONResponse({"error": "No candidate offer available"})
 
-@app.post("/interviewer/answer")
-async def interviewer_answer(request: Request):
+@app.post("/rooms/{room_id}/interviewer/answer")
+async def room_interviewer_answer(request: Request, room_id: RoomId):
     """Interviewer sends their answer (their camera + mic)"""
     params = await request.json()
-    interview_room["interviewer_answer"] = {
+    app.state.rooms.set_answer(room_id, {
         "sdp": params["sdp"],
         "type": params["type"]
-    }
-    print("Received answer from Interviewer")
+    })
+    print(f"Received answer from Interviewer in room {room_id}")
     return JSONResponse({"status": "interviewer_answer_received"})
 
-@app.get("/candidate/answer")
-async def candidate_get_answer():
-    """Candidate gets the interviewer's answer"""
-    if "interviewer_answer" in interview_room:
-        answer = interview_room.pop("interviewer_answer")
-        # Clean up the room after connection is established
-        interview_room.pop("candidate_offer", None)
+@app.get("/rooms/{room_id}/candidate/answer")
+async def room_candidate_get_answer(room_id: RoomId, wait: Optional[float] = None):
+    """Candidate gets the interviewer's answer, waiting up to `wait` seconds for it"""
+    # The room is cleaned up once the answer has been delivered
+    answer = await app.state.rooms.take_answer(room_id, wait)
+    if answer is not None:
         return JSONResponse(answer)
     return JSONResponse({"error": "No interviewer answer available"})
 
 
+# Original single-room endpoints, kept for older clients; they don't block by default
+@app.post("/candidate/offer")
+async def candidate_offer(request: Request):
+    return await room_candidate_offer(request, DEFAULT_ROOM)
+
+@app.get("/interviewer/offer")
+async def interviewer_get_offer(wait: float = 0):
+    return await room_interviewer_get_offer(DEFAULT_ROOM, wait)
+
+@app.post("/interviewer/answer")
+async def interviewer_answer(request: Request):
+    return await room_interviewer_answer(request, DEFAULT_ROOM)
+
+@app.get("/candidate/answer")
+async def candidate_get_answer(wait: float = 0):
+    return await room_candidate_get_answer(DEFAULT_ROOM, wait)
+
+
 
 # @app.post("/upload")
 # async def upload_video(file: UploadFile = File(...)):
@@ -218,39 +283,107 @@ async def candidate_get_answer():
 
 import time
 import cloudinary.uploader
+from uploads import UploadSpool, receive_upload
 
-@app.post("/upload")
-async def upload_video(file: UploadFile = File(...)):
-    try:
-        # 1️⃣ Upload directly to Cloudinary
-        upload_result = cloudinary.uploader.upload(
-            file.file,
-            resource_type="video",
-            folder="interview_videos",
-            public_id=os.path.splitext(file.filename)[0],
-            overwrite=True
-        )
-
-        cloudinary_url = upload_result.get("secure_url")
-        if not cloudinary_url:
-            raise ValueError("Cloudinary upload failed, no URL returned.")
 
-        # 2️⃣ Prepare MongoDB document
+async def lookup_cached_result(spool: UploadSpool):
+    """Result cache key for a fully received upload, and the entry stored under it if any"""
+    cache = app.state.result_cache
+    if not cache.enabled:
+        return None, None
+    try:
+        key = cache_key(spool.content_hash, await app.state.jobs.fingerprint())
+        entry = await asyncio.to_thread(cache.get, key)
+    except Exception as e:
+        print(f"⚠️ Result cache lookup failed: {e}")
+        return None, None
+    METRICS.inc("result_cache_lookups_total", help_text="Upload result cache lookups",
+                result="hit" if entry is not None else "miss")
+    return key, entry
+
+
+async def process_upload_job(job_id: str, spool: UploadSpool):
+    """Background half of /upload: analysis and Cloudinary run concurrently from the local spool"""
+    jobs = app.state.jobs
+    filename = spool.filename
+    analysis = None
+    timings = {}
+    result_key, cached = None, None
+    try:
+        # 1️⃣ Start analysis right away: streamable containers are decoded from
+        # the FIFO while the body is still arriving, others once fully spooled
+        # (and only if the same bytes haven't been analyzed before)
+        if not spool.streaming:
+            await spool.received.wait()
+            if spool.complete:
+                result_key, cached = await lookup_cached_result(spool)
+        if cached is None and (spool.complete or spool.streaming):
+            analysis = asyncio.ensure_future(
+                jobs.analyze(job_id, spool.fifo_path if spool.streaming else spool.path,
+                             seekable=not spool.streaming)
+            )
+
+        await spool.received.wait()
+        if not spool.complete:
+            raise ValueError("Upload was interrupted before the file was complete.")
+        timings["receive_seconds"] = time.perf_counter() - spool.started
+        if spool.streaming:
+            # A streamed upload's hash is only known now; a hit abandons the running analysis
+            result_key, cached = await lookup_cached_result(spool)
+            if cached is not None and analysis is not None:
+                # The decoder sees the stream end where it is, so the worker frees up
+                # quickly; a job still waiting for a worker never starts
+                spool.stop_stream()
+                analysis.cancel()
+
+        if cached is not None:
+            # ♻️ Same bytes were uploaded and analyzed before: reuse both
+            print(f"♻️ Reusing cached analysis for {filename}")
+            cloudinary_url = cached["video_url"]
+            jobs.update(job_id, cache_hit=True)
+        else:
+            # 2️⃣ Upload the same bytes to Cloudinary while analysis runs
+            started = time.perf_counter()
+            upload_result = await asyncio.to_thread(
+                cloudinary.uploader.upload,
+                spool.path,
+                resource_type="video",
+                folder="interview_videos",
+                public_id=os.path.splitext(filename)[0],
+                overwrite=True
+            )
+            timings["cloudinary_seconds"] = time.perf_counter() - started
+
+            cloudinary_url = upload_result.get("secure_url")
+            if not cloudinary_url:
+                raise ValueError("Cloudinary upload failed, no URL returned.")
+        jobs.update(job_id, cloudinary_url=cloudinary_url)
+
+        # 3️⃣ Prepare MongoDB document
         report_doc = {
-            "video_file": file.filename,
+            "video_file": filename,
             "video_url": cloudinary_url,
             "created_at": time.time(),
             "analysis_complete": False,
             "analysis_data": None,
         }
 
-        # 3️⃣ Process video directly from Cloudinary URL
         try:
-            from video_processor import VideoProctoringAnalyzer
-            analyzer = VideoProctoringAnalyzer()
-
-            # IMPORTANT: Pass URL instead of local path
-            report = analyzer.process_video(cloudinary_url)
+            if cached is not None:
+                report = cached["analysis_data"]
+                report["perf"]["cache_hit"] = True
+            else:
+                started = time.perf_counter()
+                report = await analysis
+                timings["analysis_wait_seconds"] = time.perf_counter() - started
+                report["video_info"]["path"] = cloudinary_url
+                if result_key is not None:
+                    try:
+                        await asyncio.to_thread(app.state.result_cache.put, result_key,
+                                                {"video_url": cloudinary_url, "analysis_data": report})
+                    except Exception as e:
+                        print(f"⚠️ Could not cache analysis result: {e}")
+            report["perf"]["upload"] = {key: round(value, 4) for key, value in timings.items()}
 
             report_doc.update({
                 "analysis_complete": True,
@@ -261,24 +394,167 @@ async def upload_video(file: UploadFile = File(...)):
             report_doc["error"] = str(e)
 
         # 4️⃣ Save report to MongoDB
-        if sessions_collection is not None:
+        jobs.update(job_id, status="saving")
+        if app.state.db is not None:
+            started = time.perf_counter()
             try:
-                sessions_collection.insert_one(report_doc)
+                await app.state.db.insert_report(report_doc)
                 print("✅ Report inserted into MongoDB")
             except Exception as db_error:
                 print(f"❌ Failed to insert report in DB: {db_error}")
+            timings["mongo_seconds"] = time.perf_counter() - started
+
+        for stage, key in (("receive", "receive_seconds"), ("cloudinary_upload", "cloudinary_seconds"),
+                           ("mongo_insert", "mongo_seconds")):
+            if key in timings:
+                METRICS.observe("upload_stage_seconds", timings[key],
+                                help_text="Time spent in each /upload stage", stage=stage)
+
+        jobs.update(
+            job_id,
+            status="completed",
+            timings={key: round(value, 4) for key, value in timings.items()},
+            analysis_complete=report_doc["analysis_complete"],
+            progress=1.0 if report_doc["analysis_complete"] else None,
+            error=report_doc.get("error"),
+        )
+    except Exception as e:
+        print(f"❌ Upload job {job_id} failed: {e}")
+        jobs.update(job_id, status="failed", error=str(e))
+    finally:
+        spool.cleanup()
+        if analysis is not None and not analysis.done():
+            # Let the worker drain the closed stream; its result is discarded
+            analysis.add_done_callback(lambda task: task.cancelled() or task.exception())
 
-        # 5️⃣ Return result
-        return {
-            "status": "ok",
-            "cloudinary_url": cloudinary_url,
-            "analysis_complete": report_doc["analysis_complete"],
-            "analysis_data": report_doc["analysis_data"],  # optional
-        }
 
+@app.post("/upload")
+async def upload_video(request: Request):
+    """Stream an uploaded recording into analysis; poll /jobs/{job_id} for the result"""
+    jobs = app.state.jobs
+    job = jobs.create(status="receiving", analysis_complete=False)
+
+    def start_job(filename: str) -> UploadSpool:
+        spool = UploadSpool(filename)
+        jobs.update(job["id"], status="queued", video_file=filename, streaming=spool.streaming)
+        jobs.spawn(process_upload_job(job["id"], spool))
+        return spool
+
+    try:
+        spool = await receive_upload(request, start_job)
+        if spool is None:
+            raise ValueError("No file found in upload.")
     except Exception as e:
+        jobs.update(job["id"], status="failed", error=str(e))
         return {"status": "error", "error": str(e)}
 
+    return {
+        "status": "ok",
+        "job_id": job["id"],
+        "job_status": jobs.jobs[job["id"]]["status"],
+        "video_file": spool.filename,
+    }
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status and progress of a queued /upload analysis"""
+    job = app.state.jobs.status(job_id)
+    if job is None:
+        return JSONResponse({"error": "Job not found"}, status_code=404)
+    return JSONResponse(job)
+
+
+async def store_live_report(session: LiveSession):
+    """Save a finished live session's report so /analysis and /reports can find it"""
+    METRICS.record_report(session.report, session.analysis.analyzer.profiler.histograms())
+    if app.state.db is None:
+        return
+    await app.state.db.insert_report({
+        "video_file": f"live-{session.id}",
+        "video_url": None,
+        "created_at": time.time(),
+        "analysis_complete": True,
+        "analysis_data": session.report,
+    })
+    print(f"✅ Live report {session.id} inserted into MongoDB")
+
+
+@app.websocket("/live/{session_id}/ingest")
+async def live_ingest(websocket: WebSocket, session_id: RoomId):
+    """Candidate streams timestamped JPEG frames; the session ends on {"type": "end"} or disconnect"""
+    await websocket.accept()
+    live = app.state.live
+    session = await live.create(session_id)
+    try:
+        await live.ingest(session, websocket.receive)
+    finally:
+        report = await live.end(session)
+    try:
+        await websocket.send_json({"type": "report", "report": report})
+        await websocket.close()
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+
+
+@app.websocket("/live/{session_id}/events")
+async def live_events(websocket: WebSocket, session_id: RoomId):
+    """Interviewer receives each event as it fires, then the final report"""
+    await websocket.accept()
+    live = app.state.live
+    session = await live.wait_for(session_id)
+    queue = live.subscribe(session)
+    try:
+        while True:
+            message = await queue.get()
+            await websocket.send_json(message)
+            if message["type"] == "report":
+                await websocket.close()
+                break
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        live.unsubscribe(session, queue)
+
+
+@app.get("/live/{session_id}")
+async def live_status(session_id: RoomId):
+    """Events so far, and the final report once the session has ended"""
+    session = app.state.live.get(session_id)
+    if session is None:
+        return JSONResponse({"error": "Live session not found"}, status_code=404)
+    return JSONResponse({
+        "session_id": session.id,
+        "status": session.status,
+        "events": session.events,
+        "dropped_frames": session.dropped_frames,
+        "report": session.report,
+    })
+
+
+@app.get("/health")
+async def health():
+    """Liveness: the API process is up and serving"""
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness: every analysis worker has its models loaded and warmed up"""
+    status = app.state.jobs.readiness()
+    live_ready = app.state.live.ready
+    status["live_ready"] = live_ready
+    is_ready = status["workers_ready"] == status["workers"] and live_ready is not False
+    status["status"] = "ready" if is_ready else "error" if status["error"] else "starting"
+    return JSONResponse(status, status_code=200 if is_ready else 503)
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus-style analysis counters and per-stage latency histograms"""
+    app.state.jobs.export_metrics()
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
 
 # @app.get("/analysis/{filename}")
 # async def get_analysis(filename: str):
@@ -299,11 +575,11 @@ async def upload_video(file: UploadFile = File(...)):
 @app.get("/analysis/{filename}")
 async def get_analysis(filename: str):
     """Get analysis results for a specific video file from MongoDB"""
-    if sessions_collection is None:
+    if app.state.db is None:
         return JSONResponse({"error": "Database not connected"}, status_code=500)
 
     try:
-        doc = sessions_collection.find_one({"video_file": filename})
+        doc = await app.state.db.find_by_filename(filename)
         if not doc:
             return JSONResponse({"error": "Analysis not found"}, status_code=404)
         return JSONResponse(serialize_mongo_document(doc))
@@ -335,21 +611,113 @@ async def get_analysis(filename: str):
 #     return JSONResponse({"reports": reports})
 
 @app.get("/reports")
-async def list_reports():
-    """List all available analysis reports from MongoDB"""
-    if sessions_collection is None:
+async def list_reports(
+    limit: int = reports.DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    full: bool = False,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    event_type: Optional[str] = None,
+):
+    """List analysis reports from MongoDB, newest first.
+    Returns summaries unless full=true; pass next_cursor back as cursor for the next page."""
+    if app.state.db is None:
         return JSONResponse({"error": "Database not connected"}, status_code=500)
 
     try:
-        docs = sessions_collection.find().sort("created_at", -1)
-        reports = [serialize_mongo_document(doc) for doc in docs]
-        for r in reports:
+        query = reports.build_filter(cursor, min_score, max_score, since, until, event_type)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    try:
+        docs, next_cursor = await app.state.db.list_reports(query, reports.clamp_limit(limit), full)
+        results = [serialize_mongo_document(doc) for doc in docs]
+        for r in results:
             if "video_url" in r:
                 r["video"] = r.pop("video_url")
-        return JSONResponse({"reports": reports})
+        return JSONResponse({"reports": results, "next_cursor": next_cursor})
     except Exception as e:
         return JSONResponse({"error": f"Failed to fetch reports: {str(e)}"}, status_code=500)
 
+
+@app.get("/reports/{report_id}")
+async def get_report(report_id: str):
+    """Full report document by id"""
+    if app.state.db is None:
+        return JSONResponse({"error": "Database not connected"}, status_code=500)
+    if not ObjectId.is_valid(report_id):
+        return JSONResponse({"error": "Invalid report id"}, status_code=400)
+
+    try:
+        doc = await app.state.db.find_by_id(report_id)
+        if not doc:
+            return JSONResponse({"error": "Report not found"}, status_code=404)
+        doc = serialize_mongo_document(doc)
+        if "video_url" in doc:
+            doc["video"] = doc.pop("video_url")
+        return JSONResponse(doc)
+    except Exception as e:
+        return JSONResponse({"error": f"Failed to fetch report: {str(e)}"}, status_code=500)
+
+
+def rescore_report(analysis_data: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Events and integrity report re-derived from a stored report's timeline"""
+    from timeline import Timeline
+    from video_processor import VideoProctoringAnalyzer
+
+    started = time.perf_counter()
+    analyzer = VideoProctoringAnalyzer()
+    analyzer.apply_config(overrides)
+    rescored = analyzer.report_from_timeline(Timeline.decode(analysis_data["timeline"]),
+                                             analysis_data.get("video_info"))
+    return {
+        "settings": rescored["settings"],
+        "events": rescored["events"],
+        "integrity_analysis": rescored["integrity_analysis"],
+        "summary": rescored["summary"],
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+@app.post("/reports/{report_id}/rescore")
+async def rescore(request: Request, report_id: str):
+    """Re-score a stored report under different thresholds without touching the video.
+    Body: any of video_processor.TIMELINE_SETTINGS, i.e. FACE_ABSENT_THRESHOLD,
+    FOCUS_LOST_THRESHOLD, OBJECT_PERSISTENCE_SECONDS, OBJECT_FORGET_SECONDS,
+    CONFIDENCE_THRESHOLD and TRACK_IOU_THRESHOLD (which only affects timelines
+    recorded with boxes, version 2 on). Nothing is saved."""
+    from video_processor import TIMELINE_SETTINGS
+
+    if app.state.db is None:
+        return JSONResponse({"error": "Database not connected"}, status_code=500)
+    if not ObjectId.is_valid(report_id):
+        return JSONResponse({"error": "Invalid report id"}, status_code=400)
+
+    try:
+        overrides = await request.json() if await request.body() else {}
+    except ValueError:
+        return JSONResponse({"error": "Body must be a JSON object"}, status_code=400)
+    if not isinstance(overrides, dict):
+        return JSONResponse({"error": "Body must be a JSON object"}, status_code=400)
+    unknown = sorted(set(overrides) - TIMELINE_SETTINGS)
+    if unknown:
+        return JSONResponse({"error": f"Settings that can't be re-scored: {', '.join(unknown)}"}, status_code=400)
+    if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in overrides.values()):
+        return JSONResponse({"error": "Settings must be numbers"}, status_code=400)
+
+    try:
+        doc = await app.state.db.find_by_id(report_id)
+        if not doc:
+            return JSONResponse({"error": "Report not found"}, status_code=404)
+        analysis_data = doc.get("analysis_data") or {}
+        if not analysis_data.get("timeline"):
+            return JSONResponse({"error": "Report has no timeline; re-analyze the video first"}, status_code=409)
+        return JSONResponse(await asyncio.to_thread(rescore_report, analysis_data, overrides))
+    except Exception as e:
+        return JSONResponse({"error": f"Failed to re-score report: {str(e)}"}, status_code=500)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
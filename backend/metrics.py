@@ -0,0 +1,210 @@
+"""
+Timing instrumentation for the analysis pipeline.
+A Profiler collects per-stage durations for one video and summarises them
+into the report's `perf` section; the process-wide MetricsRegistry merges
+those into counters and histograms served in Prometheus text format on /metrics.
+"""
+
+import bisect
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Histogram bucket upper bounds in seconds, shared by every stage
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Profiler:
+    """Per-video stage timings. Safe to record from several pipeline threads."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def observe(self, name: str, seconds: float, count: int = 1):
+        """Record `count` frames that together took `seconds` in stage `name`"""
+        samples = self.samples.setdefault(name, [])
+        if count == 1:
+            samples.append(seconds)
+        elif count > 1:
+            samples.extend([seconds / count] * count)
+
+    def merge(self, samples: Dict[str, List[float]]):
+        for name, values in samples.items():
+            self.samples.setdefault(name, []).extend(values)
+
+    def summary(self, frames: int, wall_seconds: Optional[float] = None,
+                peak_rss: Optional[int] = None) -> Dict[str, Any]:
+        """The report's `perf` section"""
+        if wall_seconds is None:
+            wall_seconds = time.perf_counter() - self.started
+        if peak_rss is None:
+            peak_rss = peak_rss_bytes()
+
+        import numpy as np
+
+        stages = {}
+        for name, values in self.samples.items():
+            if not values:
+                continue
+            p50, p95 = np.percentile(values, [50, 95])
+            stages[name] = {
+                'total_seconds': round(float(sum(values)), 4),
+                'count': len(values),
+                'p50_ms': round(float(p50) * 1000, 3),
+                'p95_ms': round(float(p95) * 1000, 3),
+            }
+
+        return {
+            'wall_seconds': round(wall_seconds, 4),
+            'frames_per_second': round(frames / wall_seconds, 2) if wall_seconds > 0 else None,
+            'peak_rss_mb': round(peak_rss / (1024 * 1024), 1) if peak_rss else None,
+            'stages': stages,
+        }
+
+    def histograms(self) -> Dict[str, Tuple[List[int], float, int]]:
+        """Per stage: (non-cumulative bucket counts incl. +Inf, sum, count)"""
+        import numpy as np
+
+        result = {}
+        for name, values in self.samples.items():
+            counts = np.bincount(np.searchsorted(STAGE_BUCKETS, values, side='left'),
+                                 minlength=len(STAGE_BUCKETS) + 1)
+            result[name] = (counts.tolist(), float(sum(values)), len(values))
+        return result
+
+
+class MetricsRegistry:
+    """Minimal Prometheus text-format registry for counters, gauges and histograms"""
+
+    def __init__(self, prefix: str = 'proctoring'):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._values: Dict[str, Dict[tuple, float]] = {}
+        self._histograms: Dict[str, Dict[tuple, list]] = {}
+
+    def _key(self, name: str, kind: str, help_text: str) -> str:
+        name = f'{self.prefix}_{name}'
+        self._help.setdefault(name, (kind, help_text))
+        return name
+
+    def inc(self, name: str, value: float = 1.0, help_text: str = '', **labels):
+        name = self._key(name, 'counter', help_text)
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            label_key = tuple(sorted(labels.items()))
+            series[label_key] = series.get(label_key, 0.0) + value
+
+    def set(self, name: str, value: float, help_text: str = '', **labels):
+        name = self._key(name, 'gauge', help_text)
+        with self._lock:
+            self._values.setdefault(name, {})[tuple(sorted(labels.items()))] = value
+
+    def set_max(self, name: str, value: float, help_text: str = '', **labels):
+        """Gauge that only ever goes up (e.g. peak memory)"""
+        name = self._key(name, 'gauge', help_text)
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            label_key = tuple(sorted(labels.items()))
+            series[label_key] = max(series.get(label_key, 0.0), value)
+
+    def observe(self, name: str, seconds: float, help_text: str = '', **labels):
+        counts = [0] * (len(STAGE_BUCKETS) + 1)
+        counts[bisect.bisect_left(STAGE_BUCKETS, seconds)] = 1
+        self.merge_histogram(name, (counts, seconds, 1), help_text, **labels)
+
+    def merge_histogram(self, name: str, histogram: Tuple[List[int], float, int],
+                        help_text: str = '', **labels):
+        name = self._key(name, 'histogram', help_text)
+        counts, total, count = histogram
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            label_key = tuple(sorted(labels.items()))
+            current = series.setdefault(label_key, [[0] * (len(STAGE_BUCKETS) + 1), 0.0, 0])
+            current[0] = [a + b for a, b in zip(current[0], counts)]
+            current[1] += total
+            current[2] += count
+
+    def render(self) -> str:
+        def fmt(labels: tuple, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ''
+            return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+        lines = []
+        with self._lock:
+            for name, (kind, help_text) in sorted(self._help.items()):
+                if help_text:
+                    lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                if kind == 'histogram':
+                    for labels, (counts, total, count) in self._histograms.get(name, {}).items():
+                        cumulative = 0
+                        for bound, bucket in zip(STAGE_BUCKETS, counts):
+                            cumulative += bucket
+                            lines.append(f'{name}_bucket{fmt(labels, (("le", f"{bound:g}"),))} {cumulative}')
+                        lines.append(f'{name}_bucket{fmt(labels, (("le", "+Inf"),))} {count}')
+                        lines.append(f'{name}_sum{fmt(labels)} {total:.6f}')
+                        lines.append(f'{name}_count{fmt(labels)} {count}')
+                else:
+                    for labels, value in self._values.get(name, {}).items():
+                        value = int(value) if float(value).is_integer() else value
+                        lines.append(f'{name}{fmt(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def record_report(self, report: Dict[str, Any],
+                      histograms: Optional[Dict[str, Tuple[List[int], float, int]]] = None):
+        """Fold one finished analysis into the process-wide metrics"""
+        info = report.get('video_info', {})
+        perf = report.get('perf', {})
+
+        self.inc('videos_analyzed_total', help_text='Videos analyzed to completion')
+        self.inc('frames_decoded_total', info.get('total_frames', 0),
+                 help_text='Frames decoded across all analyzed videos')
+        for detector, count in info.get('analyzed_frames', {}).items():
+            self.inc('frames_sampled_total', count,
+                     help_text='Frames due for a detector, by detector', detector=detector)
+        for detector, count in info.get('gated_frames', {}).items():
+            self.inc('frames_gated_total', count,
+                     help_text='Sampled frames whose detections were reused by the frame gate',
+                     detector=detector)
+        if perf.get('wall_seconds') is not None:
+            self.observe('video_analysis_seconds', perf['wall_seconds'],
+                         help_text='Wall time to analyze one video')
+        if perf.get('peak_rss_mb'):
+            self.set_max('worker_peak_rss_bytes', perf['peak_rss_mb'] * 1024 * 1024,
+                         help_text='Highest peak RSS reported by an analysis worker')
+        for stage, histogram in (histograms or {}).items():
+            self.merge_histogram('stage_seconds', histogram,
+                                 help_text='Per-frame latency of each analysis stage', stage=stage)
+
+
+# Process-wide registry served on /metrics
+METRICS = MetricsRegistry()
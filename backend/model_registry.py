@@ -0,0 +1,214 @@
+"""
+Process-wide model registry.
+Loads YOLO and MediaPipe once per process and hands out reusable
+detector instances to every VideoProctoringAnalyzer in that process.
+
+Ultralytics (and torch) and MediaPipe are only imported when a model is
+first loaded, so processes that never analyze video (the API process
+serving signaling) start without them. Weights are read from MODEL_DIR;
+Ultralytics may only download missing ones when MODEL_DOWNLOAD=1.
+"""
+
+import hashlib
+import os
+import sys
+import threading
+from importlib import metadata
+from typing import Dict, List, Optional, Tuple
+
+from detectors import BACKENDS, OnnxDetector, UltralyticsDetector, onnx_path
+
+MODEL_DIR = os.getenv("MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "models"))
+
+# Threads per process for torch and ONNX Runtime, set by limit_threads
+_threads: Optional[int] = None
+
+
+def resolve_weights(weights: str, allow_download: Optional[bool] = None) -> str:
+    """Local path of a model file: as given if it exists, else under MODEL_DIR.
+    A missing file is an error unless downloads are allowed, in which case the
+    bare name is returned for Ultralytics to fetch."""
+    if os.path.isfile(weights) or weights.endswith(".yaml"):
+        return weights
+    local = os.path.join(MODEL_DIR, weights)
+    if os.path.isfile(local):
+        return local
+    if allow_download is None:
+        allow_download = os.getenv("MODEL_DOWNLOAD", "1") == "1"
+    if allow_download:
+        return weights
+    raise FileNotFoundError(f"Model file not found: {weights} (looked in {MODEL_DIR}; MODEL_DOWNLOAD is off)")
+
+
+class ModelRegistry:
+    def __init__(self, yolo_weights: Optional[str] = None, screen_weights: Optional[str] = None):
+        # The full object detector, and the cheap one that screens frames for it (see detect_objects_batch)
+        self.yolo_weights = yolo_weights or os.getenv("YOLO_WEIGHTS", "yolov8m.pt")
+        self.screen_weights = screen_weights or os.getenv("YOLO_SCREEN_WEIGHTS", "yolov8n.pt")
+        self._yolo_models: Dict[str, object] = {}
+        self._detectors: Dict[Tuple[str, str], object] = {}
+        self._weights_hashes: Dict[str, str] = {}
+        self._load_lock = threading.Lock()
+
+        # MediaPipe graphs are not thread-safe: one FaceDetection (and FaceMesh)
+        # per thread, reused for every subsequent frame. A thread that ends hands
+        # its graphs back (release_thread) and the next thread takes them over,
+        # so per-video threads (the pipeline's face stage) don't pile up graphs.
+        self._local = threading.local()
+        self._graphs: List[object] = []
+        self._idle: Dict[str, List[object]] = {"face_detector": [], "face_mesh": []}
+
+    @property
+    def mp_face_detection(self):
+        import mediapipe as mp
+        return mp.solutions.face_detection
+
+    @property
+    def mp_face_mesh(self):
+        import mediapipe as mp
+        return mp.solutions.face_mesh
+
+    def yolo(self, weights: str):
+        """Return the YOLO model for `weights`, loading it on first use"""
+        model = self._yolo_models.get(weights)
+        if model is None:
+            with self._load_lock:
+                model = self._yolo_models.get(weights)
+                if model is None:
+                    from ultralytics import YOLO
+                    if _threads:
+                        import torch
+                        torch.set_num_threads(_threads)
+                    path = resolve_weights(weights)
+                    print(f"Loading YOLO model ({path})...")
+                    model = self._yolo_models[weights] = YOLO(path)
+        return model
+
+    def detector(self, weights: str, backend: str = "ultralytics"):
+        """Return the object detector (see detectors.py) running `weights` on `backend`.
+        The onnx backend runs the exported model (yolov8m.pt -> yolov8m.onnx), which is never downloaded."""
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown detector backend: {backend}")
+        key = (backend, weights)
+        detector = self._detectors.get(key)
+        if detector is None:
+            if backend == "onnx":
+                path = resolve_weights(onnx_path(weights, int8=os.getenv("ONNX_INT8", "0") == "1"),
+                                       allow_download=False)
+                print(f"Loading ONNX model ({path})...")
+                detector = OnnxDetector(path, intra_op_threads=_threads)
+            else:
+                detector = UltralyticsDetector(self.yolo(weights))
+            with self._load_lock:
+                detector = self._detectors.setdefault(key, detector)
+        return detector
+
+    @property
+    def yolo_model(self):
+        return self.yolo(self.yolo_weights)
+
+    def _thread_graph(self, kind: str, create):
+        """The calling thread's graph of `kind`: its own, else an idle one, else a new one"""
+        graph = getattr(self._local, kind, None)
+        if graph is None:
+            with self._load_lock:
+                idle = self._idle[kind]
+                graph = idle.pop() if idle else None
+            if graph is None:
+                graph = create()
+                with self._load_lock:
+                    self._graphs.append(graph)
+            setattr(self._local, kind, graph)
+        return graph
+
+    def face_detector(self):
+        """Return the calling thread's MediaPipe FaceDetection instance"""
+        return self._thread_graph("face_detector", lambda: self.mp_face_detection.FaceDetection(
+            model_selection=0, min_detection_confidence=0.5
+        ))
+
+    def face_mesh(self):
+        """Return the calling thread's MediaPipe FaceMesh instance (single face, with iris landmarks)"""
+        # Every call gets a new face crop, so landmarks are never tracked between calls
+        return self._thread_graph("face_mesh", lambda: self.mp_face_mesh.FaceMesh(
+            static_image_mode=True, max_num_faces=1, refine_landmarks=True,
+            min_detection_confidence=0.5
+        ))
+
+    def release_thread(self):
+        """Hand the calling thread's MediaPipe graphs to the next thread that needs them.
+        Call it when a thread that ran face detection is done; both graphs are stateless
+        between images, so they carry nothing over."""
+        with self._load_lock:
+            for kind, idle in self._idle.items():
+                graph = getattr(self._local, kind, None)
+                if graph is not None:
+                    idle.append(graph)
+                    setattr(self._local, kind, None)
+
+    def weights_hash(self, weights: str, backend: str = "ultralytics") -> str:
+        """SHA-256 of the model file a detector runs (or its name, for models built from a config)"""
+        # Resolved after loading, since Ultralytics may have downloaded the weights
+        path = self.detector(weights, backend).path or weights
+        if path not in self._weights_hashes:
+            if os.path.isfile(path):
+                digest = hashlib.sha256()
+                with open(path, "rb") as f:
+                    for block in iter(lambda: f.read(1024 * 1024), b""):
+                        digest.update(block)
+                self._weights_hashes[path] = digest.hexdigest()
+            else:
+                self._weights_hashes[path] = path
+        return self._weights_hashes[path]
+
+    def fingerprint(self, weights: List[str], backend: str = "ultralytics") -> Dict[str, str]:
+        """Identify the models in use: hashes of the given YOLO weights and the library versions"""
+        return {
+            "yolo_weights": ",".join(self.weights_hash(w, backend) for w in weights),
+            "backend": backend,
+            "ultralytics": metadata.version("ultralytics"),
+            "mediapipe": metadata.version("mediapipe"),
+        }
+
+    def load(self, weights: Optional[List[str]] = None, backend: str = "ultralytics") -> "ModelRegistry":
+        """Eagerly load every model so the first request doesn't pay for it"""
+        for w in weights or [self.yolo_weights]:
+            self.detector(w, backend)
+        self.face_detector()
+        return self
+
+    def close(self):
+        with self._load_lock:
+            for graph in self._graphs:
+                try:
+                    graph.close()
+                except Exception:
+                    pass
+            self._graphs = []
+            self._idle = {kind: [] for kind in self._idle}
+        self._local = threading.local()
+
+
+def limit_threads(threads: int):
+    """Cap torch/ONNX Runtime/OpenCV threads so several worker processes can share the cores.
+    torch is only imported (and capped) once a model that needs it is loaded."""
+    global _threads
+    import cv2
+    _threads = threads
+    cv2.setNumThreads(threads)
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(threads)
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ModelRegistry:
+    """Return the process-wide registry, creating it on first use"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
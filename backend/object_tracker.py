@@ -0,0 +1,247 @@
+"""
+Object tracking between detector runs.
+With OBJECT_DETECT_EVERY = N the object detector only runs on every Nth
+object sample (keyframes, aligned to absolute time like FrameSampler's
+slots). On the samples in between, BoxPropagator moves the last detected
+boxes along with the image using sparse Lucas-Kanade optical flow on the
+analysis frame. If too few of a box's feature points survive a
+forward-backward check, the track is no longer trusted and the detector
+runs on that frame after all.
+
+InstanceTracker gives every object its own id, so two phones are two
+instances with their own first/last seen times. Each update's boxes are
+matched to the known instances of the same class by IoU (greedy, best
+first), against both an instance's last box and a constant-velocity Kalman
+prediction of where it is now. An object the detector misses for a moment
+therefore keeps its id. Same-class boxes overlapping each other in one
+update are one object seen twice (boxes NMS let through) and share an id.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from preprocess import PreparedFrame
+
+# How a due object detector treats a sampled frame between keyframes (see frame_gate.DETECT / REUSE)
+TRACK = 'track'
+
+# IoU above which two same-class boxes of one update are the same object
+DUPLICATE_IOU = 0.5
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """IoU of every box in `a` (n x 4, xyxy) with every box in `b` (m x 4): an n x m matrix"""
+    a = a[:, None, :]
+    b = b[None, :, :]
+    width = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    height = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    intersection = width * height
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    union = area_a + area_b - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+
+class BoxPropagator:
+    """Carries the last detections from frame to frame with optical flow"""
+
+    def __init__(self, min_quality: float = 0.5, max_points: int = 20, margin: float = 0.1):
+        # Fraction of a box's points that must track for the box to be trusted
+        self.min_quality = min_quality
+        self.max_points = max_points
+        # Fraction of the box added on each side when looking for feature points
+        self.margin = margin
+        # Frames where tracking failed and the detector had to run
+        self.redetections = 0
+
+        self._gray: Optional[np.ndarray] = None
+        self._scale = (1.0, 1.0)
+        self._detections: List[Dict[str, Any]] = []
+
+    @staticmethod
+    def _to_gray(frame: PreparedFrame) -> np.ndarray:
+        return cv2.cvtColor(frame.image, cv2.COLOR_BGR2GRAY)
+
+    def reset(self, frame: PreparedFrame, detections: List[Dict[str, Any]]):
+        """Start tracking from a frame the detector ran on"""
+        self._gray = self._to_gray(frame)
+        self._scale = frame.scale
+        self._detections = detections
+
+    def _features(self, gray: np.ndarray, box: np.ndarray) -> np.ndarray:
+        # Search around the box too: a flat object's corners are on its outline
+        height, width = gray.shape
+        margin_x, margin_y = (box[2] - box[0]) * self.margin, (box[3] - box[1]) * self.margin
+        x0, y0 = max(0, int(box[0] - margin_x)), max(0, int(box[1] - margin_y))
+        x1, y1 = min(width, int(np.ceil(box[2] + margin_x))), min(height, int(np.ceil(box[3] + margin_y)))
+        if x1 - x0 < 4 or y1 - y0 < 4:
+            return np.empty((0, 1, 2), np.float32)
+        corners = cv2.goodFeaturesToTrack(gray[y0:y1, x0:x1], self.max_points, 0.01, 3)
+        if corners is None:
+            return np.empty((0, 1, 2), np.float32)
+        return corners + np.array([x0, y0], np.float32)
+
+    def propagate(self, frame: PreparedFrame, timestamp: float) -> Optional[List[Dict[str, Any]]]:
+        """The last detections moved onto `frame`, or None if any of them can't be tracked reliably"""
+        if self._gray is None:
+            return None  # Nothing detected yet to track from
+        gray = self._to_gray(frame)
+        if not self._detections:
+            self._gray = gray
+            return []
+
+        scale_x, scale_y = self._scale
+        boxes = np.array([d['bbox'] for d in self._detections], np.float64) / [scale_x, scale_y, scale_x, scale_y]
+        features = [self._features(self._gray, box) for box in boxes]
+        counts = [len(points) for points in features]
+        if min(counts) < 3:
+            return None
+
+        # One forward and one backward pass for every box's points together
+        points = np.concatenate(features)
+        forward, status, _ = cv2.calcOpticalFlowPyrLK(self._gray, gray, points, None)
+        backward, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, self._gray, forward, None)
+        error = np.linalg.norm((points - backward).reshape(-1, 2), axis=1)
+        good = (status.ravel() == 1) & (back_status.ravel() == 1) & (error < 1.0)
+        motion = (forward - points).reshape(-1, 2)
+
+        height, width = gray.shape
+        propagated = []
+        offset = 0
+        for detection, box, count in zip(self._detections, boxes, counts):
+            box_good = good[offset:offset + count]
+            box_motion = motion[offset:offset + count][box_good]
+            offset += count
+            if len(box_motion) < 3 or box_good.mean() < self.min_quality:
+                return None
+
+            dx, dy = np.median(box_motion, axis=0)
+            moved = box + [dx, dy, dx, dy]
+            moved[[0, 2]] = np.clip(moved[[0, 2]], 0, width)
+            moved[[1, 3]] = np.clip(moved[[1, 3]], 0, height)
+            if moved[2] - moved[0] < 1 or moved[3] - moved[1] < 1:
+                return None  # Left the frame
+            propagated.append(dict(
+                detection,
+                bbox=[float(v) for v in moved * [scale_x, scale_y, scale_x, scale_y]],
+                stage=TRACK,
+                timestamp=timestamp,
+            ))
+
+        self._gray = gray
+        self._scale = frame.scale
+        self._detections = propagated
+        return propagated
+
+
+class BoxKalman:
+    """Constant-velocity Kalman filter over a box's centre, with its size as a slowly changing state"""
+
+    # State: centre x, centre y, width, height, and the centre's velocity (pixels/second)
+    H = np.hstack([np.eye(4), np.zeros((4, 2))])
+
+    def __init__(self, box: np.ndarray, timestamp: float):
+        size = max(box[2] - box[0], box[3] - box[1], 1.0)
+        self.x = np.array([(box[0] + box[2]) / 2, (box[1] + box[3]) / 2,
+                           box[2] - box[0], box[3] - box[1], 0.0, 0.0])
+        self.P = np.diag([size * 0.1, size * 0.1, size * 0.1, size * 0.1, size, size]) ** 2
+        self.timestamp = timestamp
+
+    def _predicted(self, timestamp: float):
+        dt = max(0.0, timestamp - self.timestamp)
+        size = max(self.x[2], self.x[3], 1.0)
+        F = np.eye(6)
+        F[0, 4] = F[1, 5] = dt
+        # Velocity may change by about half the box's size per second
+        Q = np.diag([0.0, 0.0, (0.05 * size) ** 2 * dt, (0.05 * size) ** 2 * dt,
+                     (0.5 * size) ** 2 * dt, (0.5 * size) ** 2 * dt])
+        return F @ self.x, F @ self.P @ F.T + Q
+
+    def predict_box(self, timestamp: float) -> np.ndarray:
+        x, _ = self._predicted(timestamp)
+        return np.array([x[0] - x[2] / 2, x[1] - x[3] / 2, x[0] + x[2] / 2, x[1] + x[3] / 2])
+
+    def update(self, box: np.ndarray, timestamp: float):
+        x, P = self._predicted(timestamp)
+        size = max(box[2] - box[0], box[3] - box[1], 1.0)
+        R = np.eye(4) * (0.05 * size) ** 2
+        z = np.array([(box[0] + box[2]) / 2, (box[1] + box[3]) / 2, box[2] - box[0], box[3] - box[1]])
+        S = self.H @ P @ self.H.T + R
+        K = P @ self.H.T @ np.linalg.inv(S)
+        self.x = x + K @ (z - self.H @ x)
+        self.P = (np.eye(6) - K @ self.H) @ P
+        self.timestamp = max(self.timestamp, timestamp)
+
+
+class InstanceTracker:
+    """Assigns a per-instance id to every boxed detection"""
+
+    def __init__(self, iou_threshold: float = 0.3, duplicate_iou: float = DUPLICATE_IOU):
+        self.iou_threshold = iou_threshold
+        self.duplicate_iou = duplicate_iou
+        self._next_id = 1
+        # id -> (class, last box, filter)
+        self._instances: Dict[int, tuple] = {}
+
+    def assign(self, detections: List[Dict[str, Any]], timestamp: float) -> List[Optional[int]]:
+        """Instance id for each detection (None for detections without a box)"""
+        ids: List[Optional[int]] = [None] * len(detections)
+        boxed = [i for i, detection in enumerate(detections) if detection.get('bbox') is not None]
+        if not boxed:
+            return ids
+
+        # float32 like a stored timeline's boxes, so replaying one matches instances identically
+        boxes = np.array([detections[i]['bbox'] for i in boxed], np.float32).astype(np.float64)
+        classes = np.array([detections[i]['class'] for i in boxed])
+        known = list(self._instances)
+
+        # Only the most confident of a group of overlapping same-class boxes is matched
+        overlap = iou_matrix(boxes, boxes)
+        duplicate_of: Dict[int, int] = {}
+        primary: List[int] = []
+        for column in sorted(range(len(boxed)), key=lambda c: -detections[boxed[c]]['confidence']):
+            owner = next((p for p in primary if classes[p] == classes[column]
+                          and overlap[p, column] >= self.duplicate_iou), None)
+            if owner is None:
+                primary.append(column)
+            else:
+                duplicate_of[column] = owner
+
+        matched_detections = set(duplicate_of)
+        if known:
+            last = np.array([self._instances[key][1] for key in known])
+            predicted = np.array([self._instances[key][2].predict_box(timestamp) for key in known])
+            known_classes = np.array([self._instances[key][0] for key in known])
+            iou = np.maximum(iou_matrix(last, boxes), iou_matrix(predicted, boxes))
+            iou[known_classes[:, None] != classes[None, :]] = 0.0
+
+            matched_instances = set()
+            for flat in np.argsort(-iou, axis=None, kind='stable'):
+                row, column = divmod(int(flat), len(boxed))
+                if iou[row, column] < self.iou_threshold:
+                    break
+                if row in matched_instances or column in matched_detections:
+                    continue
+                matched_instances.add(row)
+                matched_detections.add(column)
+                key = known[row]
+                name, _, kalman = self._instances[key]
+                kalman.update(boxes[column], timestamp)
+                self._instances[key] = (name, boxes[column], kalman)
+                ids[boxed[column]] = key
+
+        for column, index in enumerate(boxed):
+            if column in matched_detections:
+                continue
+            key = self._next_id
+            self._next_id += 1
+            self._instances[key] = (classes[column], boxes[column], BoxKalman(boxes[column], timestamp))
+            ids[index] = key
+        for column, owner in duplicate_of.items():
+            ids[boxed[column]] = ids[boxed[owner]]
+        return ids
+
+    def remove(self, instance_id: int):
+        self._instances.pop(instance_id, None)
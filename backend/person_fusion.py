@@ -0,0 +1,96 @@
+"""
+Person-fused face detection.
+With PERSON_FUSION on, the object detector keeps COCO 'person' boxes too, and
+each face frame is fused with the person boxes of the latest object sample
+(detected, tracked or gated alike):
+  - no person: MediaPipe is skipped and the frame has no face
+  - otherwise MediaPipe runs on the whole frame, and the face count is the
+    larger of the person and face counts, so someone turned away from the
+    camera still counts and a face outside every person box does too
+  - one person whose face the whole frame doesn't show: MediaPipe looks at the
+    upper part of their box, where a small face is larger, for focus and head
+    pose only; the crop never changes the count
+Person boxes never reach object tracking (see split_persons), so they raise
+no events of their own.
+"""
+
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from object_tracker import DUPLICATE_IOU, iou_matrix
+
+PERSON = 'person'
+
+# Part of a person's box (from the top) the face is looked for in; never taller than
+# the box is wide, so a standing person's crop stays around the head and shoulders
+UPPER_FRACTION = 0.6
+# Fraction of the box added on each side; person boxes may be up to one object sample old
+CROP_MARGIN = 0.15
+# Share of a smaller person box inside a larger one above which both are the same person
+CONTAINED_FRACTION = 0.8
+
+
+class RelativeBox(NamedTuple):
+    """A box relative to the frame, shaped like MediaPipe's relative_bounding_box"""
+    xmin: float
+    ymin: float
+    width: float
+    height: float
+
+
+def split_persons(detections: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """(target object detections, person detections)"""
+    objects, persons = [], []
+    for detection in detections:
+        (persons if detection['class'] == PERSON else objects).append(detection)
+    return objects, persons
+
+
+def person_boxes(persons: List[Dict[str, Any]], scale: Tuple[float, float]) -> np.ndarray:
+    """Distinct people's boxes (n x 4) in analysis-frame pixels, most confident first.
+    Overlapping boxes (NMS leftovers, a torso box inside a full one) count once."""
+    if not persons:
+        return np.empty((0, 4))
+    persons = sorted(persons, key=lambda d: -d['confidence'])
+    scale_x, scale_y = scale
+    boxes = np.array([d['bbox'] for d in persons], np.float64) / [scale_x, scale_y, scale_x, scale_y]
+
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    iou = iou_matrix(boxes, boxes)
+    # IoU = I / (A + B - I), so I = IoU * (A + B) / (1 + IoU)
+    intersection = iou * (areas[:, None] + areas[None, :]) / (1 + iou)
+    smaller = np.minimum(areas[:, None], areas[None, :])
+    contained = np.divide(intersection, smaller, out=np.zeros_like(iou), where=smaller > 0)
+
+    kept: List[int] = []
+    for i in range(len(boxes)):
+        if not any(iou[k, i] >= DUPLICATE_IOU or contained[k, i] >= CONTAINED_FRACTION for k in kept):
+            kept.append(i)
+    return boxes[kept]
+
+
+def upper_body_region(box: np.ndarray, width: int, height: int) -> Optional[Tuple[int, int, int, int]]:
+    """(x0, y0, x1, y1) pixel region of a frame to look for the person's face in; None if too small"""
+    box_width, box_height = box[2] - box[0], box[3] - box[1]
+    margin_x, margin_y = box_width * CROP_MARGIN, box_height * CROP_MARGIN
+    x0 = max(0, int(box[0] - margin_x))
+    y0 = max(0, int(box[1] - margin_y))
+    x1 = min(width, int(np.ceil(box[2] + margin_x)))
+    upper = min(box_height * UPPER_FRACTION, box_width)
+    y1 = min(height, int(np.ceil(box[1] + upper + margin_y)))
+    if x1 - x0 < 16 or y1 - y0 < 16:
+        return None
+    return x0, y0, x1, y1
+
+
+def to_frame_box(bbox, region: Tuple[int, int, int, int], width: int, height: int) -> RelativeBox:
+    """A MediaPipe box relative to `region` as a box relative to the whole frame"""
+    x0, y0, x1, y1 = region
+    region_width, region_height = x1 - x0, y1 - y0
+    return RelativeBox(
+        (x0 + bbox.xmin * region_width) / width,
+        (y0 + bbox.ymin * region_height) / height,
+        bbox.width * region_width / width,
+        bbox.height * region_height / height,
+    )
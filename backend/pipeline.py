@@ -0,0 +1,268 @@
+"""
+Pipelined analysis engine.
+Decoding, YOLO and MediaPipe run on their own threads connected by bounded
+queues; a single tracking stage on the calling thread consumes merged
+per-frame results in timestamp order, so events match the sequential path.
+With person fusion on, the YOLO stage also hands its results to the MediaPipe
+stage, which waits for the object result each face frame takes its person
+boxes from (see person_fusion.py).
+"""
+
+import queue
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import cv2
+
+from frame_gate import DETECT, REUSE, carry_forward
+from object_tracker import TRACK
+from person_fusion import split_persons
+
+# Marks the end of a stream on every queue
+_DONE = object()
+# Tells the YOLO stage to run the frames it has collected
+_CUT = object()
+
+
+class BatchCutter:
+    """Decides where YOLO batches end from the sequence of sampled frames alone, so the
+    sequential path and the pipeline group frames identically. A batch ends after
+    batch_size detector frames, before a TRACK frame (tracking needs the detections
+    before it), and once its first frame is `window` sampled frames back, so a stage
+    waiting on its results never waits on frames a full queue holds back."""
+
+    def __init__(self, batch_size: int, window: int):
+        self.batch_size = max(1, batch_size)
+        self.window = max(1, window)
+        self._pending = 0  # Detector frames in the open batch
+        self._span = 0     # Sampled frames since the open batch's first one
+
+    def add(self, run_objects: Optional[str]) -> Tuple[bool, bool]:
+        """(run the open batch before this frame, run it after this frame)"""
+        before = bool(self._pending) and (run_objects == TRACK or self._span >= self.window)
+        if before:
+            self._pending = self._span = 0
+        if self._pending:
+            self._span += 1
+        if run_objects == DETECT:
+            if not self._pending:
+                self._span = 1
+            self._pending += 1
+        after = self._pending >= self.batch_size
+        if after:
+            self._pending = self._span = 0
+        return before, after
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class PipelineAborted(Exception):
+    pass
+
+
+class AnalysisPipeline:
+    def __init__(self, analyzer, queue_depth: int = 8):
+        self.analyzer = analyzer
+        self.queue_depth = max(1, queue_depth)
+        self._stop = threading.Event()
+
+        # Every queue holding frames is bounded, which is what caps memory (the
+        # frames are pooled buffers, see preprocess.py): queue_depth frames wait
+        # for each detector, and the manifests, which carry every sampled frame
+        # until it is tracked, hold queue_depth batches' worth. BatchCutter ends a
+        # YOLO batch within queue_depth sampled frames, so a half-filled batch
+        # never waits on frames the decoder can't hand out. Results are a few
+        # bytes each and never block.
+        self.object_frames = queue.Queue(self.queue_depth)
+        self.face_frames = queue.Queue(self.queue_depth)
+        self.object_results = queue.Queue()
+        self.face_results = queue.Queue()
+        # Object results again, for the face stage when it needs person boxes
+        self.person_results = queue.Queue()
+        self.order = queue.Queue(self.queue_depth * max(1, analyzer.BATCH_SIZE))
+        # Box tracking between object keyframes (see object_tracker.py); set up per run
+        self.propagator = None
+        self.fuse_persons = analyzer.PERSON_FUSION
+
+    def _put(self, q: queue.Queue, item):
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise PipelineAborted()
+
+    def _get(self, q: queue.Queue):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        raise PipelineAborted()
+
+    def _decode(self, cap: cv2.VideoCapture, stats: Dict[str, Any],
+                progress_callback: Optional[Callable[[int, Optional[int]], None]],
+                start: Optional[float], end: Optional[float]):
+        cutter = self.analyzer.new_batch_cutter()
+        # Latest frame with an object result; face frames take their person boxes from it
+        object_index = None
+        try:
+            frames = self.analyzer.iter_sampled_frames(cap, stats, progress_callback, start, end)
+            for index, (timestamp, frame, run_objects, run_faces) in enumerate(frames):
+                cut_before, cut_after = cutter.add(run_objects)
+                if cut_before:
+                    self._put(self.object_frames, _CUT)
+                if run_objects in (DETECT, TRACK):
+                    self._put(self.object_frames, (index, timestamp, frame, run_objects))
+                    object_index = index
+                if cut_after:
+                    self._put(self.object_frames, _CUT)
+                if run_faces == DETECT:
+                    self._put(self.face_frames, (index, timestamp, frame, object_index))
+                # Detector inputs are queued before the manifest, so the tracker
+                # never waits on a result whose frame hasn't been handed out yet.
+                # The face stage waits on at most one open YOLO batch, which
+                # BatchCutter closes before queue_depth more face frames are due.
+                # The manifest carries the frame so its buffers are released once tracked.
+                self._put(self.order, (index, timestamp, frame, run_objects, run_faces))
+        except PipelineAborted:
+            return
+        except BaseException as e:
+            self._put_quietly(self.order, _Failure(e))
+        finally:
+            for q in (self.object_frames, self.face_frames, self.order):
+                self._put_quietly(q, _DONE)
+
+    def _run_object_batch(self, batch: list):
+        batch_detections = self.analyzer.detect_objects_batch(
+            [frame.image for _, _, frame, _ in batch],
+            [timestamp for _, timestamp, _, _ in batch],
+            [frame.scale for _, _, frame, _ in batch],
+        )
+        for (index, _, frame, _), detections in zip(batch, batch_detections):
+            if self.propagator is not None:
+                self.propagator.reset(frame, detections)
+            self._publish_objects(index, detections)
+
+    def _publish_objects(self, index: int, detections):
+        self._put(self.object_results, (index, detections))
+        if self.fuse_persons:
+            self._put(self.person_results, (index, detections))
+
+    def _detect_objects(self):
+        # Object frames reach this thread in order, so box tracking between keyframes lives here.
+        # The decoder marks where batches end (see BatchCutter), so YOLO sees the same
+        # inputs as on the sequential path; a TRACK frame always comes after a cut.
+        try:
+            batch = []
+            while True:
+                item = self._get(self.object_frames)
+                if item is _DONE or item is _CUT:
+                    if batch:
+                        self._run_object_batch(batch)
+                        batch = []
+                    if item is _DONE:
+                        break
+                elif item[3] == TRACK:
+                    index, timestamp, frame, _ = item
+                    self._publish_objects(index, self.analyzer._track_objects(self.propagator, frame, timestamp))
+                else:
+                    batch.append(item)
+        except PipelineAborted:
+            return
+        except BaseException as e:
+            self._put_quietly(self.object_results, _Failure(e))
+
+    def _detect_faces(self):
+        # Frames reach this thread in order, so the video's FaceMesh schedule lives here
+        head_pose = self.analyzer.new_head_pose_sampler()
+        # Latest object result read so far, as (index, detections)
+        objects = (None, None)
+        try:
+            while True:
+                item = self._get(self.face_frames)
+                if item is _DONE:
+                    break
+                index, timestamp, frame, object_index = item
+                persons = None
+                if self.fuse_persons and object_index is not None:
+                    while objects[0] != object_index:
+                        objects = self._get(self.person_results)
+                    persons = self.analyzer.fused_persons(objects[1], frame)
+                faces = self.analyzer.detect_faces_and_focus(frame.image, timestamp, frame.rgb, head_pose, persons)
+                self._put(self.face_results, (index, faces))
+        except PipelineAborted:
+            return
+        except BaseException as e:
+            self._put_quietly(self.face_results, _Failure(e))
+        finally:
+            # This thread ends with the video; the next one reuses its MediaPipe graphs
+            self.analyzer.registry.release_thread()
+
+    def _put_quietly(self, q: queue.Queue, item):
+        try:
+            self._put(q, item)
+        except PipelineAborted:
+            pass
+
+    def _result(self, q: queue.Queue, index: int):
+        item = self._get(q)
+        if isinstance(item, _Failure):
+            raise item.error
+        result_index, result = item
+        assert result_index == index, "pipeline results out of order"
+        return result
+
+    def run(self, cap: cv2.VideoCapture, session, stats: Dict[str, Any],
+            progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+            start: Optional[float] = None, end: Optional[float] = None):
+        """Analyze every sampled frame of `cap` (optionally within [start, end)) into `session`"""
+        self.propagator = self.analyzer.new_propagator()
+        threads = [
+            threading.Thread(target=self._decode, args=(cap, stats, progress_callback, start, end),
+                             name="pipeline-decode", daemon=True),
+            threading.Thread(target=self._detect_objects, name="pipeline-yolo", daemon=True),
+            threading.Thread(target=self._detect_faces, name="pipeline-faces", daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+
+        # Last real result of each detector, carried forward onto gated frames
+        previous = {'objects': None, 'faces': None}
+        profiler = self.analyzer.profiler
+        try:
+            # Ordered tracking stage
+            while True:
+                item = self._get(self.order)
+                if item is _DONE:
+                    break
+                if isinstance(item, _Failure):
+                    raise item.error
+
+                index, timestamp, frame, run_objects, run_faces = item
+                if run_objects in (DETECT, TRACK):
+                    previous['objects'] = self._result(self.object_results, index)
+                if run_faces == DETECT:
+                    previous['faces'] = self._result(self.face_results, index)
+
+                with profiler.stage('tracking'):
+                    if run_objects in (DETECT, TRACK):
+                        session.update_object_tracking(split_persons(previous['objects'])[0], timestamp)
+                    elif run_objects == REUSE:
+                        objects = split_persons(previous['objects'])[0]
+                        session.update_object_tracking(carry_forward(objects, timestamp), timestamp)
+                    if run_faces == DETECT:
+                        session.update_face_tracking(previous['faces'])
+                    elif run_faces == REUSE:
+                        session.update_face_tracking(carry_forward(previous['faces'], timestamp))
+                frame.release()
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            if self.propagator is not None:
+                stats['track_redetections'] += self.propagator.redetections
@@ -0,0 +1,121 @@
+"""
+Shared frame preprocessing.
+A frame due for analysis is decoded and downscaled once, to at most max_side
+pixels on its long side (by default the object detector's input size, which
+YOLO would shrink it to anyway). Both detectors then work on that copy: the
+object detector letterboxes it without resizing again, and MediaPipe gets an
+RGB conversion of it instead of the full-resolution frame.
+
+Detector boxes come back in analysis-frame pixels; PreparedFrame.scale maps
+them to the original frame. Images live in buffers from a BufferPool and are
+returned to it once a frame's results have been tracked, so steady-state
+analysis decodes, resizes and colour-converts into memory it already has.
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class BufferPool:
+    """Free lists of uint8 images, by shape"""
+
+    def __init__(self, max_free: int = 32):
+        # Buffers kept per shape; in-flight frames are bounded by the pipeline queues
+        self.max_free = max_free
+        self.allocated = 0
+        self._free: Dict[Tuple[int, ...], List[np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, shape: Tuple[int, ...]) -> np.ndarray:
+        with self._lock:
+            free = self._free.get(shape)
+            if free:
+                return free.pop()
+            self.allocated += 1
+        return np.empty(shape, np.uint8)
+
+    def release(self, buffer: np.ndarray):
+        with self._lock:
+            free = self._free.setdefault(buffer.shape, [])
+            if len(free) < self.max_free:
+                free.append(buffer)
+
+
+class PreparedFrame:
+    """A sampled frame at analysis resolution (BGR), plus its RGB copy once faces need it"""
+
+    __slots__ = ('image', 'rgb', 'scale', '_pool', '_buffers')
+
+    def __init__(self, image: np.ndarray, scale: Tuple[float, float], pool: BufferPool,
+                 buffers: List[np.ndarray]):
+        self.image = image
+        self.rgb: Optional[np.ndarray] = None
+        # (x, y) factors from analysis-frame to original-frame pixels
+        self.scale = scale
+        self._pool = pool
+        self._buffers = buffers
+
+    def release(self):
+        """Hand the frame's buffers back to the pool; the frame must not be used afterwards"""
+        for buffer in self._buffers:
+            self._pool.release(buffer)
+        self._buffers = []
+        self.image = self.rgb = None
+
+
+class FramePreprocessor:
+    def __init__(self, max_side: int, pool: Optional[BufferPool] = None):
+        # Longest side of the analysis frame; 0 keeps the original resolution
+        self.max_side = max_side
+        self.pool = pool or BufferPool()
+        # Shape of the last decoded frame, so the next one is retrieved into a pooled buffer
+        self._decoded_shape: Optional[Tuple[int, ...]] = None
+
+    def analysis_size(self, width: int, height: int) -> Tuple[int, int]:
+        """(width, height) a frame is analyzed at; rounded the way Ultralytics' letterbox rounds"""
+        if self.max_side <= 0 or max(width, height) <= self.max_side:
+            return width, height
+        gain = self.max_side / max(width, height)
+        return int(round(width * gain)), int(round(height * gain))
+
+    def retrieve(self, cap: cv2.VideoCapture) -> Optional[PreparedFrame]:
+        """Decode the frame last grab()bed from `cap` and prepare it; None if it can't be decoded"""
+        buffer = self.pool.acquire(self._decoded_shape) if self._decoded_shape else None
+        ret, frame = cap.retrieve(buffer) if buffer is not None else cap.retrieve()
+        if not ret or frame is None:
+            if buffer is not None:
+                self.pool.release(buffer)
+            return None
+        if frame is not buffer:
+            # First frame, or the stream changed resolution
+            self._decoded_shape = frame.shape
+        return self._prepare(frame, owned=True)
+
+    def prepare(self, frame: np.ndarray) -> PreparedFrame:
+        """Prepare a frame decoded elsewhere (e.g. a live JPEG); `frame` is not modified"""
+        return self._prepare(frame, owned=False)
+
+    def _prepare(self, frame: np.ndarray, owned: bool) -> PreparedFrame:
+        height, width = frame.shape[:2]
+        size = self.analysis_size(width, height)
+        if size == (width, height):
+            return PreparedFrame(frame, (1.0, 1.0), self.pool, [frame] if owned else [])
+
+        image = self.pool.acquire((size[1], size[0], 3))
+        # INTER_LINEAR is what YOLO's letterbox would have used on the full frame
+        cv2.resize(frame, size, dst=image, interpolation=cv2.INTER_LINEAR)
+        if owned:
+            self.pool.release(frame)
+        return PreparedFrame(image, (width / size[0], height / size[1]), self.pool, [image])
+
+    def add_rgb(self, prepared: PreparedFrame) -> np.ndarray:
+        """RGB copy of the analysis frame for MediaPipe, converted at most once per frame"""
+        if prepared.rgb is None:
+            rgb = self.pool.acquire(prepared.image.shape)
+            cv2.cvtColor(prepared.image, cv2.COLOR_BGR2RGB, dst=rgb)
+            prepared.rgb = rgb
+            prepared._buffers.append(rgb)
+        return prepared.rgb
@@ -45,7 +45,7 @@ def main():
             import json
             json.dump(report, f, indent=2)
         
-        print(f"\nAnalysis complete!")
+        print("\nAnalysis complete!")
         print(f"Report saved to: {output_path}")
         print(f"Total events detected: {report['summary']['total_events']}")
         print(f"Critical events: {report['summary']['critical_events']}")
@@ -0,0 +1,112 @@
+"""
+Report listing queries.
+/reports pages through the Logs collection newest-first with a keyset cursor
+on (created_at, _id), returns a summary projection unless the full report
+is asked for, and filters on score, date range and event type server-side.
+"""
+
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+SCORE_FIELD = "analysis_data.integrity_analysis.final_integrity_score"
+EVENT_TYPE_FIELD = "analysis_data.events.type"
+
+# Everything a report list needs; events and per-frame data are left out
+SUMMARY_PROJECTION = {
+    "video_file": 1,
+    "video_url": 1,
+    "created_at": 1,
+    "analysis_complete": 1,
+    "error": 1,
+    SCORE_FIELD: 1,
+    "analysis_data.integrity_analysis.policy_version": 1,
+    "analysis_data.integrity_analysis.summary_details": 1,
+    "analysis_data.summary": 1,
+    "analysis_data.video_info.duration_seconds": 1,
+}
+
+SORT = [("created_at", DESCENDING), ("_id", DESCENDING)]
+
+
+def ensure_indexes(collection):
+    """Create the indexes /reports and /analysis/{filename} rely on (idempotent)"""
+    collection.create_index(SORT, name="created_at_id")
+    collection.create_index([("video_file", ASCENDING), ("created_at", DESCENDING)], name="video_file_created_at")
+
+
+def encode_cursor(doc: Dict[str, Any]) -> str:
+    payload = json.dumps({"t": doc["created_at"], "id": str(doc["_id"])})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, ObjectId]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return payload["t"], ObjectId(payload["id"])
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def build_filter(cursor: Optional[str] = None,
+                 min_score: Optional[float] = None, max_score: Optional[float] = None,
+                 since: Optional[float] = None, until: Optional[float] = None,
+                 event_type: Optional[str] = None) -> Dict[str, Any]:
+    """Mongo filter for one page; since/until are Unix timestamps like created_at"""
+    clauses: List[Dict[str, Any]] = []
+
+    if min_score is not None or max_score is not None:
+        score = {}
+        if min_score is not None:
+            score["$gte"] = min_score
+        if max_score is not None:
+            score["$lte"] = max_score
+        clauses.append({SCORE_FIELD: score})
+
+    if since is not None or until is not None:
+        created = {}
+        if since is not None:
+            created["$gte"] = since
+        if until is not None:
+            created["$lt"] = until
+        clauses.append({"created_at": created})
+
+    if event_type:
+        clauses.append({EVENT_TYPE_FIELD: event_type})
+
+    if cursor:
+        # Strictly after the last document of the previous page in (created_at, _id) order
+        created_at, last_id = decode_cursor(cursor)
+        clauses.append({"$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": last_id}},
+        ]})
+
+    if not clauses:
+        return {}
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    if not limit or limit < 1:
+        return DEFAULT_PAGE_SIZE
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def fetch_page(collection, query: Dict[str, Any], limit: int,
+               full: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page of documents plus the cursor for the next page (None on the last page)"""
+    docs = list(
+        collection.find(query, None if full else SUMMARY_PROJECTION)
+        .sort(SORT)
+        .limit(limit + 1)
+    )
+    next_cursor = encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+    return docs[:limit], next_cursor
@@ -0,0 +1,94 @@
+"""
+Content-addressed cache of analysis results.
+An upload is keyed on the SHA-256 of its bytes (hashed as they arrive, see
+uploads.py) combined with the analyzer fingerprint, so a change to any
+threshold, penalty weight or model produces a new key. Entries are JSON
+files on local disk; once the directory grows past its size budget the
+least recently used entries are evicted.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+
+def cache_key(content_hash: str, fingerprint: str) -> str:
+    return hashlib.sha256(f"{content_hash}:{fingerprint}".encode()).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.directory = directory or os.getenv(
+            "RESULT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "proctoring-results")
+        )
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("RESULT_CACHE_MAX_MB", "512")) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        # key -> (size, last used); rebuilt from the directory so the cache survives restarts
+        self._entries: Dict[str, Tuple[int, float]] = {}
+        if self.enabled:
+            os.makedirs(self.directory, exist_ok=True)
+            for name in os.listdir(self.directory):
+                if name.endswith(".json"):
+                    stat = os.stat(os.path.join(self.directory, name))
+                    self._entries[name[:-5]] = (stat.st_size, stat.st_mtime)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @property
+    def size(self) -> int:
+        return sum(size for size, _ in self._entries.values())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            if key not in self._entries:
+                return None
+            try:
+                with open(self._path(key)) as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                self._entries.pop(key, None)
+                return None
+            now = time.time()
+            # The file's mtime records recency across restarts
+            os.utime(self._path(key), (now, now))
+            self._entries[key] = (self._entries[key][0], now)
+            return entry
+
+    def put(self, key: str, entry: Dict[str, Any]):
+        if not self.enabled:
+            return
+        data = json.dumps(entry, default=str)
+        with self._lock:
+            # Write then rename, so a reader never sees a partial entry
+            tmp_path = self._path(key) + ".tmp"
+            with open(tmp_path, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+            self._entries[key] = (len(data.encode()), time.time())
+            self._evict()
+
+    def _evict(self):
+        total = self.size
+        for key, (size, _) in sorted(self._entries.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            del self._entries[key]
+            total -= size
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Versioned integrity scoring policies.
+A report's integrity score is the policy's initial score minus a per-type
+penalty for every event. Policies are never edited in place: changing the
+penalties means adding a new version to POLICIES, so every stored score
+records the policy that produced it (integrity_analysis.policy_version).
+
+When the active policy changes, rescore_reports() recomputes the scores of
+the stored reports from their saved events. It pages through the Logs
+collection by _id, fetching only the event types and the current score, and
+writes the new scores back with one unordered bulk_write per page. The
+score being replaced is appended to analysis_data.integrity_history, so old
+and new scores stay side by side. Reports already on the target policy are
+skipped, which makes an interrupted run safe to repeat.
+
+Usage (from backend/), re-scoring every report under the active policy:
+    python scoring.py [--policy 2] [--batch-size 1000] [--dry-run]
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+# Points deducted from the initial score per event of each type.
+# Add a new version rather than changing an existing one.
+POLICIES: Dict[int, Dict[str, Any]] = {
+    1: {
+        'initial_score': 100,
+        'penalties': {
+            'face_absent': 10,
+            'multiple_faces': 20,
+            'focus_lost': 5,
+            'cell_phone_detected': 15,
+            'book_detected': 10,
+            'laptop_detected': 10,
+            'paper_detected': 10,  # Assuming paper is a type of note
+        },
+    },
+}
+
+LATEST_POLICY_VERSION = max(POLICIES)
+# Reports scored before policies were versioned carry no policy_version
+LEGACY_POLICY_VERSION = 1
+
+INTEGRITY_FIELD = "analysis_data.integrity_analysis"
+POLICY_FIELD = INTEGRITY_FIELD + ".policy_version"
+HISTORY_FIELD = "analysis_data.integrity_history"
+
+# All a re-score reads from a stored report
+RESCORE_PROJECTION = {
+    "analysis_data.events.type": 1,
+    INTEGRITY_FIELD + ".final_integrity_score": 1,
+    POLICY_FIELD: 1,
+}
+
+
+def get_policy(version: Optional[int] = None) -> Dict[str, Any]:
+    """Scoring policy by version; None means the active one (SCORING_POLICY_VERSION, default latest)"""
+    if version is None:
+        version = int(os.getenv("SCORING_POLICY_VERSION") or LATEST_POLICY_VERSION)
+    if version not in POLICIES:
+        raise ValueError(f"Unknown scoring policy version {version}")
+    return {'version': version, **POLICIES[version]}
+
+
+def integrity_report(events: List[Dict[str, Any]], policy: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Analyzes a list of events to calculate an integrity score and detailed summary.
+    Only each event's 'type' is used.
+    """
+    policy = policy or get_policy()
+    penalty_scores = policy['penalties']
+
+    event_types = [event['type'] for event in events]
+    event_counts = Counter(event_types)
+
+    initial_score = policy['initial_score']
+    total_deductions = 0
+
+    deductions_summary = []
+
+    for event_type, count in event_counts.items():
+        penalty = penalty_scores.get(event_type, 0)
+        deduction = penalty * count
+        total_deductions += deduction
+
+        if deduction > 0:
+            deductions_summary.append(
+                f"Lost {deduction} points for {count} instance(s) of '{event_type.replace('_', ' ')}'."
+            )
+
+    final_score = max(0, initial_score - total_deductions)
+
+    readable_summary = {
+        "Number of times focus lost": event_counts.get('focus_lost', 0),
+        "Number of times face was absent": event_counts.get('face_absent', 0),
+        "Number of times multiple faces were detected": event_counts.get('multiple_faces', 0),
+        "Suspicious items detected": {
+            item.replace('_detected', '').replace('_', ' ').title(): event_counts.get(item, 0)
+            for item in penalty_scores if 'detected' in item and event_counts.get(item, 0) > 0
+        }
+    }
+
+    # Assemble the final integrity report section
+    integrity_report = {
+        'final_integrity_score': final_score,
+        'policy_version': policy['version'],
+        'summary_details': readable_summary,
+        'deductions_breakdown': deductions_summary
+    }
+
+    return integrity_report
+
+
+def rescore_reports(collection, policy: Optional[Dict[str, Any]] = None, batch_size: int = 1000,
+                    dry_run: bool = False,
+                    progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Recompute the integrity score of every stored report not yet on `policy`.
+    Returns counts of reports scanned, updated and whose score changed."""
+    from pymongo import ASCENDING, UpdateOne
+
+    policy = policy or get_policy()
+    batch_size = max(1, batch_size)
+    pending = {
+        "analysis_data.events": {"$exists": True},
+        POLICY_FIELD: {"$ne": policy['version']},
+    }
+    stats = {'policy_version': policy['version'], 'scanned': 0, 'updated': 0, 'score_changed': 0}
+    started = time.perf_counter()
+    last_id = None
+
+    while True:
+        # Keyset pagination on _id: each page is an index range scan, however far along the run is
+        query = dict(pending, _id={"$gt": last_id}) if last_id is not None else pending
+        docs = list(collection.find(query, RESCORE_PROJECTION).sort("_id", ASCENDING).limit(batch_size))
+        if not docs:
+            break
+        last_id = docs[-1]["_id"]
+
+        now = time.time()
+        operations = []
+        for doc in docs:
+            data = doc.get("analysis_data") or {}
+            old = data.get("integrity_analysis") or {}
+            old_version = old.get("policy_version")
+            new = integrity_report(data.get("events") or [], policy)
+            if new['final_integrity_score'] != old.get('final_integrity_score'):
+                stats['score_changed'] += 1
+            operations.append(UpdateOne(
+                # Unchanged since it was read, so a concurrent run can't record the same score twice
+                {"_id": doc["_id"], POLICY_FIELD: old_version},
+                {
+                    "$set": {INTEGRITY_FIELD: new},
+                    "$push": {HISTORY_FIELD: {
+                        "policy_version": old_version if old_version is not None else LEGACY_POLICY_VERSION,
+                        "final_integrity_score": old.get("final_integrity_score"),
+                        "superseded_at": now,
+                    }},
+                },
+            ))
+
+        stats['scanned'] += len(docs)
+        if not dry_run:
+            result = collection.bulk_write(operations, ordered=False)
+            stats['updated'] += result.modified_count
+        if progress_callback:
+            progress_callback(stats)
+
+    elapsed = time.perf_counter() - started
+    stats['seconds'] = round(elapsed, 2)
+    stats['reports_per_second'] = round(stats['scanned'] / elapsed, 1) if elapsed > 0 else 0.0
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--policy", type=int, help="policy version to score under (default: the active one)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="reports per page and bulk_write")
+    parser.add_argument("--dry-run", action="store_true", help="count what would change without writing")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    uri = os.getenv("DATABASE_LINK")
+    if not uri:
+        print("DATABASE_LINK environment variable not set!")
+        sys.exit(1)
+
+    try:
+        policy = get_policy(args.policy)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    from database import ReportStore
+    store = ReportStore(uri)
+    print(f"Re-scoring reports under scoring policy v{policy['version']}{' (dry run)' if args.dry_run else ''}")
+    try:
+        stats = rescore_reports(
+            store.collection, policy, args.batch_size, args.dry_run,
+            lambda s: print(f"  {s['scanned']} scanned, {s['updated']} updated, {s['score_changed']} scores changed"),
+        )
+    finally:
+        store.close()
+
+    print(f"✅ {stats['scanned']} reports scanned, {stats['updated']} updated, "
+          f"{stats['score_changed']} scores changed in {stats['seconds']}s ({stats['reports_per_second']} reports/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Room-scoped WebRTC signaling.
+Each interview gets its own room holding the candidate's offer and the
+interviewer's answer. Readers long-poll: they wait on an asyncio.Event and
+are answered the moment the other side posts, instead of re-polling every
+second. Idle rooms are evicted after a TTL.
+"""
+
+import asyncio
+import re
+import time
+from typing import Any, Dict, Optional
+
+ROOM_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Room used by the original unscoped /candidate/* and /interviewer/* endpoints
+DEFAULT_ROOM = "default"
+
+
+class Room:
+    def __init__(self, room_id: str):
+        self.id = room_id
+        self.offer: Optional[Dict[str, Any]] = None
+        self.answer: Optional[Dict[str, Any]] = None
+        self.offer_ready = asyncio.Event()
+        self.answer_ready = asyncio.Event()
+        self.touched = time.monotonic()
+
+    def touch(self):
+        self.touched = time.monotonic()
+
+
+class RoomStore:
+    def __init__(self, ttl_seconds: float = 600.0, long_poll_seconds: float = 25.0):
+        self.ttl_seconds = ttl_seconds
+        self.long_poll_seconds = long_poll_seconds
+        self.rooms: Dict[str, Room] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def get(self, room_id: str) -> Room:
+        room = self.rooms.get(room_id)
+        if room is None:
+            room = self.rooms[room_id] = Room(room_id)
+        room.touch()
+        return room
+
+    def set_offer(self, room_id: str, offer: Dict[str, Any]):
+        """A new offer starts a new negotiation: any previous answer is dropped"""
+        room = self.get(room_id)
+        room.offer = offer
+        room.answer = None
+        room.answer_ready.clear()
+        room.offer_ready.set()
+
+    def set_answer(self, room_id: str, answer: Dict[str, Any]):
+        room = self.get(room_id)
+        room.answer = answer
+        room.answer_ready.set()
+
+    async def _wait(self, event: asyncio.Event, timeout: Optional[float]) -> bool:
+        timeout = self.long_poll_seconds if timeout is None else max(0.0, min(timeout, self.long_poll_seconds))
+        if event.is_set() or timeout == 0:
+            return event.is_set()
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def wait_offer(self, room_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        room = self.get(room_id)
+        if not await self._wait(room.offer_ready, timeout):
+            return None
+        room.touch()
+        return room.offer
+
+    async def take_answer(self, room_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Wait for the interviewer's answer; once delivered the room is cleared"""
+        room = self.get(room_id)
+        if not await self._wait(room.answer_ready, timeout):
+            return None
+        answer = room.answer
+        # The connection is being established; the room is no longer needed
+        if self.rooms.get(room_id) is room:
+            del self.rooms[room_id]
+        return answer
+
+    def evict_expired(self) -> int:
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = [room_id for room_id, room in self.rooms.items() if room.touched < cutoff]
+        for room_id in expired:
+            del self.rooms[room_id]
+        return len(expired)
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(min(60.0, self.ttl_seconds))
+            self.evict_expired()
+
+    def start(self):
+        self._sweeper = asyncio.create_task(self._sweep())
+
+    def stop(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
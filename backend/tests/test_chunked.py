@@ -0,0 +1,29 @@
+import math
+
+from chunked import merge_segments, plan_segments
+
+
+def test_plan_segments():
+    assert plan_segments(25.0, 10.0) == [(0.0, 10.0), (10.0, 20.0), (20.0, math.inf)]
+    # Rounded up to whole seconds, and never fewer than one segment
+    assert plan_segments(5.0, 9.5) == [(0.0, math.inf)]
+
+
+def test_merge_segments_orders_and_drops_slots_split_by_a_cut():
+    # At 0.75 Hz the slot [9.33, 10.67) straddles the cut at 10 s: the second
+    # segment's first face sample falls in a slot the first segment already took
+    first = {'start': 0.0, 'calls': [('objects', 9.0, ['a']), ('faces', 9.4, 'f1')]}
+    second = {'start': 10.0, 'calls': [('objects', 10.0, ['b']), ('faces', 10.0, 'f2'), ('faces', 10.8, 'f3')]}
+    calls = merge_segments([second, first], object_hz=2.0, face_hz=0.75)
+    assert calls == [
+        ('objects', 9.0, ['a']),
+        ('faces', 9.4, 'f1'),
+        ('objects', 10.0, ['b']),
+        ('faces', 10.8, 'f3'),
+    ]
+
+
+def test_merge_segments_keeps_every_frame_without_a_rate():
+    first = {'start': 0.0, 'calls': [('faces', 9.9, 'f1')]}
+    second = {'start': 10.0, 'calls': [('faces', 10.0, 'f2')]}
+    assert len(merge_segments([first, second], object_hz=0, face_hz=0)) == 2
@@ -0,0 +1,54 @@
+import numpy as np
+
+from object_tracker import InstanceTracker, iou_matrix
+
+
+def phone(bbox, confidence=0.9, name='cell phone'):
+    return {'class': name, 'confidence': confidence, 'bbox': bbox}
+
+
+def test_iou_matrix():
+    a = np.array([[0, 0, 10, 10], [0, 0, 0, 0]], np.float64)
+    b = np.array([[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]], np.float64)
+    iou = iou_matrix(a, b)
+    assert iou.shape == (2, 3)
+    np.testing.assert_allclose(iou[0], [1.0, 50 / 150, 0.0])
+    # Zero-area boxes have no union, not a division by zero
+    np.testing.assert_array_equal(iou[1], [0.0, 0.0, 0.0])
+
+
+def test_moving_object_keeps_its_id():
+    tracker = InstanceTracker()
+    (first,) = tracker.assign([phone([100, 100, 140, 180])], 0.0)
+    (second,) = tracker.assign([phone([108, 100, 148, 180])], 0.5)
+    assert second == first
+
+
+def test_separate_objects_get_separate_ids():
+    tracker = InstanceTracker()
+    ids = tracker.assign([phone([0, 0, 40, 80]), phone([300, 0, 340, 80])], 0.0)
+    assert len(set(ids)) == 2
+    # And keep them when they come back in the other order
+    assert tracker.assign([phone([300, 0, 340, 80]), phone([0, 0, 40, 80])], 0.5) == ids[::-1]
+
+
+def test_overlapping_boxes_of_one_update_share_an_id():
+    tracker = InstanceTracker()
+    ids = tracker.assign([phone([0, 0, 40, 80], 0.6), phone([2, 0, 42, 80], 0.9)], 0.0)
+    assert ids[0] == ids[1]
+
+
+def test_other_class_and_boxless_detections():
+    tracker = InstanceTracker()
+    (phone_id,) = tracker.assign([phone([0, 0, 40, 80])], 0.0)
+    book_id, boxless = tracker.assign([phone([0, 0, 40, 80], name='book'), {'class': 'book', 'confidence': 0.9}], 0.5)
+    assert book_id != phone_id
+    assert boxless is None
+
+
+def test_removed_instance_is_not_matched_again():
+    tracker = InstanceTracker()
+    (first,) = tracker.assign([phone([0, 0, 40, 80])], 0.0)
+    tracker.remove(first)
+    (second,) = tracker.assign([phone([0, 0, 40, 80])], 0.5)
+    assert second != first
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("mediapipe")
+pytest.importorskip("ultralytics")
+
+from benchmarks.fixtures import FrameRenderer
+from model_registry import ModelRegistry
+from video_processor import VideoProctoringAnalyzer
+
+# The left of the two seated people in a 640x480 `two_seated` frame, face and shoulders
+LEFT_PERSON = np.array([[105.0, 155.0, 317.0, 398.0]])
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    registry = ModelRegistry("yolov8n.yaml", "yolov8n.yaml")
+    analyzer = VideoProctoringAnalyzer(registry)
+    analyzer.HEAD_POSE = False
+    yield analyzer
+    registry.close()
+
+
+@pytest.fixture(scope="module")
+def two_seated():
+    return FrameRenderer(640, 480).render('two_seated', 0)
+
+
+def test_one_person_box_never_hides_the_other_face(analyzer, two_seated):
+    assert analyzer.detect_faces_and_focus(two_seated, 0.0)['face_count'] == 2
+    faces = analyzer.detect_faces_and_focus(two_seated, 0.0, persons=LEFT_PERSON)
+    assert faces['face_count'] == 2
+    assert faces['multiple_faces']
+
+
+def test_person_count_raises_the_face_count(analyzer, two_seated):
+    persons = np.array([[0.0, 0.0, 100.0, 200.0], [110.0, 0.0, 210.0, 200.0], [220.0, 0.0, 320.0, 200.0]])
+    assert analyzer.detect_faces_and_focus(two_seated, 0.0, persons=persons)['face_count'] == 3
+
+
+def test_nobody_in_frame_skips_mediapipe(analyzer, two_seated):
+    faces = analyzer.detect_faces_and_focus(two_seated, 0.0, persons=np.empty((0, 4)))
+    assert faces['face_count'] == 0
+    assert not faces['has_face']
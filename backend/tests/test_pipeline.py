@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("mediapipe")
+pytest.importorskip("ultralytics")
+
+from model_registry import ModelRegistry
+from video_processor import VideoProctoringAnalyzer
+
+
+@pytest.fixture
+def blank_video(tmp_path):
+    path = str(tmp_path / "blank.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 10.0, (320, 240))
+    for index in range(20):
+        writer.write(np.full((240, 320, 3), index * 5, np.uint8))
+    writer.release()
+    return path
+
+
+def test_pipelined_runs_reuse_mediapipe_graphs(blank_video):
+    # Randomly initialised YOLO from its config: nothing to download, nothing detected
+    registry = ModelRegistry("yolov8n.yaml", "yolov8n.yaml")
+    analyzer = VideoProctoringAnalyzer(registry)
+    analyzer.PIPELINED = True
+    try:
+        analyzer.warm_up()
+        analyzer.process_video(blank_video)
+        graphs = len(registry._graphs)
+        analyzer.process_video(blank_video)
+        analyzer.process_video(blank_video)
+        assert len(registry._graphs) == graphs
+    finally:
+        registry.close()
@@ -0,0 +1,26 @@
+import pytest
+from bson import ObjectId
+
+from reports import build_filter, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    doc = {'created_at': 1700000000.25, '_id': ObjectId()}
+    cursor = encode_cursor(doc)
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == (doc['created_at'], doc['_id'])
+
+
+@pytest.mark.parametrize('cursor', ['', 'not-a-cursor', encode_cursor({'created_at': 1.0, '_id': 'abc'})])
+def test_bad_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_cursor_filter_is_strictly_after_the_last_document():
+    last_id = ObjectId()
+    query = build_filter(cursor=encode_cursor({'created_at': 5.0, '_id': last_id}), min_score=50)
+    assert query == {'$and': [
+        {'analysis_data.integrity_analysis.final_integrity_score': {'$gte': 50}},
+        {'$or': [{'created_at': {'$lt': 5.0}}, {'created_at': 5.0, '_id': {'$lt': last_id}}]},
+    ]}
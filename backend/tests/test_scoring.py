@@ -0,0 +1,29 @@
+import pytest
+
+from scoring import LATEST_POLICY_VERSION, POLICIES, get_policy, integrity_report
+
+
+def test_get_policy(monkeypatch):
+    monkeypatch.delenv('SCORING_POLICY_VERSION', raising=False)
+    assert get_policy() == {'version': LATEST_POLICY_VERSION, **POLICIES[LATEST_POLICY_VERSION]}
+    monkeypatch.setenv('SCORING_POLICY_VERSION', '1')
+    assert get_policy()['version'] == 1
+    with pytest.raises(ValueError):
+        get_policy(999)
+
+
+def test_integrity_report():
+    policy = {'version': 7, 'initial_score': 100, 'penalties': {'face_absent': 10, 'cell_phone_detected': 15}}
+    events = [{'type': 'face_absent'}, {'type': 'face_absent'}, {'type': 'cell_phone_detected'},
+              {'type': 'unknown_event'}]
+    report = integrity_report(events, policy)
+    assert report['final_integrity_score'] == 65
+    assert report['policy_version'] == 7
+    assert report['summary_details']['Number of times face was absent'] == 2
+    assert report['summary_details']['Suspicious items detected'] == {'Cell Phone': 1}
+    assert len(report['deductions_breakdown']) == 2
+
+
+def test_integrity_score_never_goes_below_zero():
+    policy = {'version': 1, 'initial_score': 20, 'penalties': {'multiple_faces': 20}}
+    assert integrity_report([{'type': 'multiple_faces'}] * 3, policy)['final_integrity_score'] == 0
@@ -0,0 +1,79 @@
+import json
+import struct
+import zlib
+
+import numpy as np
+import pytest
+
+from timeline import MAGIC, Timeline, TimelineRecorder, _shuffle
+
+CLASSES = ['cell phone', 'book']
+
+PHONE = {'class': 'cell phone', 'confidence': 0.75, 'stage': 'full', 'timestamp': 0.0,
+         'bbox': [10.0, 20.0, 50.0, 100.0]}
+BOOK = {'class': 'book', 'confidence': 0.5, 'stage': 'confirm', 'timestamp': 0.0}
+FACE = {'has_face': True, 'face_count': 1, 'multiple_faces': False, 'is_focused': True,
+        'face_center': [0.5, 0.25], 'gaze_direction': None, 'timestamp': 0.2}
+NO_FACE = {'has_face': False, 'face_count': 0, 'multiple_faces': False, 'is_focused': False,
+           'face_center': None, 'gaze_direction': None, 'timestamp': 0.4}
+
+
+def recorded() -> TimelineRecorder:
+    recorder = TimelineRecorder(CLASSES)
+    recorder.update_object_tracking([PHONE, BOOK], 0.0)
+    recorder.update_face_tracking(FACE)
+    recorder.update_face_tracking(NO_FACE)
+    recorder.update_object_tracking([], 0.5)
+    return recorder
+
+
+def test_round_trip():
+    blob = recorded().timeline({'fps': 30.0}).to_base64()
+    timeline = Timeline.decode(blob)
+    assert timeline.meta == {'fps': 30.0}
+    assert list(timeline.calls()) == [
+        ('objects', 0.0, [PHONE, BOOK]),
+        ('faces', 0.2, FACE),
+        ('faces', 0.4, NO_FACE),
+        ('objects', 0.5, []),
+    ]
+
+
+def test_min_confidence_drops_detections():
+    timeline = Timeline.decode(recorded().timeline().encode())
+    assert next(timeline.calls(min_confidence=0.6)) == ('objects', 0.0, [PHONE])
+
+
+def encode_v1(columns, updates, faces) -> bytes:
+    header = json.dumps({
+        'version': 1, 'classes': CLASSES, 'meta': {}, 'updates': updates, 'faces': faces,
+        'columns': [[name, column.dtype.str, list(column.shape)] for name, column in columns.items()],
+    }).encode()
+    body = b''.join(_shuffle(column) for column in columns.values())
+    return MAGIC + zlib.compress(struct.pack('<I', len(header)) + header + body, 9)
+
+
+def test_version_1_decodes_per_class():
+    # One object update with both classes (book more confident), then one face update
+    blob = encode_v1({
+        'kinds': np.packbits([0, 1]),
+        'object_times': np.array([1.0]),
+        'object_confidence': np.array([[0.5, 0.75]], np.float32),
+        'object_stage': np.array([[1, 3]], np.uint8),
+        'face_times': np.array([1.2]),
+        'face_count': np.array([2], np.uint8),
+        'face_focused': np.packbits([False]),
+        'face_center': np.array([[0.5, 0.5]], np.float16),
+        'face_gaze': np.array([0], np.uint8),
+    }, updates=2, faces=1)
+
+    (_, _, detections), (_, _, faces) = Timeline.decode(blob).calls()
+    assert [(d['class'], d['confidence'], d['stage']) for d in detections] == [
+        ('book', 0.75, 'confirm'), ('cell phone', 0.5, 'full')]
+    assert all('bbox' not in d for d in detections)
+    assert faces['face_count'] == 2 and faces['multiple_faces']
+
+
+def test_rejects_other_blobs():
+    with pytest.raises(ValueError):
+        Timeline.decode(b'nope')
@@ -0,0 +1,255 @@
+"""
+Compact per-frame signal timeline.
+Every tracker update of an analysis (what AnalysisSession.update_object_tracking
+and update_face_tracking were fed, gated and tracked frames included) is kept
+as columns:
+  - objects: timestamp and detection count per update, then per detection
+    its class, confidence, detector stage and box (boxes let a replay match
+    object instances the way the analysis did)
+  - faces: timestamp, face count, focus flag, face centre, gaze direction
+  - the order the two kinds of update arrived in, one bit each
+Replaying it through a fresh session reproduces the analysis' events
+exactly, under any thresholds, without decoding the video again.
+Version 1 blobs (per-class maximum confidence, no boxes) still decode; their
+objects replay per class.
+
+The encoded form is a zlib-compressed blob with every column byte-shuffled
+(all first bytes, then all second bytes, ...) so slowly changing values
+compress well; a few KB per minute of video. Reports carry it base64-encoded.
+"""
+
+import base64
+import json
+import struct
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from head_pose import DIRECTIONS
+
+MAGIC = b'PTL1'
+VERSION = 2
+
+# Stage codes; 0 is "unknown"
+STAGES = (None, 'full', 'screen', 'confirm', 'track')
+# Gaze codes; 0 is "no head pose"
+GAZES = (None,) + DIRECTIONS
+
+OBJECTS, FACES = 0, 1
+
+
+def _shuffle(array: np.ndarray) -> bytes:
+    raw = np.ascontiguousarray(array).view(np.uint8).reshape(-1, array.dtype.itemsize)
+    return raw.T.tobytes()
+
+
+def _unshuffle(data: bytes, dtype: str, shape: Sequence[int]) -> np.ndarray:
+    itemsize = np.dtype(dtype).itemsize
+    raw = np.frombuffer(data, np.uint8).reshape(itemsize, -1).T
+    return np.ascontiguousarray(raw).view(dtype).reshape(shape)
+
+
+class Timeline:
+    def __init__(self, classes: List[str], kinds: np.ndarray,
+                 object_times: np.ndarray, object_counts: np.ndarray,
+                 detection_class: np.ndarray, detection_confidence: np.ndarray,
+                 detection_stage: np.ndarray, detection_bbox: np.ndarray,
+                 face_times: np.ndarray, face_count: np.ndarray, face_focused: np.ndarray,
+                 face_center: np.ndarray, face_gaze: np.ndarray, meta: Optional[Dict[str, Any]] = None):
+        self.classes = classes
+        self.kinds = kinds                                # uint8 per update, OBJECTS or FACES
+        self.object_times = object_times                  # float64 (n,)
+        self.object_counts = object_counts                # uint16 (n,), detections per object update
+        self.detection_class = detection_class            # uint8 (d,), index into classes
+        self.detection_confidence = detection_confidence  # float32 (d,)
+        self.detection_stage = detection_stage            # uint8 (d,), STAGES index
+        self.detection_bbox = detection_bbox              # float32 (d, 4), xyxy pixels; NaN without a box
+        self.face_times = face_times                      # float64 (m,)
+        self.face_count = face_count                      # uint8 (m,)
+        self.face_focused = face_focused                  # bool (m,)
+        self.face_center = face_center                    # float16 (m, 2), relative x/y; NaN without a face
+        self.face_gaze = face_gaze                        # uint8 (m,), GAZES index
+        # fps, frames and duration of the analyzed video
+        self.meta = meta or {}
+
+    def _columns(self) -> Dict[str, np.ndarray]:
+        return {
+            'kinds': np.packbits(self.kinds.astype(bool)),
+            'object_times': self.object_times,
+            'object_counts': self.object_counts,
+            'detection_class': self.detection_class,
+            'detection_confidence': self.detection_confidence,
+            'detection_stage': self.detection_stage,
+            'detection_bbox': self.detection_bbox,
+            'face_times': self.face_times,
+            'face_count': self.face_count,
+            'face_focused': np.packbits(self.face_focused),
+            'face_center': self.face_center,
+            'face_gaze': self.face_gaze,
+        }
+
+    def encode(self) -> bytes:
+        columns = self._columns()
+        header = json.dumps({
+            'version': VERSION,
+            'classes': self.classes,
+            'meta': self.meta,
+            'updates': int(len(self.kinds)),
+            'faces': int(len(self.face_times)),
+            'columns': [[name, column.dtype.str, list(column.shape)] for name, column in columns.items()],
+        }).encode()
+        body = b''.join(_shuffle(column) for column in columns.values())
+        return MAGIC + zlib.compress(struct.pack('<I', len(header)) + header + body, 9)
+
+    def to_base64(self) -> str:
+        return base64.b64encode(self.encode()).decode()
+
+    @classmethod
+    def decode(cls, data: Union[bytes, str]) -> 'Timeline':
+        if isinstance(data, str):
+            data = base64.b64decode(data)
+        if data[:4] != MAGIC:
+            raise ValueError("Not a timeline blob")
+        raw = zlib.decompress(data[4:])
+        (header_length,) = struct.unpack_from('<I', raw)
+        header = json.loads(raw[4:4 + header_length])
+        if header['version'] not in (1, VERSION):
+            raise ValueError(f"Unsupported timeline version {header['version']}")
+
+        columns = {}
+        offset = 4 + header_length
+        for name, dtype, shape in header['columns']:
+            size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            columns[name] = _unshuffle(raw[offset:offset + size], dtype, shape)
+            offset += size
+        if header['version'] == 1:
+            columns.update(_detections_from_v1(columns['object_confidence'], columns['object_stage']))
+
+        kinds = np.unpackbits(columns['kinds'], count=header['updates'])
+        focused = np.unpackbits(columns['face_focused'], count=header['faces']).astype(bool)
+        return cls(header['classes'], kinds,
+                   columns['object_times'], columns['object_counts'],
+                   columns['detection_class'], columns['detection_confidence'],
+                   columns['detection_stage'], columns['detection_bbox'],
+                   columns['face_times'], columns['face_count'], focused,
+                   columns['face_center'], columns['face_gaze'], header['meta'])
+
+    def calls(self, min_confidence: float = 0.0) -> Iterator[Tuple[str, float, Any]]:
+        """Tracker updates in their original order, as SignalRecorder records them.
+        Detections scoring below `min_confidence` are dropped."""
+        starts = np.concatenate([[0], np.cumsum(self.object_counts, dtype=np.int64)])
+        object_index = face_index = 0
+        for kind in self.kinds:
+            if kind == OBJECTS:
+                timestamp = float(self.object_times[object_index])
+                detections = []
+                for row in range(starts[object_index], starts[object_index + 1]):
+                    confidence = self.detection_confidence[row]
+                    if confidence < min_confidence:
+                        continue
+                    detection = {
+                        'class': self.classes[self.detection_class[row]],
+                        'confidence': float(confidence),
+                        'stage': STAGES[self.detection_stage[row]],
+                        'timestamp': timestamp,
+                    }
+                    bbox = self.detection_bbox[row]
+                    if not np.isnan(bbox[0]):
+                        detection['bbox'] = [float(v) for v in bbox]
+                    detections.append(detection)
+                yield 'objects', timestamp, detections
+                object_index += 1
+            else:
+                count = int(self.face_count[face_index])
+                timestamp = float(self.face_times[face_index])
+                center = self.face_center[face_index]
+                yield 'faces', timestamp, {
+                    'has_face': count > 0,
+                    'face_count': count,
+                    'multiple_faces': count > 1,
+                    'is_focused': bool(self.face_focused[face_index]),
+                    'face_center': None if np.isnan(center[0]) else [float(center[0]), float(center[1])],
+                    'gaze_direction': GAZES[self.face_gaze[face_index]],
+                    'timestamp': timestamp,
+                }
+                face_index += 1
+
+
+def _detections_from_v1(confidence: np.ndarray, stages: np.ndarray) -> Dict[str, np.ndarray]:
+    """Version 1's per-class maxima (n x classes, NaN when absent) as detection rows,
+    highest confidence first within an update, the order the detector reported them in"""
+    rows = []
+    counts = []
+    for update_confidence, update_stages in zip(confidence, stages):
+        present = np.flatnonzero(~np.isnan(update_confidence))
+        present = present[np.argsort(-update_confidence[present], kind='stable')]
+        rows.extend((c, update_confidence[c], update_stages[c]) for c in present)
+        counts.append(len(present))
+    return {
+        'object_counts': np.array(counts, np.uint16),
+        'detection_class': np.array([row[0] for row in rows], np.uint8),
+        'detection_confidence': np.array([row[1] for row in rows], np.float32),
+        'detection_stage': np.array([row[2] for row in rows], np.uint8),
+        'detection_bbox': np.full((len(rows), 4), np.nan, np.float32),
+    }
+
+
+class TimelineRecorder:
+    """Stands in for an AnalysisSession, forwarding every tracker update to it
+    (if given) while recording the update into a Timeline"""
+
+    def __init__(self, classes: Sequence[str], session=None):
+        self.session = session
+        self.classes = list(classes)
+        self._class_index = {name: i for i, name in enumerate(self.classes)}
+        self._kinds: List[int] = []
+        self._objects: List[tuple] = []
+        self._detections: List[tuple] = []
+        self._faces: List[tuple] = []
+
+    def update_object_tracking(self, detections: List[Dict[str, Any]], timestamp: Optional[float] = None):
+        if self.session is not None:
+            self.session.update_object_tracking(detections, timestamp)
+
+        count = 0
+        for detection in detections:
+            c = self._class_index.get(detection['class'])
+            if c is None:
+                continue
+            stage = detection.get('stage')
+            bbox = detection.get('bbox')
+            self._detections.append((c, detection['confidence'], STAGES.index(stage) if stage in STAGES else 0,
+                                     bbox if bbox is not None else (np.nan,) * 4))
+            count += 1
+        self._kinds.append(OBJECTS)
+        self._objects.append((timestamp if timestamp is not None else np.nan, count))
+
+    def update_face_tracking(self, face_info: Dict[str, Any]):
+        if self.session is not None:
+            self.session.update_face_tracking(face_info)
+
+        center = face_info.get('face_center') or (np.nan, np.nan)
+        gaze = face_info.get('gaze_direction')
+        self._kinds.append(FACES)
+        self._faces.append((face_info['timestamp'], face_info['face_count'], face_info['is_focused'],
+                            center, GAZES.index(gaze) if gaze in GAZES else 0))
+
+    def timeline(self, meta: Optional[Dict[str, Any]] = None) -> Timeline:
+        objects, detections, faces = self._objects, self._detections, self._faces
+        return Timeline(
+            self.classes,
+            np.array(self._kinds, np.uint8),
+            np.array([row[0] for row in objects], np.float64),
+            np.array([row[1] for row in objects], np.uint16),
+            np.array([row[0] for row in detections], np.uint8),
+            np.array([row[1] for row in detections], np.float32),
+            np.array([row[2] for row in detections], np.uint8),
+            np.array([row[3] for row in detections], np.float32).reshape(len(detections), 4),
+            np.array([row[0] for row in faces], np.float64),
+            np.array([min(row[1], 255) for row in faces], np.uint8),
+            np.array([row[2] for row in faces], bool),
+            np.array([row[3] for row in faces], np.float16).reshape(len(faces), 2),
+            np.array([row[4] for row in faces], np.uint8),
+            meta,
+        )
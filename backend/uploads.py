@@ -0,0 +1,205 @@
+"""
+Streaming upload handling.
+The request body is parsed as it arrives and spooled to a local file. For
+streamable containers the same bytes are fed to the decoder through a FIFO,
+so analysis starts before the upload has finished.
+"""
+
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Callable, List, Optional
+
+from fastapi import Request
+from multipart.multipart import MultipartParser, parse_options_header
+
+# Containers FFmpeg can demux from a non-seekable pipe. MP4/MOV usually keep
+# their index at the end of the file, so those are analyzed once spooled.
+STREAMABLE_EXTENSIONS = {".webm", ".mkv"}
+
+FEED_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadSpool:
+    """Local copy of an incoming upload, optionally mirrored into a FIFO for the decoder.
+    Must be created on the event loop thread."""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.started = time.perf_counter()
+        suffix = os.path.splitext(filename)[1].lower() or ".webm"
+        self.dir = tempfile.mkdtemp(prefix="upload-")
+        self.path = os.path.join(self.dir, "video" + suffix)
+        self._file = open(self.path, "wb")
+
+        self._cond = threading.Condition()
+        self._size = 0
+        # Hashed as the bytes arrive, so the result cache can be checked without re-reading the file
+        self._hash = hashlib.sha256()
+        self.complete = False
+        self._closed = False
+
+        # Set once the body has been fully received, or the upload was abandoned
+        self.received = asyncio.Event()
+
+        self.fifo_path = None
+        if suffix in STREAMABLE_EXTENSIONS and hasattr(os, "mkfifo"):
+            self.fifo_path = os.path.join(self.dir, "stream" + suffix)
+            os.mkfifo(self.fifo_path)
+            threading.Thread(target=self._feed, name="upload-feed", daemon=True).start()
+
+    @property
+    def streaming(self) -> bool:
+        return self.fifo_path is not None
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def content_hash(self) -> str:
+        return self._hash.hexdigest()
+
+    def write(self, data: bytes):
+        self._file.write(data)
+        self._file.flush()
+        self._hash.update(data)
+        with self._cond:
+            self._size += len(data)
+            self._cond.notify_all()
+
+    def finish(self):
+        """Mark the upload as fully received"""
+        self._file.close()
+        with self._cond:
+            self.complete = True
+            self._cond.notify_all()
+        self.received.set()
+
+    def _feed(self):
+        """Tail the spool file into the FIFO until the upload is complete"""
+        try:
+            # Blocks until the decoder opens the FIFO for reading
+            with open(self.fifo_path, "wb") as fifo, open(self.path, "rb") as src:
+                sent = 0
+                while True:
+                    with self._cond:
+                        self._cond.wait_for(lambda: self._size > sent or self.complete or self._closed)
+                        if self._closed:
+                            return
+                        available = self._size - sent
+                        if available == 0 and self.complete:
+                            return
+                    while available > 0:
+                        data = src.read(min(available, FEED_CHUNK_SIZE))
+                        if not data:
+                            break
+                        fifo.write(data)
+                        sent += len(data)
+                        available -= len(data)
+        except (BrokenPipeError, FileNotFoundError, OSError):
+            # The decoder went away (job failed or was cancelled)
+            pass
+
+    def stop_stream(self):
+        """Stop feeding the FIFO; the decoder sees the stream end at what it has read so far"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def cleanup(self):
+        self.stop_stream()
+        self.received.set()
+        if not self._file.closed:
+            self._file.close()
+        if self.fifo_path:
+            # Unblock a feeder still waiting in open() for a reader that never came
+            try:
+                fd = os.open(self.fifo_path, os.O_RDONLY | os.O_NONBLOCK)
+                os.close(fd)
+            except OSError:
+                pass
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+async def receive_upload(request: Request,
+                         on_file: Callable[[str], UploadSpool]) -> Optional[UploadSpool]:
+    """Stream the first file part of a multipart request into a spool.
+    on_file(filename) is called as soon as the part's headers arrive."""
+    _, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise ValueError("Expected a multipart/form-data upload")
+
+    events: List[tuple] = []
+    header = {"field": b"", "value": b"", "disposition": b""}
+    state = {"in_file": False, "seen_file": False}
+
+    def on_part_begin():
+        header["disposition"] = b""
+
+    def on_header_field(data: bytes, start: int, end: int):
+        header["field"] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int):
+        header["value"] += data[start:end]
+
+    def on_header_end():
+        if header["field"].lower() == b"content-disposition":
+            header["disposition"] = header["value"]
+        header["field"] = b""
+        header["value"] = b""
+
+    def on_headers_finished():
+        _, options = parse_options_header(header["disposition"])
+        # Only the first file part is kept; form fields are ignored
+        state["in_file"] = b"filename" in options and not state["seen_file"]
+        if state["in_file"]:
+            state["seen_file"] = True
+            events.append(("start", options[b"filename"].decode("utf-8", "replace")))
+
+    def on_part_data(data: bytes, start: int, end: int):
+        if state["in_file"]:
+            events.append(("data", data[start:end]))
+
+    def on_part_end():
+        if state["in_file"]:
+            events.append(("end", None))
+            state["in_file"] = False
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+
+    spool = None
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            for kind, payload in events:
+                if kind == "start":
+                    spool = on_file(os.path.basename(payload) or "upload.webm")
+                elif kind == "data":
+                    spool.write(payload)
+                elif kind == "end":
+                    spool.finish()
+            events.clear()
+        parser.finalize()
+    except Exception:
+        if spool is not None:
+            spool.cleanup()
+        raise
+
+    if spool is not None and not spool.complete:
+        spool.cleanup()
+        raise ValueError("Upload ended before the file was complete")
+    return spool
@@ -1,187 +1,195 @@
 #!/usr/bin/env python3
 """
 Video Proctoring Analysis Script
-Processes uploaded WebM videos using YOLO-11n for object detection 
-and MediaPipe for face/focus analysis.
+Processes uploaded WebM videos using YOLOv8 for object detection (a nano
+model screening frames for a medium one) and MediaPipe for face/focus analysis.
+With person fusion on, YOLO's person boxes decide where (and whether) MediaPipe
+looks for faces; see person_fusion.py.
 """
 
 import cv2
+import hashlib
 import json
+import math
 import os
 import sys
-from datetime import datetime, timedelta
-from pathlib import Path
-from typing import List, Dict, Any, Optional
+import time
+from datetime import datetime
+from typing import Callable, Iterator, List, Dict, Any, Optional, Tuple
 import numpy as np
 from collections import Counter
 
-# YOLO imports
-try:
-    from ultralytics import YOLO
-except ImportError:
-    print("Installing ultralytics...")
-    os.system("pip install ultralytics")
-    from ultralytics import YOLO
-
-# MediaPipe imports
-try:
-    import mediapipe as mp
-except ImportError:
-    print("Installing mediapipe...")
-    os.system("pip install mediapipe")
-    import mediapipe as mp
+from frame_gate import DETECT, REUSE, FrameGate, carry_forward
+from head_pose import HeadPoseSampler, estimate_head_pose, face_crop, gaze_direction
+from metrics import Profiler, peak_rss_bytes
+from model_registry import ModelRegistry, get_registry
+from pipeline import AnalysisPipeline, BatchCutter
+from object_tracker import TRACK, BoxPropagator, InstanceTracker
+from person_fusion import PERSON, person_boxes, split_persons, to_frame_box, upper_body_region
+from preprocess import FramePreprocessor, PreparedFrame
+from scoring import get_policy, integrity_report
+from timeline import Timeline, TimelineRecorder
 
-class VideoProctoringAnalyzer:
-    def __init__(self):
-        # Initialize YOLO-11n model
-        print("Loading YOLO-8m model...")
-        self.yolo_model = YOLO('yolov8m.pt')
-        
-        # Initialize MediaPipe Face Detection
-        self.mp_face_detection = mp.solutions.face_detection
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.mp_drawing = mp.solutions.drawing_utils
-        
-        # Object classes we care about (COCO dataset indices)
-        self.target_classes = {
-            'cell phone': 67,
-            'book': 73,
-            'laptop': 63,
-            'paper': 73,  # Not in COCO, we'll use custom detection
-        }
-        
+# Bump when a code change alters reports, so cached results (see result_cache.py) are not reused
+ANALYSIS_VERSION = 7
+
+# Settings that only change how fast a video is analyzed, not the report
+EXECUTION_SETTINGS = {'BATCH_SIZE', 'PIPELINED', 'PIPELINE_QUEUE_DEPTH', 'SEGMENT_SECONDS', 'SEGMENT_SEEK_MARGIN'}
+
+# Settings a stored timeline can be re-scored under (see timeline.py); everything else needs the video
+TIMELINE_SETTINGS = {'FACE_ABSENT_THRESHOLD', 'FOCUS_LOST_THRESHOLD', 'OBJECT_PERSISTENCE_SECONDS',
+                     'OBJECT_FORGET_SECONDS', 'CONFIDENCE_THRESHOLD', 'TRACK_IOU_THRESHOLD'}
+
+
+class FrameSampler:
+    """Decides from a frame's container timestamp which detectors should run on it"""
+
+    def __init__(self, object_hz: float, face_hz: float, detect_every: int = 1):
+        self.object_hz = object_hz
+        self.face_hz = face_hz
+        # Object samples per detector run; the ones in between are tracked (see object_tracker.py)
+        self.detect_every = max(1, detect_every)
+        self._last_slots = {'objects': None, 'faces': None}
+        self._object_samples = 0
+
+    def _due(self, key: str, hz: float, timestamp: float) -> bool:
+        if not hz or hz <= 0:
+            return True  # Rate disabled: analyze every frame
+
+        # Slots are aligned to absolute time, so the first frame in each
+        # 1/hz window is picked regardless of where decoding started
+        slot = math.floor(timestamp * hz + 1e-6)
+        if slot == self._last_slots[key]:
+            return False
+        self._last_slots[key] = slot
+        return True
+
+    def sample(self, timestamp: float) -> Tuple[bool, bool]:
+        """Return (run_objects, run_faces) for a frame at `timestamp` seconds"""
+        return (self._due('objects', self.object_hz, timestamp),
+                self._due('faces', self.face_hz, timestamp))
+
+    def keyframe(self, timestamp: float) -> bool:
+        """Whether the object sample at `timestamp` runs the detector rather than tracking.
+        Keyframes are every detect_every-th slot of absolute time, like the slots themselves."""
+        if self.detect_every <= 1:
+            return True
+        if self.object_hz and self.object_hz > 0:
+            return math.floor(timestamp * self.object_hz + 1e-6) % self.detect_every == 0
+        self._object_samples += 1
+        return (self._object_samples - 1) % self.detect_every == 0
+
+
+class AnalysisSession:
+    """Per-video tracking state; the models themselves live in the ModelRegistry"""
+
+    def __init__(self, fps: float = 30.0,
+                 face_absent_threshold: float = 3.0,
+                 focus_lost_threshold: float = 2.0,
+                 object_persistence_seconds: float = 1.0,
+                 object_forget_seconds: float = 5.0,
+                 track_instances: bool = False,
+                 track_iou_threshold: float = 0.3):
         # Event tracking
         self.events = []
         self.current_frame = 0
-        self.fps = 30  # Will be updated from video
-        
+        self.fps = fps  # Will be updated from video
+
         # State tracking for time-based events
         self.face_absent_start = None
         self.focus_lost_start = None
+        self.focus_lost_directions = Counter()  # Gaze directions seen since focus was lost
         self.object_detections = {}  # Track persistent object detections
-        
+        # Per-instance ids for boxed detections (see object_tracker.py); without it objects are tracked per class
+        self.instances = InstanceTracker(track_iou_threshold) if track_instances else None
+
         # Thresholds
-        self.FACE_ABSENT_THRESHOLD = 3.0  # seconds
-        self.FOCUS_LOST_THRESHOLD = 2.0    # seconds
-        self.OBJECT_PERSISTENCE_FRAMES = 30  # frames (1 second at 30fps)
-        self.CONFIDENCE_THRESHOLD = 0.2
-        
-    def detect_objects(self, frame: np.ndarray) -> List[Dict[str, Any]]:
-        """Detect objects using YOLO-8n"""
-        results = self.yolo_model(frame, verbose=False)
-        detections = []
-        
-        for result in results:
-            boxes = result.boxes
-            if boxes is not None:
-                for box in boxes:
-                    conf = float(box.conf[0])
-                    if conf < self.CONFIDENCE_THRESHOLD:
-                        continue
-                        
-                    cls = int(box.cls[0])
-                    class_name = self.yolo_model.names[cls]
-                    
-                    # Check if it's one of our target objects
-                    if class_name in self.target_classes:
-                        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                        detections.append({
-                            'class': class_name,
-                            'confidence': conf,
-                            'bbox': [float(x1), float(y1), float(x2), float(y2)],
-                            'timestamp': self.current_frame / self.fps
-                        })
-        
-        return detections
-    
-    def detect_faces_and_focus(self, frame: np.ndarray) -> Dict[str, Any]:
-        """Detect faces and analyze focus using MediaPipe"""
-        with self.mp_face_detection.FaceDetection(
-            model_selection=0, min_detection_confidence=0.5
-        ) as face_detection:
-            
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = face_detection.process(rgb_frame)
-            
-            face_count = len(results.detections) if results.detections else 0
-            has_face = face_count > 0
-            multiple_faces = face_count > 1
-            
-            # Simple focus heuristic: if face is present and reasonably centered
-            is_focused = False
-            if has_face and results.detections:
-                detection = results.detections[0]
-                bbox = detection.location_data.relative_bounding_box
-                center_x = bbox.xmin + bbox.width / 2
-                center_y = bbox.ymin + bbox.height / 2
-                
-                # Check if face is roughly centered (simple heuristic)
-                is_focused = (0.2 < center_x < 0.8 and 0.2 < center_y < 0.8)
-            
-            return {
-                'has_face': has_face,
-                'face_count': face_count,
-                'multiple_faces': multiple_faces,
-                'is_focused': is_focused,
-                'timestamp': self.current_frame / self.fps
-            }
-    
-    def update_object_tracking(self, detections: List[Dict[str, Any]]):
+        self.FACE_ABSENT_THRESHOLD = face_absent_threshold
+        self.FOCUS_LOST_THRESHOLD = focus_lost_threshold
+        self.OBJECT_PERSISTENCE_SECONDS = object_persistence_seconds
+        self.OBJECT_FORGET_SECONDS = object_forget_seconds
+
+    @property
+    def current_time(self) -> float:
+        return self.current_frame / self.fps
+
+    def update_object_tracking(self, detections: List[Dict[str, Any]],
+                               timestamp: Optional[float] = None):
         """Track persistent object detections more robustly"""
-        current_time = self.current_frame / self.fps
+        current_time = self.current_time if timestamp is None else timestamp
+
+        instance_ids = (self.instances.assign(detections, current_time)
+                        if self.instances is not None else [None] * len(detections))
 
         # Add/update detections from the current frame
-        for detection in detections:
+        for detection, instance_id in zip(detections, instance_ids):
             obj_type = detection['class']
-            
-            if obj_type not in self.object_detections:
-                # First time seeing this object type
-                self.object_detections[obj_type] = {
+            key = obj_type if instance_id is None else instance_id
+
+            if key not in self.object_detections:
+                # First time seeing this object
+                self.object_detections[key] = {
+                    'class': obj_type,
+                    'instance_id': instance_id,
                     'first_seen': current_time,
                     'last_seen': current_time,
                     'alerted': False,
-                    'confidence': detection['confidence']  # Store initial confidence
+                    'confidence': detection['confidence'],  # Store initial confidence
+                    'stage': detection.get('stage')
                 }
             else:
                 # Object already being tracked, update its last_seen time
-                self.object_detections[obj_type]['last_seen'] = current_time
-                # Optionally, update to the highest confidence score seen so far
-                self.object_detections[obj_type]['confidence'] = max(
-                    self.object_detections[obj_type].get('confidence', 0), 
-                    detection['confidence']
-                )
+                info = self.object_detections[key]
+                info['last_seen'] = current_time
+                if info.get('event') is not None:
+                    info['event']['last_seen'] = current_time
+                # Optionally, update to the highest confidence score seen so far,
+                # along with the detector stage that produced it
+                if detection['confidence'] > info.get('confidence', 0):
+                    info['confidence'] = detection['confidence']
+                    info['stage'] = detection.get('stage')
 
         # Check for persistent objects that should trigger alerts
-        for obj_type, info in self.object_detections.items():
+        for info in self.object_detections.values():
             # An object is considered 'persistent' if it has been seen for longer than the threshold
-            is_persistent = (info['last_seen'] - info['first_seen']) > 1.0 # Using 1 second threshold
+            is_persistent = (info['last_seen'] - info['first_seen']) > self.OBJECT_PERSISTENCE_SECONDS
 
             if not info['alerted'] and is_persistent:
-                self.events.append({
+                obj_type = info['class']
+                event = {
                     'type': f'{obj_type.replace(" ", "_")}_detected',
                     'timestamp': info['first_seen'],
                     'severity': 'critical',
                     'message': f'{obj_type.title()} detected in frame',
-                    'confidence': info.get('confidence', 0)  # Use the stored confidence
-                })
+                    'confidence': info.get('confidence', 0),  # Use the stored confidence
+                    'detector_stage': info.get('stage')
+                }
+                if info['instance_id'] is not None:
+                    # last_seen keeps following the instance until it's forgotten
+                    event.update(instance_id=info['instance_id'],
+                                 first_seen=info['first_seen'], last_seen=info['last_seen'])
+                    info['event'] = event
+                self.events.append(event)
                 info['alerted'] = True
-        
+
         objects_to_remove = []
-        for obj_type, info in self.object_detections.items():
-            if (current_time - info['last_seen']) > 5.0:
-                objects_to_remove.append(obj_type)
-        
-        for obj_type in objects_to_remove:
-            del self.object_detections[obj_type]
-    
+        for key, info in self.object_detections.items():
+            if (current_time - info['last_seen']) > self.OBJECT_FORGET_SECONDS:
+                objects_to_remove.append(key)
+
+        for key in objects_to_remove:
+            info = self.object_detections.pop(key)
+            if info['instance_id'] is not None:
+                self.instances.remove(info['instance_id'])
+
     def update_face_tracking(self, face_info: Dict[str, Any]):
         """Track face presence and focus over time with improved state management."""
         current_time = face_info['timestamp']
-        
+
         if not face_info['has_face']:
             if self.face_absent_start is None:
                 self.face_absent_start = current_time
-            
+
             elif (current_time - self.face_absent_start) > self.FACE_ABSENT_THRESHOLD:
                 if not self.events or self.events[-1].get('type') != 'face_absent':
                     self.events.append({
@@ -201,120 +209,491 @@ class VideoProctoringAnalyzer:
                     'severity': 'critical',
                     'message': f'Multiple faces detected ({face_info["face_count"]})'
                 })
-        
+
         if face_info['has_face'] and not face_info['multiple_faces']:
             if not face_info['is_focused']:
+                if face_info.get('gaze_direction'):
+                    self.focus_lost_directions[face_info['gaze_direction']] += 1
+
                 if self.focus_lost_start is None:
                     self.focus_lost_start = current_time
-                
+
                 elif (current_time - self.focus_lost_start) > self.FOCUS_LOST_THRESHOLD:
                     if not self.events or self.events[-1].get('type') != 'focus_lost':
+                        # Where the candidate mostly looked instead (None without head pose)
+                        direction = (self.focus_lost_directions.most_common(1)[0][0]
+                                     if self.focus_lost_directions else None)
+                        looking = f' (looking {direction})' if direction and direction != 'center' else ''
                         self.events.append({
                             'type': 'focus_lost',
                             'timestamp': self.focus_lost_start,
                             'severity': 'warning',
-                            'message': f'User not looking at screen for {self.FOCUS_LOST_THRESHOLD:.1f} seconds'
+                            'message': f'User not looking at screen for {self.FOCUS_LOST_THRESHOLD:.1f} seconds{looking}',
+                            'gaze_direction': direction
                         })
             else:
                 self.focus_lost_start = None
+                self.focus_lost_directions.clear()
         else:
             self.focus_lost_start = None
-    
+            self.focus_lost_directions.clear()
+
+
+class SignalRecorder:
+    """Stands in for an AnalysisSession and records every tracker update in order.
+    Replaying the recording into a real session reproduces its events exactly."""
+
+    def __init__(self):
+        self.calls = []
+
+    def update_object_tracking(self, detections: List[Dict[str, Any]],
+                               timestamp: Optional[float] = None):
+        self.calls.append(('objects', timestamp, detections))
+
+    def update_face_tracking(self, face_info: Dict[str, Any]):
+        self.calls.append(('faces', face_info['timestamp'], face_info))
+
     @staticmethod
-    def generate_integrity_report(events: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """
-        Analyzes a list of events to calculate an integrity score and detailed summary.
-        """
-        penalty_scores = {
-            'face_absent': 10,
-            'multiple_faces': 20,
-            'focus_lost': 5,
-            'cell_phone_detected': 15,
-            'book_detected': 10,
-            'laptop_detected': 10,
-            'paper_detected': 10,  # Assuming paper is a type of note
-        }
+    def replay(calls: List[tuple], session: AnalysisSession):
+        for kind, timestamp, payload in calls:
+            if kind == 'objects':
+                session.update_object_tracking(payload, timestamp)
+            else:
+                session.update_face_tracking(payload)
 
-        event_types = [event['type'] for event in events]
-        event_counts = Counter(event_types)
-
-        initial_score = 100
-        total_deductions = 0
-        
-        deductions_summary = []
-
-        for event_type, count in event_counts.items():
-            penalty = penalty_scores.get(event_type, 0)
-            deduction = penalty * count
-            total_deductions += deduction
-            
-            if deduction > 0:
-                deductions_summary.append(
-                    f"Lost {deduction} points for {count} instance(s) of '{event_type.replace('_', ' ')}'."
-                )
-
-        final_score = max(0, initial_score - total_deductions)
-
-        readable_summary = {
-            "Number of times focus lost": event_counts.get('focus_lost', 0),
-            "Number of times face was absent": event_counts.get('face_absent', 0),
-            "Number of times multiple faces were detected": event_counts.get('multiple_faces', 0),
-            "Suspicious items detected": {
-                item.replace('_detected', '').replace('_', ' ').title(): event_counts.get(item, 0)
-                for item in penalty_scores if 'detected' in item and event_counts.get(item, 0) > 0
-            }
+
+class LiveAnalysis:
+    """Incremental analysis of frames arriving one at a time (e.g. from a live stream).
+    Frames must be fed in timestamp order; each call returns the events it fired,
+    and report() is available at any point without re-decoding anything."""
+
+    def __init__(self, analyzer: 'VideoProctoringAnalyzer', fps: float = 30.0):
+        self.analyzer = analyzer
+        self.session = analyzer.new_session(fps)
+        self.recorder = analyzer.new_timeline_recorder(self.session)
+        self.sampler = analyzer.new_sampler()
+        self.gate = FrameGate(analyzer.GATE_THRESHOLD, analyzer.GATE_RECHECK_SECONDS)
+        self.stats = analyzer.new_stats(fps)
+        self.preprocessor = analyzer.new_preprocessor()
+        self.head_pose = analyzer.new_head_pose_sampler()
+        self.propagator = analyzer.new_propagator()
+        self.previous = {'objects': None, 'faces': None}
+        self.first_timestamp = None
+
+    def feed(self, frame: np.ndarray, timestamp: float) -> List[Dict[str, Any]]:
+        """Analyze one frame taken at `timestamp` seconds; returns newly fired events"""
+        stats = self.stats
+        if stats['last_timestamp'] is not None and timestamp <= stats['last_timestamp']:
+            return []  # Late or duplicate frame
+        if self.first_timestamp is None:
+            self.first_timestamp = timestamp
+        stats['frames_decoded'] += 1
+        stats['last_timestamp'] = timestamp
+
+        run_objects, run_faces = self.sampler.sample(timestamp)
+        if not (run_objects or run_faces):
+            return []
+
+        prepared = self.preprocessor.prepare(frame)
+        keyframe = self.sampler.keyframe(timestamp) if run_objects else True
+        run_objects, run_faces = self.analyzer._apply_gate(self.gate, prepared, timestamp, run_objects, run_faces,
+                                                           stats, keyframe)
+        if run_faces == DETECT:
+            self.preprocessor.add_rgb(prepared)
+        already_fired = len(self.session.events)
+        self.analyzer._analyze_batch(self.recorder, [(timestamp, prepared, run_objects, run_faces)],
+                                     self.previous, self.head_pose, self.propagator)
+        return self.session.events[already_fired:]
+
+    def report(self, source: str) -> Dict[str, Any]:
+        stats = self.stats
+        frames = stats['frames_decoded']
+        duration = 0.0
+        if stats['last_timestamp'] is not None:
+            duration = stats['last_timestamp'] - self.first_timestamp
+        if duration > 0:
+            self.session.fps = frames / duration
+        self.session.current_frame = frames
+        if self.propagator is not None:
+            stats['track_redetections'] = self.propagator.redetections
+
+        report = self.analyzer.build_report(self.session, source, frames, duration, self.analyzer._video_info(stats))
+        report['video_info']['live'] = True
+        report['timeline'] = self.recorder.timeline(
+            {'fps': self.session.fps, 'frames': frames, 'duration': duration}).to_base64()
+        report['perf'] = self.analyzer.profiler.summary(frames)
+        return report
+
+
+class VideoProctoringAnalyzer:
+    def __init__(self, registry: Optional[ModelRegistry] = None):
+        # Models are loaded once per process and shared between analyzers
+        self.registry = registry or get_registry()
+
+        # Object classes we care about (COCO dataset indices)
+        self.target_classes = {
+            'cell phone': 67,
+            'book': 73,
+            'laptop': 63,
+            'paper': 73,  # Not in COCO, we'll use custom detection
         }
 
-        # 5. Assemble the final integrity report section
-        integrity_report = {
-            'final_integrity_score': final_score,
-            'summary_details': readable_summary,
-            'deductions_breakdown': deductions_summary
+        # Thresholds
+        self.FACE_ABSENT_THRESHOLD = 3.0  # seconds
+        self.FOCUS_LOST_THRESHOLD = 2.0    # seconds
+        self.OBJECT_PERSISTENCE_FRAMES = 30  # frames (1 second at 30fps)
+        self.OBJECT_PERSISTENCE_SECONDS = 1.0  # seen this long before it's reported
+        self.OBJECT_FORGET_SECONDS = 5.0  # unseen this long and tracking starts over
+        self.CONFIDENCE_THRESHOLD = 0.2
+
+        # Head pose and gaze from FaceMesh (see head_pose.py) decide focus on
+        # single-face frames, together with the face being roughly centred.
+        # HEAD_POSE_HZ caps how often FaceMesh runs (0 = every face frame);
+        # limits are in degrees of (gaze) yaw and head pitch.
+        self.HEAD_POSE = os.getenv("HEAD_POSE", "1") == "1"
+        self.HEAD_POSE_HZ = float(os.getenv("HEAD_POSE_HZ", "2"))
+        self.FOCUS_YAW_LIMIT = float(os.getenv("FOCUS_YAW_LIMIT", "30"))
+        self.FOCUS_PITCH_LIMIT = float(os.getenv("FOCUS_PITCH_LIMIT", "25"))
+
+        # Person fusion (see person_fusion.py): YOLO also reports people scoring at
+        # least PERSON_CONFIDENCE_THRESHOLD; the face count is the larger of the person
+        # and MediaPipe counts, and MediaPipe is skipped while nobody is in frame.
+        self.PERSON_FUSION = os.getenv("PERSON_FUSION", "0") == "1"
+        self.PERSON_CONFIDENCE_THRESHOLD = float(os.getenv("PERSON_CONFIDENCE_THRESHOLD", "0.5"))
+
+        # Object detection cascade: the screen model looks at every sampled frame at
+        # a reduced input size; candidates scoring at least CASCADE_ACCEPT_THRESHOLD
+        # are kept as they are, and a frame with any candidate between
+        # CASCADE_CANDIDATE_THRESHOLD and that is re-run through the full model.
+        # With OBJECT_CASCADE off the full model sees every sampled frame.
+        self.OBJECT_CASCADE = os.getenv("OBJECT_CASCADE", "1") == "1"
+        self.OBJECT_WEIGHTS = self.registry.yolo_weights
+        self.OBJECT_IMGSZ = int(os.getenv("YOLO_IMGSZ", "640"))
+        self.SCREEN_WEIGHTS = self.registry.screen_weights
+        self.SCREEN_IMGSZ = int(os.getenv("YOLO_SCREEN_IMGSZ", "416"))
+        self.CASCADE_CANDIDATE_THRESHOLD = float(os.getenv("CASCADE_CANDIDATE_THRESHOLD", "0.1"))
+        self.CASCADE_ACCEPT_THRESHOLD = float(os.getenv("CASCADE_ACCEPT_THRESHOLD", "0.5"))
+
+        # Object tracking (see object_tracker.py): objects get per-instance ids, and the
+        # detector only runs on every OBJECT_DETECT_EVERY-th object sample. Boxes are
+        # carried across the samples in between with optical flow; the detector runs
+        # anyway when less than TRACK_MIN_QUALITY of a box's points can be followed.
+        self.OBJECT_TRACKER = os.getenv("OBJECT_TRACKER", "1") == "1"
+        self.OBJECT_DETECT_EVERY = int(os.getenv("OBJECT_DETECT_EVERY", "3"))
+        self.TRACK_MIN_QUALITY = float(os.getenv("TRACK_MIN_QUALITY", "0.5"))
+        self.TRACK_IOU_THRESHOLD = float(os.getenv("TRACK_IOU_THRESHOLD", "0.3"))
+
+        # Object detector backend (see detectors.py): 'ultralytics' or 'onnx'
+        self.DETECTOR_BACKEND = os.getenv("DETECTOR_BACKEND", "ultralytics")
+
+        # Frames per YOLO call in process_video; 1 disables batching
+        self.BATCH_SIZE = int(os.getenv("YOLO_BATCH_SIZE", "4"))
+
+        # Longest side frames are downscaled to once before both detectors see them
+        # (see preprocess.py); defaults to the object detector's input size, 0 disables
+        self.ANALYSIS_MAX_SIDE = int(os.getenv("ANALYSIS_MAX_SIDE", str(self.OBJECT_IMGSZ)))
+
+        # Analysis rates in Hz, driven by container timestamps; 0 analyzes every frame
+        self.OBJECT_SAMPLE_HZ = float(os.getenv("OBJECT_SAMPLE_HZ", "2"))
+        self.FACE_SAMPLE_HZ = float(os.getenv("FACE_SAMPLE_HZ", "5"))
+
+        # Run decode / YOLO / MediaPipe as concurrent stages (see pipeline.py)
+        self.PIPELINED = os.getenv("ANALYSIS_PIPELINE", "1") == "1"
+        self.PIPELINE_QUEUE_DEPTH = int(os.getenv("PIPELINE_QUEUE_DEPTH", "8"))
+
+        # Chunked mode (see chunked.py): segment length and how far before a
+        # segment to seek so the keyframe search never overshoots its start
+        self.SEGMENT_SECONDS = float(os.getenv("SEGMENT_SECONDS", "60"))
+        self.SEGMENT_SEEK_MARGIN = 2.0
+
+        # Frame-difference gate (see frame_gate.py): fraction of changed thumbnail
+        # pixels below which a detector's previous result is reused (0 disables),
+        # and the longest a result may be reused before the detector runs again
+        self.GATE_THRESHOLD = float(os.getenv("GATE_THRESHOLD", "0.01"))
+        self.GATE_RECHECK_SECONDS = float(os.getenv("GATE_RECHECK_SECONDS", "2.0"))
+
+        # Stage timings of the current video; reset by process_video / analyze_segment
+        self.profiler = Profiler()
+
+    @property
+    def mp_face_detection(self):
+        return self.registry.mp_face_detection
+
+    @property
+    def mp_face_mesh(self):
+        return self.registry.mp_face_mesh
+
+    @property
+    def yolo_model(self):
+        return self.registry.yolo(self.OBJECT_WEIGHTS)
+
+    def object_weights(self) -> List[str]:
+        """YOLO weights this analyzer runs, screen model first"""
+        if self.OBJECT_CASCADE:
+            return [self.SCREEN_WEIGHTS, self.OBJECT_WEIGHTS]
+        return [self.OBJECT_WEIGHTS]
+
+    def new_session(self, fps: float = 30.0) -> AnalysisSession:
+        """Create fresh per-video tracking state using this analyzer's thresholds"""
+        return AnalysisSession(
+            fps=fps,
+            face_absent_threshold=self.FACE_ABSENT_THRESHOLD,
+            focus_lost_threshold=self.FOCUS_LOST_THRESHOLD,
+            object_persistence_seconds=self.OBJECT_PERSISTENCE_SECONDS,
+            object_forget_seconds=self.OBJECT_FORGET_SECONDS,
+            track_instances=self.OBJECT_TRACKER,
+            track_iou_threshold=self.TRACK_IOU_THRESHOLD,
+        )
+
+    def new_sampler(self) -> FrameSampler:
+        """Per-video sampling schedule at this analyzer's rates"""
+        detect_every = self.OBJECT_DETECT_EVERY if self.OBJECT_TRACKER else 1
+        return FrameSampler(self.OBJECT_SAMPLE_HZ, self.FACE_SAMPLE_HZ, detect_every)
+
+    def new_propagator(self) -> Optional[BoxPropagator]:
+        """Per-video box tracking between detector runs, or None with the tracker off"""
+        return BoxPropagator(self.TRACK_MIN_QUALITY) if self.OBJECT_TRACKER else None
+
+    def new_timeline_recorder(self, session=None) -> TimelineRecorder:
+        """Records the tracker updates `session` receives into a Timeline"""
+        return TimelineRecorder(list(self.target_classes), session)
+
+    def report_from_timeline(self, timeline: Timeline,
+                             video_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Events and integrity report re-derived from a stored timeline under this
+        analyzer's TIMELINE_SETTINGS; the video is never touched."""
+        meta = timeline.meta
+        session = self.new_session(meta.get('fps') or 30.0)
+        SignalRecorder.replay(timeline.calls(self.CONFIDENCE_THRESHOLD), session)
+        session.current_frame = meta.get('frames', 0)
+
+        info = {key: value for key, value in (video_info or {}).items()
+                if key not in ('path', 'duration_seconds', 'total_frames', 'fps', 'processed_at')}
+        report = self.build_report(session, (video_info or {}).get('path', ''), meta.get('frames', 0),
+                                   meta.get('duration'), info)
+        report['settings'] = {key: getattr(self, key) for key in sorted(TIMELINE_SETTINGS)}
+        return report
+
+    def new_batch_cutter(self) -> BatchCutter:
+        """Per-video YOLO batch boundaries, shared by the sequential and pipelined paths"""
+        return BatchCutter(self.BATCH_SIZE, self.PIPELINE_QUEUE_DEPTH)
+
+    def new_preprocessor(self) -> FramePreprocessor:
+        """Per-video preprocessing state (buffer pool) at this analyzer's analysis resolution"""
+        return FramePreprocessor(self.ANALYSIS_MAX_SIDE)
+
+    def new_head_pose_sampler(self) -> Optional[HeadPoseSampler]:
+        """Per-video FaceMesh schedule, or None with head pose off"""
+        return HeadPoseSampler(self.HEAD_POSE_HZ) if self.HEAD_POSE else None
+
+    def config(self) -> Dict[str, Any]:
+        """Tunable settings (thresholds, rates, batching) as a plain dict"""
+        return {key: value for key, value in vars(self).items() if key.isupper()}
+
+    def warm_up(self):
+        """Run every model once on a blank frame, so the first real frame doesn't pay for lazy setup"""
+        blank = np.zeros((480, 640, 3), np.uint8)
+        for weights in self.object_weights():
+            imgsz = self.SCREEN_IMGSZ if self.OBJECT_CASCADE and weights == self.SCREEN_WEIGHTS else self.OBJECT_IMGSZ
+            self._run_yolo(weights, [blank], [0.0], 'warm_up', self.CONFIDENCE_THRESHOLD, imgsz=imgsz)
+        self.detect_faces_and_focus(blank, 0.0)
+        if self.HEAD_POSE:
+            self.registry.face_mesh().process(cv2.cvtColor(blank, cv2.COLOR_BGR2RGB))
+        # Whichever thread detects faces next (the pipeline's face stage) gets the warm graphs
+        self.registry.release_thread()
+        self.profiler = Profiler()
+
+    def fingerprint(self) -> str:
+        """Hash of everything that determines a report: thresholds, penalty weights and models"""
+        config = {key: value for key, value in self.config().items() if key not in EXECUTION_SETTINGS}
+        payload = json.dumps({
+            'version': ANALYSIS_VERSION,
+            'config': config,
+            'target_classes': self.target_classes,
+            'scoring_policy': get_policy(),
+            'models': self.registry.fingerprint(self.object_weights(), self.DETECTOR_BACKEND),
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def new_live_analysis(self, fps: float = 30.0) -> LiveAnalysis:
+        return LiveAnalysis(self, fps)
+
+    def apply_config(self, config: Dict[str, Any]):
+        for key, value in config.items():
+            if key.isupper():
+                setattr(self, key, value)
+
+    def detect_objects(self, frame: np.ndarray, timestamp: float) -> List[Dict[str, Any]]:
+        """Detect target objects in one frame"""
+        return self.detect_objects_batch([frame], [timestamp])[0]
+
+    def detect_objects_batch(self, frames: List[np.ndarray], timestamps: List[float],
+                             scales: Optional[List[Tuple[float, float]]] = None) -> List[List[Dict[str, Any]]]:
+        """Detect target objects in a batch of frames; returns one detection list per frame.
+        Each detection's 'stage' says which model produced it: 'screen' or 'confirm'
+        with the cascade on, 'full' with it off. `scales` maps downscaled frames'
+        boxes back to original-frame pixels (see PreparedFrame.scale)."""
+        if not self.OBJECT_CASCADE:
+            return self._run_yolo(self.OBJECT_WEIGHTS, frames, timestamps, 'full',
+                                  self.CONFIDENCE_THRESHOLD, imgsz=self.OBJECT_IMGSZ, scales=scales)
+
+        screened = self._run_yolo(self.SCREEN_WEIGHTS, frames, timestamps, 'screen',
+                                  self.CASCADE_CANDIDATE_THRESHOLD, imgsz=self.SCREEN_IMGSZ,
+                                  conf=self.CASCADE_CANDIDATE_THRESHOLD, scales=scales)
+
+        accept = max(self.CASCADE_ACCEPT_THRESHOLD, self.CONFIDENCE_THRESHOLD)
+        suspicious = [i for i, detections in enumerate(screened)
+                      if any(d['confidence'] < accept for d in detections)]
+        if suspicious:
+            # Borderline frames get the full model's verdict instead of the screen's
+            confirmed = self._run_yolo(self.OBJECT_WEIGHTS, [frames[i] for i in suspicious],
+                                       [timestamps[i] for i in suspicious], 'confirm',
+                                       self.CONFIDENCE_THRESHOLD, imgsz=self.OBJECT_IMGSZ,
+                                       scales=[scales[i] for i in suspicious] if scales else None)
+            for i, detections in zip(suspicious, confirmed):
+                screened[i] = detections
+        return screened
+
+    def _run_yolo(self, weights: str, frames: List[np.ndarray], timestamps: List[float],
+                  stage: str, min_confidence: float, imgsz: int,
+                  conf: Optional[float] = None,
+                  scales: Optional[List[Tuple[float, float]]] = None) -> List[List[Dict[str, Any]]]:
+        """Run one YOLO model over a batch, keeping target classes scoring at least min_confidence
+        (and, with person fusion on, people scoring at least PERSON_CONFIDENCE_THRESHOLD)"""
+        detector = self.registry.detector(weights, self.DETECTOR_BACKEND)
+        names = detector.names
+        wanted = set(self.target_classes) | ({PERSON} if self.PERSON_FUSION else set())
+        target_ids = np.array([cls for cls, name in names.items() if name in wanted])
+        person_ids = [cls for cls, name in names.items() if name == PERSON]
+
+        started = time.perf_counter()
+        results = detector.predict(frames, imgsz, conf=conf, classes=target_ids)
+
+        batch_detections = []
+        for i, ((cls, scores, xyxy), timestamp) in enumerate(zip(results, timestamps)):
+            # Filter all of a frame's boxes at once
+            keep = (scores >= min_confidence) & np.isin(cls, target_ids)
+            # A doubtful person is dropped rather than counted (or sent on to the full model)
+            keep &= ~np.isin(cls, person_ids) | (scores >= self.PERSON_CONFIDENCE_THRESHOLD)
+            if scales is not None and scales[i] != (1.0, 1.0):
+                scale_x, scale_y = scales[i]
+                xyxy = xyxy * np.array([scale_x, scale_y, scale_x, scale_y], np.float32)
+            batch_detections.append([{
+                'class': names[int(c)],
+                'confidence': float(score),
+                'bbox': [float(v) for v in box],
+                'timestamp': timestamp,
+                'stage': stage
+            } for c, score, box in zip(cls[keep], scores[keep], xyxy[keep])])
+
+        self.profiler.observe('yolo' if stage == 'full' else f'yolo_{stage}',
+                              time.perf_counter() - started, count=len(frames))
+        return batch_detections
+
+    def detect_faces_and_focus(self, frame: np.ndarray, timestamp: float,
+                               rgb_frame: Optional[np.ndarray] = None,
+                               head_pose: Optional[HeadPoseSampler] = None,
+                               persons: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """Detect faces and analyze focus using MediaPipe.
+        Pass `rgb_frame` when the frame has already been converted (see preprocess.py),
+        and the video's `head_pose` sampler to rate-limit FaceMesh; without one, FaceMesh
+        runs on every single-face frame (with HEAD_POSE on). `persons` are the people's
+        boxes in `frame` pixels from person fusion (see person_fusion.py): with nobody
+        there MediaPipe is skipped, otherwise the face count is the larger of the person
+        and face counts, and a lone person's upper body is searched for the face to judge
+        focus by when the whole frame shows none."""
+        detections = []
+        face_count = 0
+        region = None
+        if persons is None or len(persons):
+            face_detection = self.registry.face_detector()
+            with self.profiler.stage('faces'):
+                if rgb_frame is None:
+                    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                height, width = rgb_frame.shape[:2]
+                detections = face_detection.process(rgb_frame).detections or []
+                face_count = len(detections)
+                if persons is not None:
+                    # Someone turned away still counts; a face outside every person box too
+                    face_count = max(face_count, len(persons))
+                    if not detections and len(persons) == 1:
+                        region = upper_body_region(persons[0], width, height)
+                if region is not None:
+                    # Only for focus and head pose: the crop never changes the count
+                    x0, y0, x1, y1 = region
+                    detections = face_detection.process(rgb_frame[y0:y1, x0:x1]).detections or []
+
+        has_face = face_count > 0
+        multiple_faces = face_count > 1
+
+        # Simple focus heuristic: if face is present and reasonably centered
+        is_focused = False
+        face_center = None
+        if detections:
+            detection = detections[0]
+            bbox = detection.location_data.relative_bounding_box
+            if region is not None:
+                bbox = to_frame_box(bbox, region, width, height)
+            center_x = bbox.xmin + bbox.width / 2
+            center_y = bbox.ymin + bbox.height / 2
+            face_center = [center_x, center_y]
+
+            # Check if face is roughly centered (simple heuristic)
+            is_focused = (0.2 < center_x < 0.8 and 0.2 < center_y < 0.8)
+
+        # Head pose only makes sense for one face, and is only worth it while that face is centred
+        pose = None
+        if self.HEAD_POSE and face_count == 1 and is_focused:
+            estimate = lambda: self._estimate_head_pose(rgb_frame, bbox)
+            pose = head_pose.pose(timestamp, estimate) if head_pose is not None else estimate()
+            if pose is not None:
+                is_focused = pose['direction'] == 'center'
+
+        return {
+            'has_face': has_face,
+            'face_count': face_count,
+            'multiple_faces': multiple_faces,
+            'is_focused': is_focused,
+            'face_center': face_center,
+            'head_pose': pose,
+            'gaze_direction': pose['direction'] if pose else None,
+            'timestamp': timestamp
         }
-        
-        return integrity_report
-    
-    def process_video(self, video_path: str) -> Dict[str, Any]:
-        """Process the entire video and return analysis results"""
-        print(f"Processing video: {video_path}")
-        
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise ValueError(f"Could not open video: {video_path}")
-        
-        self.fps = 5.0
-        if self.fps is None or self.fps == 0:
-            print("Warning: Could not determine video FPS. Defaulting to 30.")
-            self.fps = 30.0 # Default to a common value if FPS is not available
 
-        print(f"Video properties: Reading with FPS set to {self.fps:.2f}")
-        
-        frame_skip = 1
-        
-        frames_processed = 0
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break # Exit the loop if there are no more frames
-            
-            # Your existing processing logic
-            if self.current_frame % frame_skip == 0:
-                # Object detection
-                object_detections = self.detect_objects(frame)
-                self.update_object_tracking(object_detections)
-                
-                # Face and focus detection
-                face_info = self.detect_faces_and_focus(frame)
-                self.update_face_tracking(face_info)
-            
-            self.current_frame += 1
-            frames_processed += 1 # Keep track of frames we've actually seen
-            
-        duration = frames_processed / self.fps
-        cap.release()
-        
-        sorted_events = sorted(self.events, key=lambda x: x['timestamp'])
-        
+    def _estimate_head_pose(self, rgb_frame: np.ndarray, bbox) -> Optional[Dict[str, Any]]:
+        """FaceMesh head pose and gaze direction for the face in `bbox`; None if no landmarks were found"""
+        crop = face_crop(rgb_frame, bbox)
+        if crop is None:
+            return None
+        with self.profiler.stage('head_pose'):
+            results = self.registry.face_mesh().process(crop)
+        if not results.multi_face_landmarks:
+            return None
+
+        height, width = crop.shape[:2]
+        pose = estimate_head_pose(results.multi_face_landmarks[0].landmark, width, height)
+        pose['direction'] = gaze_direction(pose, self.FOCUS_YAW_LIMIT, self.FOCUS_PITCH_LIMIT)
+        return pose
+
+    @staticmethod
+    def generate_integrity_report(events: List[Dict[str, Any]],
+                                  policy: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Analyzes a list of events to calculate an integrity score and detailed summary,
+        under the active scoring policy unless another is given (see scoring.py).
+        """
+        return integrity_report(events, policy)
+
+    def build_report(self, session: AnalysisSession, video_path: str,
+                     frames_processed: int, duration: Optional[float] = None,
+                     extra_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Assemble the final report from a finished session"""
+        if duration is None:
+            duration = frames_processed / session.fps
+        events = session.events
+
+        sorted_events = sorted(events, key=lambda x: x['timestamp'])
+
         integrity_analysis = self.generate_integrity_report(sorted_events)
 
         report = {
@@ -322,50 +701,344 @@ class VideoProctoringAnalyzer:
                 'path': video_path,
                 'duration_seconds': duration,
                 'total_frames': frames_processed,
-                'fps': self.fps,
-                'processed_at': datetime.now().isoformat()
+                'fps': session.fps,
+                'processed_at': datetime.now().isoformat(),
+                **(extra_info or {})
             },
             'integrity_analysis': integrity_analysis,
-            
+
             'events': sorted_events,
             'summary': {
-                'total_events': len(self.events),
-                'critical_events': len([e for e in self.events if e['severity'] == 'critical']),
-                'warning_events': len([e for e in self.events if e['severity'] == 'warning']),
-                'object_detections': len([e for e in self.events if 'detected' in e['type']]),
-                'face_events': len([e for e in self.events if 'face' in e['type']]),
-                'focus_events': len([e for e in self.events if 'focus' in e['type']])
+                'total_events': len(events),
+                'critical_events': len([e for e in events if e['severity'] == 'critical']),
+                'warning_events': len([e for e in events if e['severity'] == 'warning']),
+                'object_detections': len([e for e in events if 'detected' in e['type']]),
+                'face_events': len([e for e in events if 'face' in e['type']]),
+                'focus_events': len([e for e in events if 'focus' in e['type']])
             }
         }
-        
+
+        return report
+
+    def _analyze_batch(self, session, batch: List[tuple], previous: Dict[str, Any],
+                       head_pose: Optional[HeadPoseSampler] = None,
+                       propagator: Optional[BoxPropagator] = None):
+        """Batched object detection, then per-frame tracking in frame order.
+        `previous` holds the last real result of each detector for gated frames,
+        `head_pose` is the video's FaceMesh schedule and `propagator` carries
+        boxes onto TRACK frames. The batch's prepared frames are released afterwards."""
+        object_batch = [(timestamp, frame) for timestamp, frame, run_objects, _ in batch if run_objects == DETECT]
+        batch_detections = iter(self.detect_objects_batch(
+            [frame.image for _, frame in object_batch],
+            [timestamp for timestamp, _ in object_batch],
+            [frame.scale for _, frame in object_batch],
+        )) if object_batch else iter(())
+
+        for timestamp, frame, run_objects, run_faces in batch:
+            if run_objects == DETECT:
+                previous['objects'] = next(batch_detections)
+                if propagator is not None:
+                    propagator.reset(frame, previous['objects'])
+            elif run_objects == TRACK:
+                previous['objects'] = self._track_objects(propagator, frame, timestamp)
+            if run_faces == DETECT:
+                # Face and focus detection
+                previous['faces'] = self.detect_faces_and_focus(frame.image, timestamp, frame.rgb, head_pose,
+                                                                self.fused_persons(previous['objects'], frame))
+
+            with self.profiler.stage('tracking'):
+                if run_objects in (DETECT, TRACK):
+                    session.update_object_tracking(split_persons(previous['objects'])[0], timestamp)
+                elif run_objects == REUSE:
+                    objects = split_persons(previous['objects'])[0]
+                    session.update_object_tracking(carry_forward(objects, timestamp), timestamp)
+
+                if run_faces == DETECT:
+                    session.update_face_tracking(previous['faces'])
+                elif run_faces == REUSE:
+                    session.update_face_tracking(carry_forward(previous['faces'], timestamp))
+            frame.release()
+
+    def fused_persons(self, detections: Optional[List[Dict[str, Any]]],
+                      frame: PreparedFrame) -> Optional[np.ndarray]:
+        """People's boxes (in `frame`'s pixels) for a face frame, from the latest object
+        result; None to search the whole frame (person fusion off, or no object result yet)"""
+        if not self.PERSON_FUSION or detections is None:
+            return None
+        return person_boxes(split_persons(detections)[1], frame.scale)
+
+    def _track_objects(self, propagator: BoxPropagator, frame: PreparedFrame,
+                       timestamp: float) -> List[Dict[str, Any]]:
+        """Detections for a TRACK frame: the last ones moved along with the image,
+        or a fresh detector run when they can't be followed"""
+        with self.profiler.stage('track'):
+            detections = propagator.propagate(frame, timestamp)
+        if detections is None:
+            propagator.redetections += 1
+            detections = self.detect_objects_batch([frame.image], [timestamp], [frame.scale])[0]
+            propagator.reset(frame, detections)
+        return detections
+
+    def iter_sampled_frames(self, cap: cv2.VideoCapture, stats: Dict[str, Any],
+                            progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+                            start: Optional[float] = None, end: Optional[float] = None
+                            ) -> Iterator[Tuple[float, PreparedFrame, Optional[str], Optional[str]]]:
+        """Yield (timestamp, frame, run_objects, run_faces) for frames due for analysis.
+        `frame` is a PreparedFrame (see preprocess.py) the consumer releases once done with it.
+        run_objects / run_faces are DETECT, REUSE (static scene, carry the previous
+        result forward) or None when that detector isn't due on this frame;
+        run_objects is TRACK between object keyframes with the tracker on.
+        Frames no detector wants are only grab()bed: never retrieve()d or colour-converted.
+        start/end restrict analysis to the time window [start, end)."""
+        sampler = self.new_sampler()
+        gate = FrameGate(self.GATE_THRESHOLD, self.GATE_RECHECK_SECONDS)
+        preprocessor = self.new_preprocessor()
+        frame_index = 0
+
+        profiler = self.profiler
+        while True:
+            started = time.perf_counter()
+            if not cap.grab():
+                break
+            # Container timestamp of the grabbed frame; fall back to the nominal rate
+            pos_msec = cap.get(cv2.CAP_PROP_POS_MSEC)
+            timestamp = pos_msec / 1000.0 if pos_msec > 0 else frame_index / stats['fps']
+            frame_index += 1
+
+            if start is not None and timestamp < start:
+                continue  # Seek landed before the window
+            if end is not None and timestamp >= end:
+                break
+
+            stats['frames_decoded'] += 1
+            stats['last_timestamp'] = timestamp
+
+            if progress_callback is not None:
+                progress_callback(stats['frames_decoded'], stats['total_frames'])
+
+            run_objects, run_faces = sampler.sample(timestamp)
+            if not (run_objects or run_faces):
+                profiler.observe('decode', time.perf_counter() - started)
+                continue
+
+            # Decoding includes the one downscale to analysis resolution
+            frame = preprocessor.retrieve(cap)
+            profiler.observe('decode', time.perf_counter() - started)
+            if frame is None:
+                continue
+
+            keyframe = sampler.keyframe(timestamp) if run_objects else True
+            run_objects, run_faces = self._apply_gate(gate, frame, timestamp, run_objects, run_faces, stats, keyframe)
+            if run_faces == DETECT:
+                with profiler.stage('preprocess'):
+                    preprocessor.add_rgb(frame)
+            yield timestamp, frame, run_objects, run_faces
+
+    def _apply_gate(self, gate: FrameGate, frame: PreparedFrame, timestamp: float,
+                    run_objects: bool, run_faces: bool, stats: Dict[str, Any], keyframe: bool = True
+                    ) -> Tuple[Optional[str], Optional[str]]:
+        """Turn the sampler's decision for a frame into DETECT / REUSE / TRACK / None and count it.
+        `keyframe` is False for object samples the tracker covers (see FrameSampler.keyframe)."""
+        started = time.perf_counter()
+        gated = gate.enabled and ((run_objects and keyframe) or run_faces)
+        thumbnail = gate.thumbnail(frame.image) if gated else None
+        if not run_objects:
+            run_objects = None
+        elif not keyframe:
+            run_objects = TRACK
+        else:
+            run_objects = gate.decide('objects', thumbnail, timestamp)
+            stats['gated_object_frames'] += run_objects == REUSE
+            if run_objects == REUSE and self.OBJECT_TRACKER:
+                # Follow the boxes with the tracker: as cheap as reusing them, and they can move
+                run_objects = TRACK
+        run_faces = gate.decide('faces', thumbnail, timestamp) if run_faces else None
+        if gated:
+            self.profiler.observe('gate', time.perf_counter() - started)
+
+        stats['object_frames'] += run_objects is not None
+        stats['face_frames'] += run_faces is not None
+        stats['tracked_object_frames'] += run_objects == TRACK
+        stats['gated_face_frames'] += run_faces == REUSE
+        return run_objects, run_faces
+
+    def _run_sequential(self, cap: cv2.VideoCapture, session, stats: Dict[str, Any],
+                        progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+                        start: Optional[float] = None, end: Optional[float] = None):
+        batch = []  # (timestamp, frame, run_objects, run_faces) waiting for one YOLO call
+        previous = {'objects': None, 'faces': None}
+        head_pose = self.new_head_pose_sampler()
+        propagator = self.new_propagator()
+        # The pipeline ends its YOLO batches at the same frames
+        cutter = self.new_batch_cutter()
+
+        for sampled in self.iter_sampled_frames(cap, stats, progress_callback, start, end):
+            cut_before, cut_after = cutter.add(sampled[2])
+            if cut_before:
+                self._analyze_batch(session, batch, previous, head_pose, propagator)
+                batch = []
+            batch.append(sampled)
+            if cut_after:
+                self._analyze_batch(session, batch, previous, head_pose, propagator)
+                batch = []
+
+        if batch:
+            self._analyze_batch(session, batch, previous, head_pose, propagator)
+        if propagator is not None:
+            stats['track_redetections'] += propagator.redetections
+
+    @staticmethod
+    def new_stats(fps: float, total_frames: Optional[int] = None) -> Dict[str, Any]:
+        return {
+            'fps': fps,
+            'total_frames': total_frames,
+            'frames_decoded': 0,
+            'object_frames': 0,
+            'face_frames': 0,
+            'gated_object_frames': 0,
+            'gated_face_frames': 0,
+            'tracked_object_frames': 0,
+            'track_redetections': 0,
+            'last_timestamp': None,
+        }
+
+    def _open(self, video_path: str) -> Tuple[cv2.VideoCapture, Dict[str, Any]]:
+        """Open a video and return it with a fresh stats dict"""
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise ValueError(f"Could not open video: {video_path}")
+
+        # Containers written by MediaRecorder often don't carry a frame count
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or None
+        if total_frames is not None and total_frames < 0:
+            total_frames = None
+
+        # Only used when the container has no usable per-frame timestamps
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        if fps is None or fps <= 0 or fps > 240:
+            print("Warning: Could not determine video FPS. Defaulting to 30.")
+            fps = 30.0 # Default to a common value if FPS is not available
+
+        return cap, self.new_stats(fps, total_frames)
+
+    def _run(self, cap: cv2.VideoCapture, session, stats: Dict[str, Any],
+             progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+             start: Optional[float] = None, end: Optional[float] = None):
+        """Feed every sampled frame of `cap` through the detectors into `session`"""
+        if self.PIPELINED:
+            AnalysisPipeline(self, self.PIPELINE_QUEUE_DEPTH).run(cap, session, stats, progress_callback, start, end)
+        else:
+            self._run_sequential(cap, session, stats, progress_callback, start, end)
+
+    def _video_info(self, stats: Dict[str, Any]) -> Dict[str, Any]:
+        sampled = stats['object_frames'] + stats['face_frames']
+        gated = stats['gated_object_frames'] + stats['gated_face_frames']
+        return {
+            'analyzed_frames': {
+                'objects': stats['object_frames'],
+                'faces': stats['face_frames'],
+            },
+            # Sampled frames whose previous detections were reused instead of re-running inference
+            'gated_frames': {
+                'objects': stats['gated_object_frames'],
+                'faces': stats['gated_face_frames'],
+            },
+            'gated_fraction': round(gated / sampled, 4) if sampled else 0.0,
+            # Object samples covered by the tracker instead of the detector, and how many
+            # of those still needed the detector because tracking was lost
+            'tracked_frames': {
+                'objects': stats['tracked_object_frames'],
+                'redetected': stats['track_redetections'],
+            },
+            'sample_rates_hz': {
+                'objects': self.OBJECT_SAMPLE_HZ,
+                'faces': self.FACE_SAMPLE_HZ,
+            },
+            'pipelined': self.PIPELINED,
+        }
+
+    def process_video(self, video_path: str,
+                      progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> Dict[str, Any]:
+        """Process the entire video and return analysis results.
+        progress_callback, if given, is called as (current_frame, total_frames)."""
+        print(f"Processing video: {video_path}")
+
+        self.profiler = Profiler()
+        cap, stats = self._open(video_path)
+        fps = stats['fps']
+
+        print(f"Video properties: {fps:.2f} FPS, analyzing objects at "
+              f"{self.OBJECT_SAMPLE_HZ:g} Hz and faces at {self.FACE_SAMPLE_HZ:g} Hz")
+        session = self.new_session(fps)
+        recorder = self.new_timeline_recorder(session)
+
+        try:
+            self._run(cap, recorder, stats, progress_callback)
+        finally:
+            cap.release()
+
+        frames_processed = stats['frames_decoded']
+        session.current_frame = frames_processed
+        duration = 0.0
+        if stats['last_timestamp'] is not None:
+            duration = stats['last_timestamp'] + 1.0 / fps
+
+        report = self.build_report(session, video_path, frames_processed, duration, self._video_info(stats))
+        report['timeline'] = recorder.timeline({'fps': fps, 'frames': frames_processed, 'duration': duration}).to_base64()
+        report['perf'] = self.profiler.summary(frames_processed)
         return report
 
-    
+    def analyze_segment(self, video_path: str, start: float, end: float) -> Dict[str, Any]:
+        """Run the detectors over [start, end) seconds and return the recorded tracker
+        updates rather than events, so segments can be stitched in order later."""
+        self.profiler = Profiler()
+        cap, stats = self._open(video_path)
+        if start > 0:
+            # Seek a little early: OpenCV lands on a nearby keyframe, and frames
+            # before `start` are only grabbed and dropped
+            cap.set(cv2.CAP_PROP_POS_MSEC, max(0.0, start - self.SEGMENT_SEEK_MARGIN) * 1000.0)
+
+        recorder = SignalRecorder()
+        try:
+            self._run(cap, recorder, stats, start=start, end=end)
+        finally:
+            cap.release()
+        return {'start': start, 'end': end, 'calls': recorder.calls, 'stats': stats,
+                'perf_samples': self.profiler.samples, 'peak_rss': peak_rss_bytes()}
+
+
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python video_processor.py <video_path>")
-        sys.exit(1)
-    
-    video_path = sys.argv[1]
+    import argparse
+    parser = argparse.ArgumentParser(description="Analyze a proctoring video")
+    parser.add_argument("video_path")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="analyze time segments in parallel on this many processes")
+    args = parser.parse_args()
+
+    video_path = args.video_path
     if not os.path.exists(video_path):
         print(f"Video file not found: {video_path}")
         sys.exit(1)
-    
+
     try:
         analyzer = VideoProctoringAnalyzer()
-        report = analyzer.process_video(video_path)
-        
+        if args.workers > 1:
+            from chunked import process_video_chunked
+            report = process_video_chunked(analyzer, video_path, workers=args.workers)
+        else:
+            report = analyzer.process_video(video_path)
+
         # Save report
         output_path = video_path.replace('.webm', '_analysis.json')
         with open(output_path, 'w') as f:
             json.dump(report, f, indent=2)
-        
-        print(f"\nAnalysis complete!")
+
+        print("\nAnalysis complete!")
         print(f"Report saved to: {output_path}")
         print(f"Total events detected: {report['summary']['total_events']}")
         print(f"Critical events: {report['summary']['critical_events']}")
         print(f"Warning events: {report['summary']['warning_events']}")
-        
+
     except Exception as e:
         print(f"Error processing video: {e}")
         sys.exit(1)
@@ -86,13 +86,16 @@ const CandidateInterface = () => {
   const connectToInterview = async () => {
     setIsConnecting(true);
     try {
+      // Each interview has its own signaling room, shared via ?room=<id>
+      const roomId = new URLSearchParams(window.location.search).get("room") || "default";
       const { localStream: ls, stop } = await startCandidateWebRTC(
         (stream: MediaStream) => {
           setRemoteStream(stream);
           if (remoteVideoRef.current) {
             remoteVideoRef.current.srcObject = stream;
           }
-        }
+        },
+        roomId
       );
 
       setLocalStream(ls);
@@ -8,6 +8,7 @@ import StatusPanel from "./StatusPanel";
 import ReportGenerator from "./ReportGenerator";
 import { Play, Square, AlertTriangle, Eye, EyeOff, FileText } from "lucide-react";
 import { useToast } from "@/hooks/use-toast";
+import { startLiveStreaming, subscribeToLiveEvents, LiveEvent } from "@/lib/live-proctoring";
 // Removed WebRTC imports - using direct camera access
 
 export interface Event {
@@ -31,8 +32,20 @@ const ProctorInterface = () => {
   const [isGeneratingReport, setIsGeneratingReport] = useState(false);
   const mediaRecorderRef = useRef<MediaRecorder | null>(null);
   const recordedChunksRef = useRef<Blob[]>([]);
+  const liveStreamRef = useRef<{ stop: () => void } | null>(null);
   const { toast } = useToast();
 
+  // Backend event types -> local event types
+  const LIVE_EVENT_TYPES: Record<string, Event['type']> = {
+    face_absent: 'face-absent',
+    focus_lost: 'focus-lost',
+    multiple_faces: 'multiple-faces',
+    cell_phone_detected: 'phone-detected',
+    book_detected: 'notes-detected',
+    paper_detected: 'notes-detected',
+    laptop_detected: 'notes-detected',
+  };
+
   const addEvent = (event: Omit<Event, 'id'>) => {
     const newEvent = {
       ...event,
@@ -60,9 +73,26 @@ const ProctorInterface = () => {
     }
   };
 
+  const startLiveAnalysis = (stream: MediaStream, startedAt: Date) => {
+    const sessionId = `session-${startedAt.getTime()}`;
+    liveStreamRef.current = startLiveStreaming(stream, sessionId);
+    // The subscription closes itself once the final report arrives
+    subscribeToLiveEvents(
+      sessionId,
+      (event: LiveEvent) => addEvent({
+        type: LIVE_EVENT_TYPES[event.type] ?? 'focus-lost',
+        timestamp: new Date(startedAt.getTime() + event.timestamp * 1000),
+        severity: event.severity,
+        message: event.message,
+      }),
+      (report) => setAnalysisData(report)
+    );
+  };
+
   const startMonitoring = async () => {
+    const startedAt = new Date();
     setIsMonitoring(true);
-    setSessionStartTime(new Date());
+    setSessionStartTime(startedAt);
     addEvent({
       type: 'focus-restored',
       timestamp: new Date(),
@@ -79,6 +109,9 @@ const ProctorInterface = () => {
       
       setLocalStream(stream);
 
+      // Live analysis: alerts arrive while the session runs
+      startLiveAnalysis(stream, startedAt);
+
       // Setup MediaRecorder on local stream
       const options: MediaRecorderOptions = { mimeType: 'video/webm;codecs=vp8,opus' } as any;
       const recorder = new MediaRecorder(stream, options);
@@ -94,16 +127,18 @@ const ProctorInterface = () => {
           form.append('file', file);
           const response = await fetch('https://tutedude-assignment-r8jp.onrender.com/upload', { method: 'POST', body: form });
           const result = await response.json();
-          console.log('Upload result:', result.analysis_complete);
-          // const cloudinary_url =  "https://res.cloudinary.com/dzhwkg2io/video/upload/v1758197723/interview_videos/session-1758194332267.webm";
-          // console.log();
-          if (result.analysis_complete) {
-            toast({ 
-              title: 'Analysis Complete', 
-              description: 'Video uploaded and analyzed successfully. Report is ready.' 
+          if (result.status !== 'ok') throw new Error(result.error);
+          toast({ title: 'Upload Complete', description: 'Recording queued for analysis.' });
+          // Analysis runs in the background; wait for the job to finish
+          const job = await waitForJob(result.job_id);
+          console.log('Upload result:', job.analysis_complete);
+          if (job.analysis_complete) {
+            toast({
+              title: 'Analysis Complete',
+              description: 'Video uploaded and analyzed successfully. Report is ready.'
             });
             // Fetch the analysis results
-            await fetchAnalysisResults(result.cloudinary_url.split('/').pop());
+            await fetchAnalysisResults(job.video_file);
           } else {
             toast({ 
               title: 'Upload Complete', 
@@ -141,6 +176,10 @@ const ProctorInterface = () => {
       message: 'Proctoring session ended'
     });
 
+    // End live analysis; its final report replaces the one built so far
+    liveStreamRef.current?.stop();
+    liveStreamRef.current = null;
+
     // Stop recording and camera
     try {
       if (mediaRecorderRef.current && mediaRecorderRef.current.state !== 'inactive') {
@@ -159,6 +198,17 @@ const ProctorInterface = () => {
     });
   };
 
+  const waitForJob = async (jobId: string) => {
+    while (true) {
+      const response = await fetch(`https://tutedude-assignment-r8jp.onrender.com/jobs/${jobId}`);
+      const job = await response.json();
+      if (!response.ok || job.status === 'completed' || job.status === 'failed') {
+        return job;
+      }
+      await new Promise((resolve) => setTimeout(resolve, 2000));
+    }
+  };
+
   const fetchAnalysisResults = async (filename: string) => {
     try {
       const response = await fetch(`https://tutedude-assignment-r8jp.onrender.com/analysis/${filename}`);
@@ -0,0 +1,107 @@
+// src/lib/live-proctoring.ts
+// Streams camera frames to the backend for live analysis and receives events as they fire
+
+const LIVE_URL = "wss://tutedude-assignment-r8jp.onrender.com";
+
+// Skip a frame rather than let unsent frames pile up on a slow connection
+const MAX_BUFFERED_BYTES = 512 * 1024;
+
+export type LiveEvent = {
+  type: string;
+  timestamp: number; // seconds since the stream started
+  severity: "info" | "warning" | "critical";
+  message: string;
+  confidence?: number;
+  gaze_direction?: "center" | "left" | "right" | "up" | "down" | null; // focus_lost only
+  instance_id?: number; // object events: one id per tracked object
+};
+
+export type LiveStreamOptions = {
+  fps?: number;
+  width?: number;
+  quality?: number;
+};
+
+/**
+ * Sends `stream` to /live/{sessionId}/ingest as timestamped JPEG frames.
+ * Each message is an 8-byte little-endian float64 capture time followed by the JPEG.
+ * Call stop() to end the session; the server then finalizes the report.
+ */
+export const startLiveStreaming = (
+  stream: MediaStream,
+  sessionId: string,
+  { fps = 5, width = 640, quality = 0.7 }: LiveStreamOptions = {}
+) => {
+  const ws = new WebSocket(`${LIVE_URL}/live/${encodeURIComponent(sessionId)}/ingest`);
+  ws.binaryType = "arraybuffer";
+
+  const video = document.createElement("video");
+  video.muted = true;
+  video.playsInline = true;
+  video.srcObject = stream;
+  video.play().catch(() => {});
+
+  const canvas = document.createElement("canvas");
+  const context = canvas.getContext("2d");
+  const startedAt = performance.now();
+
+  const sendFrame = () => {
+    if (ws.readyState !== WebSocket.OPEN || !context || !video.videoWidth) return;
+    if (ws.bufferedAmount > MAX_BUFFERED_BYTES) return;
+
+    const timestamp = (performance.now() - startedAt) / 1000;
+    canvas.width = Math.min(width, video.videoWidth);
+    canvas.height = Math.round((video.videoHeight * canvas.width) / video.videoWidth);
+    context.drawImage(video, 0, 0, canvas.width, canvas.height);
+
+    canvas.toBlob(async (blob) => {
+      if (!blob || ws.readyState !== WebSocket.OPEN) return;
+      const jpeg = new Uint8Array(await blob.arrayBuffer());
+      const message = new Uint8Array(8 + jpeg.length);
+      new DataView(message.buffer).setFloat64(0, timestamp, true);
+      message.set(jpeg, 8);
+      ws.send(message);
+    }, "image/jpeg", quality);
+  };
+
+  const timer = window.setInterval(sendFrame, 1000 / fps);
+
+  const stop = () => {
+    window.clearInterval(timer);
+    video.srcObject = null;
+    if (ws.readyState === WebSocket.OPEN) {
+      ws.send(JSON.stringify({ type: "end" }));
+    } else {
+      ws.close();
+    }
+  };
+
+  return { stop };
+};
+
+/**
+ * Subscribes to /live/{sessionId}/events. Events already fired are replayed first;
+ * onReport receives the final report when the session ends.
+ */
+export const subscribeToLiveEvents = (
+  sessionId: string,
+  onEvent: (event: LiveEvent) => void,
+  onReport?: (report: any) => void
+) => {
+  const ws = new WebSocket(`${LIVE_URL}/live/${encodeURIComponent(sessionId)}/events`);
+
+  ws.onmessage = (message) => {
+    try {
+      const data = JSON.parse(message.data);
+      if (data.type === "event") {
+        onEvent(data.event);
+      } else if (data.type === "report" && onReport) {
+        onReport(data.report);
+      }
+    } catch (error) {
+      console.error("Invalid live event:", error);
+    }
+  };
+
+  return () => ws.close();
+};
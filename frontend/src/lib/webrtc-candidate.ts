@@ -3,6 +3,8 @@
 
 let peerConnection: RTCPeerConnection | null = null;
 
+const SIGNALING_URL = "http://localhost:8000";
+
 export type CandidateWebRTCResult = {
   localStream: MediaStream;
   remoteStream: MediaStream | null;
@@ -12,13 +14,17 @@ export type CandidateWebRTCResult = {
 /**
  * Candidate WebRTC flow:
  * 1. Get local media (camera + mic)
- * 2. Create offer and send to /candidate/offer
- * 3. Poll for interviewer's answer at /candidate/answer
+ * 2. Create offer and send to /rooms/{roomId}/candidate/offer
+ * 3. Long-poll /rooms/{roomId}/candidate/answer; the server replies as soon
+ *    as the interviewer's answer arrives
  * 4. Set remote description and establish connection
  */
 export const startCandidateWebRTC = async (
-  onRemoteStream: (stream: MediaStream) => void
+  onRemoteStream: (stream: MediaStream) => void,
+  roomId: string = "default"
 ): Promise<CandidateWebRTCResult> => {
+  const roomUrl = `${SIGNALING_URL}/rooms/${encodeURIComponent(roomId)}`;
+
   // Prepare RTCPeerConnection
   peerConnection = new RTCPeerConnection({
     iceServers: [{ urls: "stun:stun.l.google.com:19302" }],
@@ -50,7 +56,7 @@ export const startCandidateWebRTC = async (
   await peerConnection.setLocalDescription(offer);
 
   // Send offer to backend
-  await fetch("http://localhost:8000/candidate/offer", {
+  await fetch(`${roomUrl}/candidate/offer`, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
     body: JSON.stringify({ sdp: offer.sdp, type: offer.type }),
@@ -58,13 +64,14 @@ export const startCandidateWebRTC = async (
 
   console.log("Candidate offer sent, waiting for interviewer...");
 
-  // Poll for interviewer's answer
+  // Wait for interviewer's answer
   let answerReceived = false;
   const pollForAnswer = async (): Promise<void> => {
     if (answerReceived) return;
     
     try {
-      const response = await fetch("http://localhost:8000/candidate/answer");
+      // The request is held open until the answer arrives or the server's wait times out
+      const response = await fetch(`${roomUrl}/candidate/answer`);
       const data = await response.json();
       
       if (data.sdp && data.type) {
@@ -72,8 +79,8 @@ export const startCandidateWebRTC = async (
         answerReceived = true;
         console.log("Candidate received interviewer's answer");
       } else {
-        // No answer yet, poll again in 1 second
-        setTimeout(pollForAnswer, 1000);
+        // Long-poll timed out without an answer, wait again
+        pollForAnswer();
       }
     } catch (error) {
       console.error("Error polling for answer:", error);
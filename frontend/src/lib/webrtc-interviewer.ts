@@ -3,6 +3,8 @@
 
 let peerConnection: RTCPeerConnection | null = null;
 
+const SIGNALING_URL = "http://localhost:8000";
+
 export type InterviewerWebRTCResult = {
   localStream: MediaStream;
   remoteStream: MediaStream | null;
@@ -12,13 +14,16 @@ export type InterviewerWebRTCResult = {
 /**
  * Interviewer WebRTC flow:
  * 1. Get local media (camera + mic)
- * 2. Poll for candidate's offer at /interviewer/offer
- * 3. Create answer and send to /interviewer/answer
+ * 2. Long-poll /rooms/{roomId}/interviewer/offer for the candidate's offer
+ * 3. Create answer and send to /rooms/{roomId}/interviewer/answer
  * 4. Set remote description and establish connection
  */
 export const startInterviewerWebRTC = async (
-  onRemoteStream: (stream: MediaStream) => void
+  onRemoteStream: (stream: MediaStream) => void,
+  roomId: string = "default"
 ): Promise<InterviewerWebRTCResult> => {
+  const roomUrl = `${SIGNALING_URL}/rooms/${encodeURIComponent(roomId)}`;
+
   // Prepare RTCPeerConnection
   peerConnection = new RTCPeerConnection({
     iceServers: [{ urls: "stun:stun.l.google.com:19302" }],
@@ -45,13 +50,14 @@ export const startInterviewerWebRTC = async (
     };
   }
 
-  // Poll for candidate's offer
+  // Wait for candidate's offer
   let offerReceived = false;
   const pollForOffer = async (): Promise<void> => {
     if (offerReceived) return;
     
     try {
-      const response = await fetch("http://localhost:8000/interviewer/offer");
+      // The request is held open until the offer arrives or the server's wait times out
+      const response = await fetch(`${roomUrl}/interviewer/offer`);
       const data = await response.json();
       
       if (data.sdp && data.type) {
@@ -61,7 +67,7 @@ export const startInterviewerWebRTC = async (
         const answer = await peerConnection.createAnswer();
         await peerConnection.setLocalDescription(answer);
         
-        await fetch("http://localhost:8000/interviewer/answer", {
+        await fetch(`${roomUrl}/interviewer/answer`, {
           method: "POST",
           headers: { "Content-Type": "application/json" },
           body: JSON.stringify({ sdp: answer.sdp, type: answer.type }),
@@ -70,8 +76,8 @@ export const startInterviewerWebRTC = async (
         offerReceived = true;
         console.log("Interviewer received candidate's offer and sent answer");
       } else {
-        // No offer yet, poll again in 1 second
-        setTimeout(pollForOffer, 1000);
+        // Long-poll timed out without an offer, wait again
+        pollForOffer();
       }
     } catch (error) {
       console.error("Error polling for offer:", error);